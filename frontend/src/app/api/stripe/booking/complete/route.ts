@@ -2,6 +2,13 @@ import { NextResponse } from 'next/server';
 import { stripe } from '@/lib/stripe';
 import { BACKEND_ROUTES } from '@/constants/backend-routes';
 
+// Stripe's minimum checkout session lifetime
+const CHECKOUT_SESSION_TTL_SECONDS = 30 * 60;
+// Must match the ticket service, which cancels PENDING bookings this long after creation
+const PENDING_BOOKING_TTL_SECONDS = Number(process.env.PENDING_BOOKING_TTL_SECONDS || 2100);
+// Leaves time for the confirmation to reach the booking service after a last-second payment
+const CONFIRMATION_MARGIN_SECONDS = 60;
+
 // Use internal Docker network URLs when running on server-side
 export async function POST(request: Request) {
   try {
@@ -72,6 +79,17 @@ export async function POST(request: Request) {
         );
       }
 
+      // The checkout has to close before the booking expires, not 30 minutes from now
+      const checkoutExpiresAt = Math.floor(new Date(booking.created_at).getTime() / 1000)
+        + PENDING_BOOKING_TTL_SECONDS - CONFIRMATION_MARGIN_SECONDS;
+      if (!Number.isFinite(checkoutExpiresAt)
+          || checkoutExpiresAt - Math.floor(Date.now() / 1000) < CHECKOUT_SESSION_TTL_SECONDS) {
+        return NextResponse.json(
+          { error: 'This booking expires too soon to be paid for. Please make a new booking.' },
+          { status: 409 }
+        );
+      }
+
       // Fetch event details to get the price
       const eventResponse = await fetch(
         `${BACKEND_ROUTES.eventsService}/api/v1/events/${booking.event_id}`,
@@ -124,6 +142,7 @@ export async function POST(request: Request) {
           booking_id: bookingId,
         },
         mode: 'payment',
+        expires_at: checkoutExpiresAt,
         success_url: `${origin}/book/${bookingId}/success?session_id={CHECKOUT_SESSION_ID}`,
         cancel_url: `${origin}/my-events`,
       });
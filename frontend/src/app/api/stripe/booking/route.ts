@@ -1,6 +1,9 @@
 import { NextResponse } from 'next/server';
 import { stripe } from '@/lib/stripe';
 
+// Stripe's minimum checkout session lifetime
+const CHECKOUT_SESSION_TTL_SECONDS = 30 * 60;
+
 export async function POST(request: Request) {
   try {
     if (!stripe) {
@@ -41,6 +44,9 @@ export async function POST(request: Request) {
         booking_id: bookingId,
       },
       mode: 'payment',
+      // Pending bookings expire after PENDING_BOOKING_TTL_SECONDS (35 min) in the ticket service;
+      // checkout has to close before that so nobody pays for an expired booking
+      expires_at: Math.floor(Date.now() / 1000) + CHECKOUT_SESSION_TTL_SECONDS,
       success_url: successUrl || `${origin}/book/${bookingId}/success?session_id={CHECKOUT_SESSION_ID}`,
       cancel_url: `${origin}/my-events`,
     });
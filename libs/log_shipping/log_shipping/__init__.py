@@ -0,0 +1,5 @@
+"""Background shipping of service logs to the logging service's RabbitMQ queue."""
+from .handler import LogShippingHandler
+from .shipper import LogShipper
+
+__all__ = ["LogShipper", "LogShippingHandler"]
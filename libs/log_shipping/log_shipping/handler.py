@@ -0,0 +1,40 @@
+import logging
+from datetime import datetime
+
+from .shipper import LogShipper
+
+
+class LogShippingHandler(logging.Handler):
+    """
+    Ships standard library log records through a LogShipper, for services
+    that log with the logging module. A `transaction_id` passed in `extra`
+    is sent along. Records from pika and from this package are skipped,
+    since shipping them would feed back into the shipper.
+    """
+
+    IGNORED_LOGGERS = ("pika", "log_shipping")
+
+    def __init__(self, shipper: LogShipper, service_name: str, level: int = logging.INFO):
+        super().__init__(level)
+        self.shipper = shipper
+        self.service_name = service_name
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if record.name.split(".")[0] in self.IGNORED_LOGGERS:
+            return
+        try:
+            payload = {
+                "service_name": self.service_name,
+                "level": record.levelname,
+                "message": record.getMessage(),
+                "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
+                "logger": record.name
+            }
+            transaction_id = getattr(record, "transaction_id", None)
+            if transaction_id:
+                payload["transaction_id"] = transaction_id
+            if record.exc_info:
+                payload["exception"] = logging.Formatter().formatException(record.exc_info)
+            self.shipper.ship(payload)
+        except Exception:
+            self.handleError(record)
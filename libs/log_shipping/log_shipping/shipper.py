@@ -0,0 +1,235 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+import pika
+from prometheus_client import Counter, Gauge
+
+LOGS_SHIPPED = Counter(
+    'log_shipper_published_total',
+    'Log records published to the logging queue'
+)
+LOGS_DROPPED = Counter(
+    'log_shipper_dropped_total',
+    'Log records dropped before reaching the logging queue, by reason (overflow, shutdown, unserializable)',
+    ['reason']
+)
+LOG_PUBLISH_ERRORS = Counter(
+    'log_shipper_publish_errors_total',
+    'Failed attempts to publish a batch of log records'
+)
+LOGS_BUFFERED = Gauge(
+    'log_shipper_buffered_records',
+    'Log records waiting in the buffer to be published'
+)
+
+PERSISTENT = pika.BasicProperties(delivery_mode=2, content_type='application/json')
+
+
+class LogShipper:
+    """
+    Ships log records to the logging service's RabbitMQ queue from a
+    background thread, so logging never waits on the broker.
+
+    `ship()` serializes the record and appends it to a ring buffer of
+    `capacity` records; when the buffer is full the oldest record is
+    dropped. The thread publishes the buffered records in batches of up to
+    `batch_size`, at least every `flush_interval` seconds, over one
+    long-lived connection, and reconnects with backoff when the broker is
+    unavailable. `close()`, also registered to run at interpreter exit,
+    publishes what is left within `shutdown_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        parameters: pika.ConnectionParameters,
+        queue: str,
+        capacity: int = 10000,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        shutdown_timeout: float = 5.0,
+        max_retry_delay: float = 30.0
+    ):
+        self.parameters = parameters
+        self.queue = queue
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.shutdown_timeout = shutdown_timeout
+        self.max_retry_delay = max_retry_delay
+
+        self._buffer: Deque[bytes] = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._closed = False
+        self._exit_hook_registered = False
+        # Only used by the shipper thread
+        self._connection = None
+        self._channel = None
+
+    @classmethod
+    def from_env(cls, **kwargs) -> "LogShipper":
+        """Shipper for the RABBITMQ_HOST/PORT/USER/PASS broker and the RABBITMQ_QUEUE queue"""
+        parameters = pika.ConnectionParameters(
+            host=os.getenv("RABBITMQ_HOST", "localhost"),
+            port=int(os.getenv("RABBITMQ_PORT", "5672")),
+            credentials=pika.PlainCredentials(
+                os.getenv("RABBITMQ_USER", "guest"),
+                os.getenv("RABBITMQ_PASS", "guest")
+            )
+        )
+        return cls(parameters, os.getenv("RABBITMQ_QUEUE", "logs_queue"), **kwargs)
+
+    def ship(self, record: Dict[str, Any]) -> None:
+        """
+        Queue a log record (service_name, level, message and any extra fields)
+        for publishing. A `timestamp` is added if the record has none. Never
+        blocks on the broker and never raises because of it.
+        """
+        try:
+            body = json.dumps({"timestamp": datetime.utcnow().isoformat(), **record}, default=str).encode()
+        except (TypeError, ValueError):
+            LOGS_DROPPED.labels(reason="unserializable").inc()
+            return
+
+        with self._condition:
+            if self._closed:
+                LOGS_DROPPED.labels(reason="shutdown").inc()
+                return
+            self._ensure_started()
+            if len(self._buffer) >= self.capacity:
+                self._buffer.popleft()
+                LOGS_DROPPED.labels(reason="overflow").inc()
+            self._buffer.append(body)
+            LOGS_BUFFERED.set(len(self._buffer))
+            if len(self._buffer) >= self.batch_size:
+                self._condition.notify()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Publish the buffered records and stop the shipper thread, giving up
+        after `timeout` seconds (`shutdown_timeout` by default). Records still
+        buffered then are dropped. Blocks, so async callers should run it in a
+        thread.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread if self._pid == os.getpid() else None
+            self._condition.notify()
+
+        if thread is not None:
+            thread.join(self.shutdown_timeout if timeout is None else timeout)
+
+        with self._condition:
+            if self._buffer:
+                print(f"Dropping {len(self._buffer)} log record(s) not shipped before shutdown")
+                LOGS_DROPPED.labels(reason="shutdown").inc(len(self._buffer))
+                self._buffer.clear()
+                LOGS_BUFFERED.set(0)
+
+    def _ensure_started(self) -> None:
+        # Called with the lock held. Threads don't survive a fork, so a forked
+        # worker starts its own thread; the parent ships what it had buffered.
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        if self._pid is not None:
+            self._buffer.clear()
+            self._connection = None
+            self._channel = None
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name="log-shipper", daemon=True)
+        self._thread.start()
+        if not self._exit_hook_registered:
+            atexit.register(self.close)
+            self._exit_hook_registered = True
+
+    def _run(self) -> None:
+        retry_delay = 1.0
+        while True:
+            with self._condition:
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._condition.wait(self.flush_interval)
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                LOGS_BUFFERED.set(len(self._buffer))
+                closing = self._closed
+
+            if not batch:
+                if closing:
+                    self._disconnect()
+                    return
+                self._keep_alive()
+                continue
+
+            try:
+                self._publish(batch)
+                retry_delay = 1.0
+            except Exception as e:
+                LOG_PUBLISH_ERRORS.inc()
+                if closing:
+                    # Keep retrying briefly until close() gives up on the rest
+                    time.sleep(0.5)
+                    continue
+                print(f"Failed to ship logs, retrying in {retry_delay:.0f}s: {e}")
+                with self._condition:
+                    # close() wakes the thread for a last attempt
+                    self._condition.wait(retry_delay)
+                retry_delay = min(retry_delay * 2, self.max_retry_delay)
+
+    def _publish(self, batch: List[bytes]) -> None:
+        """Publish a batch over the open channel; what wasn't sent goes back to the front of the buffer"""
+        published = 0
+        try:
+            channel = self._open_channel()
+            for body in batch:
+                channel.basic_publish(exchange="", routing_key=self.queue, body=body, properties=PERSISTENT)
+                published += 1
+        except Exception:
+            self._requeue(batch[published:])
+            self._disconnect()
+            raise
+        finally:
+            LOGS_SHIPPED.inc(published)
+
+    def _requeue(self, records: List[bytes]) -> None:
+        with self._condition:
+            self._buffer.extendleft(reversed(records))
+            # Records shipped meanwhile may have filled the buffer; the oldest go first
+            while len(self._buffer) > self.capacity:
+                self._buffer.popleft()
+                LOGS_DROPPED.labels(reason="overflow").inc()
+            LOGS_BUFFERED.set(len(self._buffer))
+
+    def _open_channel(self):
+        if self._connection is None or self._connection.is_closed or self._channel.is_closed:
+            self._disconnect()
+            self._connection = pika.BlockingConnection(self.parameters)
+            self._channel = self._connection.channel()
+            # Declared once per connection rather than per record
+            self._channel.queue_declare(queue=self.queue, durable=True)
+        return self._channel
+
+    def _keep_alive(self) -> None:
+        # A blocking connection only answers broker heartbeats while it processes events
+        if self._connection is None or self._connection.is_closed:
+            return
+        try:
+            self._connection.process_data_events(time_limit=0)
+        except Exception:
+            self._disconnect()
+
+    def _disconnect(self) -> None:
+        if self._connection is not None and self._connection.is_open:
+            try:
+                self._connection.close()
+            except Exception:
+                pass
+        self._connection = None
+        self._channel = None
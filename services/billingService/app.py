@@ -7,6 +7,7 @@ from config import Config
 import time
 from prometheus_client import Counter, Histogram, start_http_server
 from flasgger import Swagger
+from log_shipping import LogShipper, LogShippingHandler
 
 # Import routes
 from routes.refund import refund_bp
@@ -34,6 +35,10 @@ def setup_logging():
         level=getattr(logging, log_level.upper()),
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
+    # Also ship every log record to the logging service, from a background thread
+    logging.getLogger().addHandler(
+        LogShippingHandler(LogShipper.from_env(), "billing_service", level=getattr(logging, log_level.upper()))
+    )
     return logging.getLogger(__name__)
 
 def register_blueprints(app):
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from http import HTTPStatus
 import logging
+import uuid
 from models.booking_payment import BookingPayment
 from models.payment_verification import PaymentVerification
 from models import get_session
@@ -9,6 +10,8 @@ logger = logging.getLogger(__name__)
 
 payments_bp = Blueprint('payments', __name__)
 
+MAX_STATUS_BOOKINGS = 100
+
 @payments_bp.route('/intent/<booking_id>', methods=['GET'])
 def get_payment_intent(booking_id):
     """
@@ -122,3 +125,86 @@ def verify_payment(booking_id):
         return jsonify({
             "error": f"Failed to verify payment: {str(e)}"
         })
+
+@payments_bp.route('/status', methods=['POST'])
+def get_payment_statuses():
+    """
+    Get the latest payment of each of several bookings in one query
+    ---
+    tags:
+      - Payments
+    parameters:
+      - name: body
+        in: body
+        required: true
+        schema:
+          type: object
+          properties:
+            booking_ids:
+              type: array
+              items:
+                type: string
+              example: ["2f1c6c4e-8f0a-4a4b-9d55-0b7f1f8e2a11"]
+    responses:
+      200:
+        description: Payment per booking ID; bookings without a payment map to null
+        schema:
+          type: object
+          properties:
+            success:
+              type: boolean
+              example: true
+            payments:
+              type: object
+              example: {"2f1c6c4e-8f0a-4a4b-9d55-0b7f1f8e2a11": {"status": "succeeded", "payment_intent_id": "pi_3NKzXYC5aBCD1234", "amount": 10000, "currency": "sgd"}}
+      400:
+        description: Missing or invalid booking IDs
+      500:
+        description: Internal server error
+    """
+    data = request.get_json(silent=True) or {}
+    booking_ids = data.get('booking_ids')
+
+    if not isinstance(booking_ids, list) or len(booking_ids) > MAX_STATUS_BOOKINGS:
+        return jsonify({
+            "success": False,
+            "error": f"booking_ids must be a list of at most {MAX_STATUS_BOOKINGS} IDs"
+        }), HTTPStatus.BAD_REQUEST
+
+    try:
+        booking_uuids = [uuid.UUID(str(booking_id)) for booking_id in booking_ids]
+    except ValueError:
+        return jsonify({
+            "success": False,
+            "error": "booking_ids must be valid UUIDs"
+        }), HTTPStatus.BAD_REQUEST
+
+    try:
+        payments = {str(booking_id): None for booking_id in booking_uuids}
+        if booking_uuids:
+            with get_session() as session:
+                rows = session.query(BookingPayment)\
+                    .filter(BookingPayment.booking_id.in_(booking_uuids))\
+                    .order_by(BookingPayment.created_at.asc())\
+                    .all()
+
+                # Oldest first, so each booking ends up with its most recent payment
+                for bookingPayment in rows:
+                    payments[str(bookingPayment.booking_id)] = {
+                        "status": bookingPayment.status,
+                        "payment_intent_id": bookingPayment.payment_intent_id,
+                        "amount": bookingPayment.amount,
+                        "currency": bookingPayment.currency
+                    }
+
+        return jsonify({
+            "success": True,
+            "payments": payments
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting payment statuses: {str(e)}", exc_info=True)
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), HTTPStatus.INTERNAL_SERVER_ERROR
@@ -0,0 +1,201 @@
+"""
+Load benchmark: concurrent booking creation against local stub services.
+
+Starts a stub server in a separate process that plays the events and ticket
+services (each call sleeps STUB_LATENCY_MS), then creates bookings at several
+concurrency levels two ways:
+
+- threadpool: the previous shape, a blocking `requests` chain per booking run
+  on the default worker threadpool (what sync FastAPI handlers use)
+- async: BookingController.create_booking on the shared async HTTP client
+
+RabbitMQ is stubbed too: log records are dropped instead of shipped.
+
+Run from the service root (libs/log_shipping is put on the path, as the
+service image installs it):
+    python -m benchmarks.booking_load_benchmark
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+import anyio
+import requests
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+# Long enough that downstream latency, not local CPU, is the bottleneck
+STUB_LATENCY_MS = int(os.getenv("STUB_LATENCY_MS", "1000"))
+CONCURRENCY_LEVELS = (1, 40, 160)
+ROUNDS_PER_LEVEL = 4  # bookings per level = rounds * concurrency
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+PORT = free_port()
+STUB_URL = f"http://127.0.0.1:{PORT}"
+
+# Settings are read from the environment on import; nothing else is contacted
+for name in ("EVENT_SERVICE_URL", "TICKET_SERVICE_URL", "BILLING_SERVICE_URL",
+             "LOGGING_SERVICE_URL", "NOTIFICATIONS_MICROSERVICE_URL"):
+    os.environ[name] = STUB_URL
+for name in ("FRONTEND_URL", "RABBITMQ_URL", "AWS_COGNITO_REGION", "AWS_ACCESS_KEY_ID",
+             "AWS_SECRET_ACCESS_KEY", "AWS_COGNITO_USER_POOL_ID", "AWS_COGNITO_APP_CLIENT_ID"):
+    os.environ.setdefault(name, "benchmark")
+os.environ.setdefault("RABBITMQ_HOST", "localhost")
+# The shared log shipping client, installed from libs/log_shipping in the service image
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "..", "..", "libs", "log_shipping"))
+os.environ.setdefault("SAGA_DB_PATH", os.path.join(tempfile.mkdtemp(), "sagas.db"))
+# Saturating the stubs is the point here; don't let the circuit breakers cut the run short
+os.environ.setdefault("CIRCUIT_BREAKER_FAILURE_RATE", "1.1")
+os.environ.setdefault("CIRCUIT_BREAKER_SLOW_CALL_RATE", "1.1")
+
+from src.api.endpoints.booking import get_booking_controller  # noqa: E402
+from src.core.http import close_http_client  # noqa: E402
+from src.schemas.booking import BookingCreate  # noqa: E402
+from src.services import logging_service  # noqa: E402
+
+# Keep the report readable: the service modules configure DEBUG logging
+logging.disable(logging.CRITICAL)
+
+# RabbitMQ stub: drop log records instead of starting the shipper thread
+logging_service.log_shipper.ship = lambda record: None
+
+EVENT_ID = str(uuid.uuid4())
+
+
+# -- stub downstream services -------------------------------------------------
+
+async def stub_event(request):
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    return JSONResponse({
+        "id": EVENT_ID,
+        "title": "Benchmark Event",
+        "price": "10.00",
+        "capacity": 0,
+        "startDateTime": "2030-01-01T10:00:00",
+        "endDateTime": "2030-01-01T12:00:00"
+    })
+
+
+async def stub_availability(request):
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    return JSONResponse({"available_tickets": 0, "total_capacity": 0, "booked_tickets": 0})
+
+
+async def stub_create_booking(request):
+    body = await request.json()
+    await asyncio.sleep(STUB_LATENCY_MS / 1000)
+    return JSONResponse({
+        "booking_id": str(uuid.uuid4()),
+        "ticket_quantity": body["ticket_quantity"],
+        "created_at": datetime.utcnow().isoformat()
+    })
+
+
+stub_app = Starlette(routes=[
+    Route("/api/v1/events/{event_id}", stub_event),
+    Route("/api/v1/tickets/event/{event_id}/available", stub_availability),
+    Route("/api/v1/mgmt/bookings/book", stub_create_booking, methods=["POST"]),
+])
+
+
+def run_stub_server() -> None:
+    # Keep-alive outlives the client's idle connections, so reuse never races a server-side close
+    uvicorn.run(
+        stub_app, host="127.0.0.1", port=PORT,
+        log_level="warning", backlog=4096, timeout_keep_alive=75
+    )
+
+
+def start_stub_server() -> multiprocessing.Process:
+    """Run the stubs in their own process so they don't compete for this one's GIL"""
+    process = multiprocessing.Process(target=run_stub_server, daemon=True)
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", PORT), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+
+
+# -- the two booking paths ----------------------------------------------------
+
+def booking_details() -> BookingCreate:
+    return BookingCreate(
+        event_id=EVENT_ID,
+        user_id=str(uuid.uuid4()),
+        ticket_quantity=2,
+        email="bench@example.com"
+    )
+
+
+def blocking_booking_chain(details: BookingCreate) -> None:
+    """Previous sync flow: event -> availability -> create, each a fresh blocking call"""
+    requests.get(f"{STUB_URL}/api/v1/events/{details.event_id}", timeout=10).raise_for_status()
+    requests.get(f"{STUB_URL}/api/v1/tickets/event/{details.event_id}/available", timeout=10).raise_for_status()
+    requests.post(
+        f"{STUB_URL}/api/v1/mgmt/bookings/book",
+        json={"event_id": details.event_id, "ticket_quantity": details.ticket_quantity, "total_amount": 20.0},
+        timeout=10
+    ).raise_for_status()
+
+
+async def run_level(concurrency: int, one_booking) -> float:
+    """Create ROUNDS_PER_LEVEL * concurrency bookings with `concurrency` in flight; returns bookings/sec"""
+    total = remaining = ROUNDS_PER_LEVEL * concurrency
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await one_booking()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return total / (time.perf_counter() - started)
+
+
+async def main():
+    stub_server = start_stub_server()
+    controller = get_booking_controller()
+
+    async def threadpool_booking():
+        await anyio.to_thread.run_sync(blocking_booking_chain, booking_details())
+
+    async def async_booking():
+        await controller.create_booking(booking_details(), auth_token="Bearer benchmark")
+
+    # Warm up both paths (and check the async one actually works end to end)
+    await threadpool_booking()
+    await async_booking()
+
+    workers = anyio.to_thread.current_default_thread_limiter().total_tokens
+    print(f"stub latency {STUB_LATENCY_MS} ms per call, 3 calls per booking, "
+          f"{ROUNDS_PER_LEVEL} x concurrency bookings per level, threadpool size {workers}")
+    print(f"{'concurrency':>11} {'threadpool/s':>14} {'async/s':>10}")
+    for concurrency in CONCURRENCY_LEVELS:
+        threaded = await run_level(concurrency, threadpool_booking)
+        native = await run_level(concurrency, async_booking)
+        print(f"{concurrency:>11} {threaded:>14.1f} {native:>10.1f}")
+
+    await close_http_client()
+    stub_server.terminate()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
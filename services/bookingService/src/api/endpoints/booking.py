@@ -1,15 +1,20 @@
 from fastapi import APIRouter, HTTPException, Depends, Path, Query, Security, Header, Body
 from typing import Optional, List
+import asyncio
 import uuid
 from ...schemas.booking import BookingCreate, BookingResponse, BookingStatus
 from ...services.event_service import EventService
 from ...services.ticket_service import TicketService
 from ...services.billing_service import BillingService, BillingServiceException
-from ...services.notification_service import NotificationService
+from ...services.notification_queue import NotificationQueue, notification_queue
+from ...services.booking_saga import CREATE_BOOKING_SAGA, create_booking_saga
+from ...core.saga import SagaEngine, get_saga_engine
 from ...services.logging_service import LoggingService
 from ...core.logging import logger
 from ...core.auth import validate_token
+from ...core.circuit_breaker import DependencyUnavailableError
 from datetime import datetime
+from functools import lru_cache
 from pydantic import BaseModel
 from ...core.config import get_settings
 import logging
@@ -34,19 +39,22 @@ class BookingController:
         event_service: EventService,
         ticket_service: TicketService,
         billing_service: BillingService,
-        notification_service: NotificationService,
-        logging_service: LoggingService
+        notification_queue: NotificationQueue,
+        logging_service: LoggingService,
+        saga_engine: SagaEngine
     ):
         self.event_service = event_service
         self.ticket_service = ticket_service
         self.billing_service = billing_service
-        self.notification_service = notification_service
+        self.notification_queue = notification_queue
         self.logging_service = logging_service
+        self.saga_engine = saga_engine
 
-    def create_booking(
+    async def create_booking(
         self,
         booking_details: BookingCreate,
-        auth_token: str
+        auth_token: str,
+        idempotency_key: Optional[str] = None
     ) -> BookingResponse:
         """Create a new booking with proper orchestration of all services"""
         error = None
@@ -59,8 +67,20 @@ class BookingController:
                 transaction_id=transaction_id
             )
             
-            # 2. Get event details and safely convert price once
-            event = self.event_service.get_event(booking_details.event_id)
+            # 2-3. Event details and ticket availability only depend on the request,
+            # so fetch them concurrently
+            event, availability = await asyncio.gather(
+                self.event_service.get_event(booking_details.event_id),
+                self.ticket_service.get_available_tickets(
+                    event_id=booking_details.event_id,
+                    auth_token=auth_token
+                ),
+                return_exceptions=True
+            )
+
+            # 2. Check the event first so a missing event still reports 404, then safely convert price once
+            if isinstance(event, BaseException):
+                raise event
             if not event:
                 self.logging_service.log_error(
                     "Event not found",
@@ -81,10 +101,8 @@ class BookingController:
                 raise HTTPException(status_code=400, detail="Invalid price or capacity format in event data")
 
             # 3. Check ticket availability
-            availability = self.ticket_service.get_available_tickets(
-                event_id=booking_details.event_id,
-                auth_token=auth_token
-            )
+            if isinstance(availability, BaseException):
+                raise availability
 
             available_tickets = int(availability["available_tickets"])
             total_capacity = int(availability["total_capacity"])
@@ -106,51 +124,31 @@ class BookingController:
                         detail=f"Only {available_tickets} tickets available"
                     )
 
-            # 4. Create booking record
-            booking = self.ticket_service.create_booking(
-                event_id=booking_details.event_id,
-                user_id=booking_details.user_id,
-                ticket_quantity=booking_details.ticket_quantity,
-                total_amount=price * booking_details.ticket_quantity,
-                auth_token=auth_token,
-                email=booking_details.email
+            # Free events are confirmed right away; their email goes to the token's address
+            user_email = (await validate_token(auth_token)).get("email") if price == 0 else None
+
+            # 4-6. Create the booking, auto-confirm it if the event is free, then (off the
+            # request path) queue the confirmation email. Progress is persisted, so a crash
+            # mid-way is resumed or compensated by the saga engine instead of leaving an orphan.
+            saga = await self.saga_engine.run(
+                CREATE_BOOKING_SAGA,
+                {
+                    "transaction_id": transaction_id,
+                    "idempotency_key": idempotency_key or transaction_id,
+                    "event_id": booking_details.event_id,
+                    "user_id": booking_details.user_id,
+                    "ticket_quantity": booking_details.ticket_quantity,
+                    "total_amount": price * booking_details.ticket_quantity,
+                    "price": price,
+                    "email": booking_details.email,
+                    "user_email": user_email,
+                    "event_title": event["title"],
+                    "event_start_datetime": event["startDateTime"],
+                    "event_end_datetime": event["endDateTime"]
+                },
+                credentials=auth_token
             )
-
-            # 5. If event is free, auto-confirm the booking
-            if price == 0:
-                self.ticket_service.update_booking_status(
-                    booking_id=booking["booking_id"],
-                    status=BookingStatus.CONFIRMED.value,
-                    auth_token=auth_token
-                )
-
-                # 4. Get user details from token claims
-                claims = validate_token(auth_token)
-                user_email = claims.get("email")  # Get email from token claims
-
-                # Send confirmation for free event
-                try:
-                    self.notification_service.send_booking_confirmation(
-                        booking_id=booking["booking_id"],
-                        customer_email=user_email,
-                        event_name=event["title"],
-                        ticket_quantity=booking["ticket_quantity"],
-                        total_amount=0,
-                        event_start_datetime=event["startDateTime"],
-                        event_end_datetime=event["endDateTime"]
-                    )
-                    self.logging_service.log_email_sent(
-                        booking_id=booking["booking_id"],
-                        transaction_id=transaction_id,
-                        email=user_email
-                    )
-                except Exception as e:
-                    self.logging_service.log_error(
-                        f"Error sending free event confirmation: {str(e)}",
-                        transaction_id=transaction_id,
-                        booking_id=booking["booking_id"],
-                        email=user_email
-                    )
+            booking = saga["booking"]
 
             return BookingResponse(
                 status=BookingStatus.CONFIRMED.value if price == 0 else BookingStatus.PENDING.value,
@@ -187,33 +185,90 @@ class BookingController:
                     transaction_id=transaction_id
                 )
 
-    def get_booking(self, booking_id: str, auth_token: str = None) -> dict:
+    async def get_booking(self, booking_id: str, auth_token: str = None) -> dict:
         """Get booking details"""
         try:
-            booking = self.ticket_service.get_booking(booking_id, auth_token)
+            booking = await self.ticket_service.get_booking(booking_id, auth_token)
             return booking
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting booking: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    def get_user_bookings(self, user_id: str) -> List[dict]:
+    async def get_user_bookings(self, user_id: str, authorization: str) -> List[dict]:
         """Get all bookings for a user"""
         try:
-            return self.ticket_service.get_user_bookings(user_id)
+            return await self.ticket_service.get_user_bookings(user_id, auth_token=authorization)
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             logger.error(f"Error getting bookings for user {user_id}: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    def confirm_booking(
+    async def get_user_booking_details(self, user_id: str, authorization: str) -> List[dict]:
+        """
+        Get all bookings for a user joined with their event and payment.
+
+        Events and payments are resolved with one batched call to each service
+        (made concurrently), however many bookings the user has. If either
+        service is unavailable the bookings are still returned, with `event` or
+        `payment` left as None.
+        """
+        bookings = await self.get_user_bookings(user_id, authorization)
+        if not bookings:
+            return []
+
+        event_ids = []
+        for booking in bookings:
+            try:
+                event_ids.append(str(uuid.UUID(str(booking["event_id"]))))
+            except (KeyError, ValueError):
+                logger.warning(f"Booking {booking.get('booking_id')} has an invalid event ID")
+
+        events, payments = await asyncio.gather(
+            self.event_service.get_events(event_ids),
+            self.billing_service.get_payment_statuses([str(booking["booking_id"]) for booking in bookings]),
+            return_exceptions=True
+        )
+        if isinstance(events, BaseException):
+            logger.error(f"Error fetching events for user {user_id}'s bookings: {str(events)}")
+            events = {}
+        if isinstance(payments, BaseException):
+            logger.error(f"Error fetching payments for user {user_id}'s bookings: {str(payments)}")
+            payments = {}
+
+        details = []
+        for booking in bookings:
+            try:
+                event = events.get(str(uuid.UUID(str(booking.get("event_id")))))
+            except ValueError:
+                event = None
+            details.append({
+                **booking,
+                "event": event,
+                "payment": payments.get(str(booking["booking_id"]))
+            })
+        return details
+
+    async def confirm_booking(
         self,
         booking_id: str,
         payment_confirmation: PaymentConfirmation,
-        authorization: str
+        authorization: str,
+        booking: Optional[dict] = None,
+        event: Optional[dict] = None
     ) -> BookingResponse:
-        """Confirm a booking after successful payment"""
+        """
+        Confirm a booking after successful payment.
+
+        Callers that already fetched the booking and its event pass them in so
+        they aren't fetched again.
+        """
         try:
             # 1. Get booking details
-            booking = self.ticket_service.get_booking(booking_id, authorization)
+            if booking is None:
+                booking = await self.ticket_service.get_booking(booking_id, authorization)
             if not booking:
                 self.logging_service.log_error(
                     "Booking not found",
@@ -223,15 +278,20 @@ class BookingController:
                 )
                 raise HTTPException(status_code=404, detail="Booking not found")
 
-            # 2. Update booking status
-            self.ticket_service.update_booking_status(
+            # 2-3. Update booking status, fetching event details alongside if we don't have them
+            status_update = self.ticket_service.update_booking_status(
                 booking_id=booking_id,
                 status=BookingStatus.CONFIRMED.value,
                 auth_token=authorization
             )
+            if event is None:
+                _, event = await asyncio.gather(
+                    status_update,
+                    self.event_service.get_event(booking["event_id"])
+                )
+            else:
+                await status_update
 
-            # 3. Get event details
-            event = self.event_service.get_event(booking["event_id"])
             if not event:
                 self.logging_service.log_error(
                     "Event not found",
@@ -242,15 +302,15 @@ class BookingController:
                 raise HTTPException(status_code=404, detail="Event not found")
 
             # 4. Get user details from token claims
-            claims = validate_token(authorization)
+            claims = await validate_token(authorization)
             user_email = claims.get("email")  # Get email from token claims
             if not user_email:
                 logger.error("No email found in token claims")
                 raise HTTPException(status_code=400, detail="User email not found")
 
-            # 5. Send confirmation notification
+            # 5. Queue confirmation notification; the notification worker sends it
             try:
-                self.notification_service.send_booking_confirmation(
+                await self.notification_queue.enqueue_booking_confirmation(
                     booking_id=booking_id,
                     customer_email=user_email,  # Use email from token claims
                     event_name=event["title"],
@@ -258,17 +318,11 @@ class BookingController:
                     total_amount=float(payment_confirmation.amount) / 100,  # Amount from payment confirmation
                     event_start_datetime=event["startDateTime"],
                     event_end_datetime=event["endDateTime"],
+                    transaction_id=booking_id
                 )
-                
-                self.logging_service.log_email_sent(
-                    booking_id=booking_id,
-                    transaction_id=booking_id,
-                    email=user_email
-                )
-                
             except Exception as e:
                 self.logging_service.log_error(
-                    f"Error sending confirmation email",
+                    f"Error queueing confirmation email",
                     transaction_id=booking_id,
                     booking_id=booking_id,
                     email=user_email,
@@ -307,54 +361,60 @@ class BookingController:
             )
             raise HTTPException(status_code=500, detail=str(e))
 
-    def create_payment_session(self, booking_id: str, event: dict, quantity: int) -> dict:
+    async def create_payment_session(self, booking_id: str, event: dict, quantity: int) -> dict:
         """Create a payment session for a booking"""
         amount = float(event["price"]) * quantity
-        return self.billing_service.create_payment_session(
+        return await self.billing_service.create_payment_session(
             booking_id=booking_id,
             amount=amount,
             event_title=event["name"],
             quantity=quantity
         )
 
-    def verify_payment(self, booking_id: str) -> tuple[bool, Optional[str]]:
+    async def verify_payment(self, booking_id: str) -> tuple[bool, Optional[str]]:
         """Verify payment status for a booking"""
-        return self.billing_service.verify_payment_completed(booking_id)
+        return await self.billing_service.verify_payment_completed(booking_id)
 
 # Dependency Injection
+@lru_cache()
 def get_booking_controller():
+    """One controller (and set of service clients) per process, shared by every request"""
     event_service = EventService()
     ticket_service = TicketService()
     billing_service = BillingService()
-    notification_service = NotificationService()
     logging_service = LoggingService("booking_service")
+    saga_engine = get_saga_engine()
+    saga_engine.register(create_booking_saga(ticket_service, notification_queue))
     return BookingController(
         event_service,
         ticket_service,
         billing_service,
-        notification_service,
-        logging_service
+        notification_queue,
+        logging_service,
+        saga_engine
     )
 
 # API Routes
 @router.post("/bookings", response_model=BookingResponse)
-def create_booking(
+async def create_booking(
     booking_details: BookingCreate,
     authorization: str = Header(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
     controller: BookingController = Depends(get_booking_controller)
 ):
-    """Create a new booking"""
+    """Create a new booking. An optional Idempotency-Key header is forwarded to the ticket service."""
     try:
         # Validate the token and get claims
-        claims = validate_token(authorization)
+        claims = await validate_token(authorization)
         
         # Log the token and claims for debugging
         logger.debug(f"Using auth token: {authorization[:20]}...")
         logger.debug(f"Token claims: {claims}")
         
-        return controller.create_booking(
+        return await controller.create_booking(
             booking_details=booking_details,
-            auth_token=authorization  # Pass the full Bearer token
+            auth_token=authorization,  # Pass the full Bearer token
+            idempotency_key=idempotency_key
         )
     except HTTPException:
         raise
@@ -363,7 +423,7 @@ def create_booking(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/bookings/{booking_id}")
-def get_booking(
+async def get_booking(
     booking_id: str = Path(..., description="The ID of the booking to retrieve"),
     authorization: str = Header(None),
     controller: BookingController = Depends(get_booking_controller)
@@ -371,9 +431,9 @@ def get_booking(
     """Get booking details"""
     try:
         if authorization:
-            claims = validate_token(authorization)
+            claims = await validate_token(authorization)
             logger.debug(f"Token claims for get_booking: {claims}")
-        return controller.get_booking(booking_id, authorization)
+        return await controller.get_booking(booking_id, authorization)
     except HTTPException:
         raise
     except Exception as e:
@@ -381,43 +441,66 @@ def get_booking(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/bookings/user/{user_id}")
-def get_user_bookings(
+async def get_user_bookings(
     user_id: str = Path(..., description="The ID of the user"),
     authorization: str = Header(...),
     controller: BookingController = Depends(get_booking_controller)
 ):
     """Get all bookings for a user"""
     try:
-        claims = validate_token(authorization)
+        claims = await validate_token(authorization)
         logger.debug(f"Token claims: {claims}")
         logger.debug(f"Requested user_id: {user_id}")
         logger.debug(f"User ID from token (custom:id): {claims.get('custom:id')}")
         
         if claims.get('custom:id') != user_id:
             raise HTTPException(status_code=403, detail="Not authorized to view these bookings")
-        return controller.get_user_bookings(user_id)
+        return await controller.get_user_bookings(user_id, authorization)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error getting user bookings: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/bookings/user/{user_id}/details")
+async def get_user_booking_details(
+    user_id: str = Path(..., description="The ID of the user"),
+    authorization: str = Header(...),
+    controller: BookingController = Depends(get_booking_controller)
+):
+    """Get all bookings for a user with each booking's event details and payment status"""
+    try:
+        claims = await validate_token(authorization)
+        if claims.get('custom:id') != user_id:
+            raise HTTPException(status_code=403, detail="Not authorized to view these bookings")
+        return await controller.get_user_booking_details(user_id, authorization)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting user booking details: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.post("/bookings/{booking_id}/confirm")
-def confirm_booking(
+async def confirm_booking(
     booking_id: str = Path(..., description="The ID of the booking to confirm"),
     session_id: str = Query(..., description="The Stripe session ID"),
     authorization: str = Header(...),
     booking_controller: BookingController = Depends(get_booking_controller)
 ):
     """Confirm a booking after successful payment"""
+    payment_check = None
     try:
         # Validate the token and get claims
-        claims = validate_token(authorization)
+        claims = await validate_token(authorization)
         logger.debug(f"Using auth token: {authorization}")
         logger.debug(f"Token claims: {claims}")
 
+        # Payment status only depends on the booking ID, so verify it with billing
+        # while the booking and then its event are fetched
+        payment_check = asyncio.create_task(booking_controller.verify_payment(booking_id))
+
         # Get the booking to verify ownership
-        booking = booking_controller.get_booking(booking_id, authorization)
+        booking = await booking_controller.get_booking(booking_id, authorization)
         if not booking:
             booking_controller.logging_service.log_error(
                 "Booking not found during confirmation",
@@ -451,7 +534,7 @@ def confirm_booking(
             raise HTTPException(status_code=403, detail="Not authorized to confirm this booking")
 
         # Get event details to verify the amount
-        event = booking_controller.event_service.get_event(booking["event_id"])
+        event = await booking_controller.event_service.get_event(booking["event_id"])
         if not event:
             booking_controller.logging_service.log_error(
                 "Event not found during confirmation",
@@ -472,8 +555,7 @@ def confirm_booking(
         )
 
         # Verify payment completion before confirming
-
-        is_paid, error = booking_controller.verify_payment(booking_id)
+        is_paid, error = await payment_check
         if not is_paid:
             booking_controller.logging_service.log_error(
                 f"Payment verification failed",
@@ -484,11 +566,23 @@ def confirm_booking(
             )
             raise HTTPException(status_code=400, detail=f"Payment verification failed: {error}")
 
+        # The booking expired (or was canceled) while the user was still paying, so there is
+        # no ticket to confirm any more; give the money back instead of keeping it
+        if booking["status"] == BookingStatus.CANCELED.value:
+            try:
+                await booking_controller.billing_service.refund_unfulfilled_payment(booking_id)
+                detail = "Booking expired before payment completed; the payment has been refunded"
+            except BillingServiceException:
+                detail = "Booking expired before payment completed; the payment could not be refunded automatically"
+            raise HTTPException(status_code=409, detail=detail)
+
         # Call the controller's confirm_booking method
-        result = booking_controller.confirm_booking(
+        result = await booking_controller.confirm_booking(
             booking_id=booking_id,
             payment_confirmation=payment_confirmation,
-            authorization=authorization
+            authorization=authorization,
+            booking=booking,
+            event=event
         )
 
         return result
@@ -520,6 +614,10 @@ def confirm_booking(
             session_id=session_id
         )
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Nothing left to wait for if we bailed out before the payment check was needed
+        if payment_check is not None:
+            payment_check.cancel()
 
 @router.post("/{booking_id}/cancel")
 async def cancel_booking(
@@ -529,7 +627,7 @@ async def cancel_booking(
 ) -> dict:
     try:
         # Validate the token and get claims
-        claims = validate_token(authorization)
+        claims = await validate_token(authorization)
         user_id = claims.get("custom:id")
 
         # Log cancellation attempt
@@ -543,7 +641,7 @@ async def cancel_booking(
         )
 
         # Get booking
-        booking = controller.get_booking(booking_id, authorization)
+        booking = await controller.get_booking(booking_id, authorization)
         if not booking:
             controller.logging_service.log_error(
                 "Booking not found during cancellation",
@@ -588,6 +686,8 @@ async def cancel_booking(
         )
         
         return {"message": "Booking canceled successfully"}
+    except DependencyUnavailableError:
+        raise
     except Exception as e:
         controller.logging_service.log_error(
             f"Error canceling booking",
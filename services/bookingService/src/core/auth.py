@@ -1,12 +1,18 @@
 from fastapi import HTTPException, Security, Depends, Header
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from jose import jwt, JWTError
-import requests
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+from collections import OrderedDict
+import asyncio
+import hashlib
+import threading
 import time
 import os
 import logging
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
+from .http import get_http_client
+from .request_memo import memoize
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -35,68 +41,158 @@ security = HTTPBearer()
 _jwks_cache: Dict = {}
 _jwks_cache_timestamp = 0
 JWKS_CACHE_DURATION = 3600  # Cache JWKS for 1 hour
+JWKS_MIN_REFRESH_INTERVAL = 60  # Unknown kids can't make us refetch more often than this
+JWKS_FETCH_TIMEOUT = 10
+# The fetch in flight, shared by every request that finds the cache stale
+_jwks_fetch: Optional["asyncio.Future[dict]"] = None
+
+# Public keys constructed from the JWKS, by kid
+_keys_by_kid: Dict[str, Key] = {}
+
+# Verified claims by token hash, each dropped once the token expires
+CLAIMS_CACHE_MAX_ENTRIES = int(os.getenv("JWT_CLAIMS_CACHE_MAX_ENTRIES", "10000"))
+_claims_cache: "OrderedDict[str, Tuple[dict, float]]" = OrderedDict()
+_claims_cache_lock = threading.Lock()
+
+async def get_jwks(force_refresh: bool = False) -> dict:
+    """
+    Fetch and cache the JWKS from Cognito.
+
+    The fetch goes through the shared async HTTP client so it never blocks the
+    event loop, and callers arriving while one is in flight wait for that one
+    instead of starting their own.
+    """
+    global _jwks_fetch
+    age = time.time() - _jwks_cache_timestamp
 
-def get_jwks() -> dict:
-    """Fetch and cache the JWKS from Cognito"""
-    global _jwks_cache, _jwks_cache_timestamp
-    current_time = time.time()
-    
     # Return cached JWKS if still valid
-    if _jwks_cache and (current_time - _jwks_cache_timestamp) < JWKS_CACHE_DURATION:
+    if _jwks_cache and age < JWKS_CACHE_DURATION and not (force_refresh and age >= JWKS_MIN_REFRESH_INTERVAL):
         return _jwks_cache
-    
-    # Fetch new JWKS
+
+    if _jwks_fetch is None or _jwks_fetch.done():
+        _jwks_fetch = asyncio.ensure_future(_fetch_jwks())
+    # Shielded so one caller being cancelled doesn't cancel the fetch for the others
+    return await asyncio.shield(_jwks_fetch)
+
+async def _fetch_jwks() -> dict:
+    global _jwks_cache, _jwks_cache_timestamp
     jwks_url = f"{COGNITO_DOMAIN}/.well-known/jwks.json"
     logger.debug(f"Fetching JWKS from: {jwks_url}")
-    response = requests.get(jwks_url)
+    response = await get_http_client(COGNITO_DOMAIN).get(jwks_url, timeout=JWKS_FETCH_TIMEOUT)
     if response.status_code != 200:
         logger.error(f"Failed to fetch JWKS: {response.status_code} - {response.text}")
         raise HTTPException(status_code=500, detail="Failed to fetch JWKS")
-    
+
     _jwks_cache = response.json()
-    _jwks_cache_timestamp = current_time
+    _jwks_cache_timestamp = time.time()
     logger.debug("JWKS fetched and cached successfully")
     return _jwks_cache
 
-def get_key(kid: str) -> Optional[str]:
-    """Get the public key from JWKS matching the key ID"""
-    import base64
-    import struct
-    from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicNumbers
-    from cryptography.hazmat.primitives import serialization
-    from cryptography.hazmat.backends import default_backend
-
-    jwks = get_jwks()
-    for key_data in jwks.get("keys", []):
-        if key_data.get("kid") == kid:
-            logger.debug(f"Found matching key for kid: {kid}")
-            
-            # Get the key components
-            e = base64.urlsafe_b64decode(key_data['e'] + '===')
-            n = base64.urlsafe_b64decode(key_data['n'] + '===')
-            
-            # Convert the exponent
-            e_val = int.from_bytes(e, 'big')
-            
-            # Convert the modulus
-            n_val = int.from_bytes(n, 'big')
-            
-            # Create the public key
-            pub_numbers = RSAPublicNumbers(e_val, n_val)
-            pub_key = pub_numbers.public_key(backend=default_backend())
-            
-            # Get the PEM format of the public key
-            pem = pub_key.public_bytes(
-                encoding=serialization.Encoding.PEM,
-                format=serialization.PublicFormat.SubjectPublicKeyInfo
-            )
-            
-            return pem.decode('utf-8')
-            
+async def get_key(kid: str) -> Optional[Key]:
+    """Get the public key matching the key ID, constructing it only the first time the kid is seen"""
+    key = _keys_by_kid.get(kid)
+    if key is not None:
+        return key
+
+    # A kid we haven't seen may mean Cognito rotated its keys since the JWKS was cached
+    for force_refresh in (False, True):
+        for key_data in (await get_jwks(force_refresh)).get("keys", []):
+            if key_data.get("kid") == kid:
+                key = _keys_by_kid[kid] = jwk.construct(key_data, algorithm=key_data.get("alg", "RS256"))
+                logger.debug(f"Constructed public key for kid: {kid}")
+                return key
+
     logger.warning(f"No matching key found for kid: {kid}")
     return None
 
-def validate_token(authorization: str = Header(None)) -> dict:
+def _cached_claims(token_hash: str) -> Optional[dict]:
+    with _claims_cache_lock:
+        entry = _claims_cache.get(token_hash)
+        if entry is None:
+            return None
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            del _claims_cache[token_hash]
+            return None
+        _claims_cache.move_to_end(token_hash)
+        return dict(claims)
+
+def _cache_claims(token_hash: str, claims: dict) -> None:
+    expires_at = claims.get("exp")
+    if not isinstance(expires_at, (int, float)):
+        return
+    with _claims_cache_lock:
+        _claims_cache[token_hash] = (dict(claims), float(expires_at))
+        _claims_cache.move_to_end(token_hash)
+        while len(_claims_cache) > CLAIMS_CACHE_MAX_ENTRIES:
+            _claims_cache.popitem(last=False)
+
+async def _verify_token(token: str) -> dict:
+    """Verify the signature and standard claims of a token (one signature check)"""
+    try:
+        unverified_header = jwt.get_unverified_header(token)
+    except JWTError as e:
+        logger.error(f"Error decoding token header: {str(e)}")
+        raise HTTPException(status_code=401, detail=f"Invalid token format: {str(e)}")
+
+    # Get the signing key
+    try:
+        public_key = await get_key(unverified_header.get("kid"))
+    except Exception as e:
+        logger.error(f"Error getting signing key: {str(e)}")
+        raise HTTPException(status_code=401, detail=f"Error validating token signature: {str(e)}")
+    if not public_key:
+        logger.error("Invalid token signing key")
+        raise HTTPException(status_code=401, detail="Invalid token signing key")
+
+    # Verify and decode the token; the audience rule depends on the token type, so it's checked below
+    try:
+        claims = jwt.decode(
+            token,
+            public_key,
+            algorithms=ALGORITHMS,
+            issuer=COGNITO_DOMAIN,
+            options={
+                "verify_aud": False,
+                "verify_exp": True
+            }
+        )
+    except Exception as e:
+        logger.error(f"Error verifying token: {str(e)}")
+        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+
+    # For access tokens, verify against client_id
+    # For ID tokens, verify against aud
+    if claims.get('token_use') == 'access':
+        if claims.get('client_id') != CLIENT_ID:
+            logger.error(f"Invalid client_id. Expected {CLIENT_ID}, got {claims.get('client_id')}")
+            raise HTTPException(status_code=401, detail="Invalid client_id")
+    else:
+        audience = claims.get('aud')
+        audiences = audience if isinstance(audience, list) else [audience]
+        if CLIENT_ID not in audiences:
+            logger.error(f"Invalid audience. Expected {CLIENT_ID}, got {audience}")
+            raise HTTPException(status_code=401, detail="Invalid token: Invalid audience")
+
+    logger.debug(f"Token verified for custom:id {claims.get('custom:id')}")
+    return claims
+
+async def _load_claims(token: str, token_hash: str) -> dict:
+    claims = _cached_claims(token_hash)
+    if claims is None:
+        claims = await _verify_token(token)
+        _cache_claims(token_hash, claims)
+    return claims
+
+async def validate_token(authorization: str = Header(None)) -> dict:
+    """
+    Verify a Cognito token and return its claims.
+
+    Verified claims are cached by token hash until the token expires, so the
+    repeated calls made while handling one booking (and later requests with
+    the same token) cost a dictionary lookup instead of a signature check.
+    Within a request the claims are memoized as well, see core.request_memo.
+    """
     try:
         if not authorization:
             raise HTTPException(
@@ -107,92 +203,9 @@ def validate_token(authorization: str = Header(None)) -> dict:
         
         # Extract the token - handle both with and without Bearer prefix
         token = authorization.split(" ")[-1]  # Take the last part after any spaces
+        token_hash = hashlib.sha256(token.encode()).hexdigest()
 
-        # First decode without verification to get the header and check format
-        try:
-            unverified_claims = jwt.decode(token, 'dummy_key', options={
-                "verify_signature": False,
-                "verify_aud": False,
-                "verify_exp": False
-            })
-            logger.debug("=== Unverified Token Claims ===")
-            logger.debug(f"Token use: {unverified_claims.get('token_use')}")
-            logger.debug(f"Client ID: {unverified_claims.get('client_id')}")
-            logger.debug(f"Audience: {unverified_claims.get('aud')}")
-            logger.debug(f"Subject (sub): {unverified_claims.get('sub')}")
-            logger.debug(f"custom:id: {unverified_claims.get('custom:id')}")
-            logger.debug(f"Username: {unverified_claims.get('username') or unverified_claims.get('cognito:username')}")
-            
-            # Determine token type and expected audience
-            token_use = unverified_claims.get('token_use')
-            token_aud = unverified_claims.get('aud')
-            client_id = unverified_claims.get('client_id')
-            logger.debug("=== Token Validation Config ===")
-            logger.debug(f"Token type: {token_use}")
-            logger.debug(f"Token audience: {token_aud}")
-            logger.debug(f"Client ID: {client_id}")
-            logger.debug(f"Expected Client ID: {CLIENT_ID}")
-            
-            # For access tokens, verify against client_id
-            # For ID tokens, verify against aud
-            if token_use == 'access':
-                if client_id != CLIENT_ID:
-                    logger.error(f"Invalid client_id. Expected {CLIENT_ID}, got {client_id}")
-                    raise HTTPException(status_code=401, detail="Invalid client_id")
-                expected_audience = None  # Don't verify audience for access tokens
-                verify_aud = False
-                logger.debug("Using access token validation rules")
-            else:
-                expected_audience = CLIENT_ID
-                verify_aud = True
-                logger.debug("Using ID token validation rules")
-            
-            logger.debug(f"Expected audience: {expected_audience}")
-            logger.debug(f"Verify audience: {verify_aud}")
-            
-        except Exception as e:
-            logger.error(f"Error decoding unverified claims: {str(e)}")
-            raise HTTPException(status_code=401, detail=f"Invalid token format: {str(e)}")
-
-        # Get the signing key
-        try:
-            unverified_header = jwt.get_unverified_header(token)
-            logger.debug(f"Token header: {unverified_header}")
-            public_key = get_key(unverified_header.get("kid"))
-            if not public_key:
-                logger.error("Invalid token signing key")
-                logger.debug(f"Available keys in JWKS: {get_jwks()}")
-                raise HTTPException(status_code=401, detail="Invalid token signing key")
-            logger.debug("Found public key")
-        except Exception as e:
-            logger.error(f"Error getting signing key: {str(e)}")
-            raise HTTPException(status_code=401, detail=f"Error validating token signature: {str(e)}")
-        
-        # Verify and decode the token
-        logger.debug(f"Verifying token with issuer: {COGNITO_DOMAIN}")
-        
-        try:
-            claims = jwt.decode(
-                token,
-                public_key,
-                algorithms=ALGORITHMS,
-                audience=expected_audience,
-                issuer=COGNITO_DOMAIN,
-                options={
-                    "verify_aud": verify_aud,
-                    "verify_exp": True
-                }
-            )
-            logger.debug("Token successfully decoded and verified")
-            logger.debug("=== Verified Token Claims ===")
-            logger.debug(f"Token use: {claims.get('token_use')}")
-            logger.debug(f"Subject (sub): {claims.get('sub')}")
-            logger.debug(f"custom:id: {claims.get('custom:id')}")
-            logger.debug(f"Username: {claims.get('username') or claims.get('cognito:username')}")
-            return claims
-        except Exception as e:
-            logger.error(f"Error verifying token: {str(e)}")
-            raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+        return await memoize("token", token_hash, lambda: _load_claims(token, token_hash))
 
     except HTTPException:
         raise
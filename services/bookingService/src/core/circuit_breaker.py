@@ -0,0 +1,197 @@
+"""
+Per-dependency circuit breakers for downstream service calls.
+
+A breaker watches a rolling window of call outcomes. When too many calls
+fail, or too many are slow, it opens and calls fail fast with a 503 instead
+of queueing behind a struggling service. After a cool-down it lets a few
+probe calls through (half-open) and closes again if they all succeed.
+"""
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, List, Optional
+
+import httpx
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge
+
+from .config import get_settings
+from .logging import logger
+
+settings = get_settings()
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+CIRCUIT_STATE = Gauge(
+    'circuit_breaker_state',
+    'Circuit breaker state per dependency (0=closed, 1=half-open, 2=open)',
+    ['dependency']
+)
+CIRCUIT_TRANSITIONS = Counter(
+    'circuit_breaker_transitions_total',
+    'Circuit breaker state transitions per dependency, by the state entered',
+    ['dependency', 'state']
+)
+CIRCUIT_REJECTED = Counter(
+    'circuit_breaker_rejected_total',
+    'Calls failed fast because the dependency circuit was open',
+    ['dependency']
+)
+
+
+class DependencyUnavailableError(HTTPException):
+    """A dependency couldn't be reached or didn't answer in time; answered as 503, not as the caller's fault"""
+
+    def __init__(self, dependency: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(
+            status_code=503,
+            detail=f"{dependency} is temporarily unavailable",
+            headers=headers
+        )
+        self.dependency = dependency
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    """Raised instead of calling a dependency whose circuit is open"""
+
+    def __init__(self, dependency: str, retry_after: float):
+        super().__init__(dependency, headers={"Retry-After": str(max(1, round(retry_after)))})
+
+
+def is_failure(exc: BaseException) -> bool:
+    """Whether an exception says something about the dependency's health (4xx responses don't)"""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500
+    return True
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: int = settings.CIRCUIT_BREAKER_WINDOW_SECONDS,
+        minimum_calls: int = settings.CIRCUIT_BREAKER_MINIMUM_CALLS,
+        failure_rate: float = settings.CIRCUIT_BREAKER_FAILURE_RATE,
+        slow_call_seconds: float = settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+        slow_call_rate: float = settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+        open_seconds: float = settings.CIRCUIT_BREAKER_OPEN_SECONDS,
+        half_open_calls: int = settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+    ):
+        self.name = name
+        self.window_seconds = window_seconds
+        self.minimum_calls = minimum_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = CLOSED
+        self._opened_at = 0.0
+        # One [second, calls, failures, slow calls] bucket per second of the window
+        self._buckets: Deque[List[int]] = deque()
+        self._probes = 0
+        self._probe_successes = 0
+        CIRCUIT_STATE.labels(dependency=name).set(STATE_VALUES[CLOSED])
+
+    # -- state ----------------------------------------------------------------
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning(f"Circuit for {self.name} {self.state} -> {state}")
+        self.state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        elif state == HALF_OPEN:
+            self._probes = self._probe_successes = 0
+        else:
+            self._buckets.clear()
+        CIRCUIT_STATE.labels(dependency=self.name).set(STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(dependency=self.name, state=state).inc()
+
+    def _retry_after(self) -> float:
+        return self._opened_at + self.open_seconds - time.monotonic()
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if the circuit is open; doesn't take a probe slot"""
+        if self.state == OPEN and self._retry_after() > 0:
+            CIRCUIT_REJECTED.labels(dependency=self.name).inc()
+            raise CircuitOpenError(self.name, self._retry_after())
+
+    def _admit(self) -> None:
+        self.check()
+        if self.state == OPEN:
+            self._transition(HALF_OPEN)
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                CIRCUIT_REJECTED.labels(dependency=self.name).inc()
+                raise CircuitOpenError(self.name, 1)
+            self._probes += 1
+
+    # -- outcomes -------------------------------------------------------------
+
+    def _record(self, failed: bool, duration: float) -> None:
+        slow = duration >= self.slow_call_seconds
+
+        if self.state == HALF_OPEN:
+            if failed or slow:
+                self._transition(OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= self.half_open_calls:
+                self._transition(CLOSED)
+            return
+        if self.state == OPEN:
+            # Admitted before the circuit opened; nothing left to decide
+            return
+
+        second = int(time.monotonic())
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += slow
+        while self._buckets[0][0] <= second - self.window_seconds:
+            self._buckets.popleft()
+
+        calls = sum(b[1] for b in self._buckets)
+        if calls < self.minimum_calls:
+            return
+        failures = sum(b[2] for b in self._buckets)
+        slow_calls = sum(b[3] for b in self._buckets)
+        if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+            self._transition(OPEN)
+
+    @asynccontextmanager
+    async def guard(self):
+        """Wrap one call to the dependency: fail fast if open, otherwise record its outcome"""
+        self._admit()
+        started = time.monotonic()
+        try:
+            yield
+        except asyncio.CancelledError:
+            # Tells us nothing about the dependency; give the probe slot back
+            if self.state == HALF_OPEN:
+                self._probes -= 1
+            raise
+        except Exception as e:
+            self._record(is_failure(e), time.monotonic() - started)
+            raise
+        self._record(False, time.monotonic() - started)
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_circuit_breaker(dependency: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a dependency, creating it on first use"""
+    breaker = _breakers.get(dependency)
+    if breaker is None:
+        breaker = _breakers[dependency] = CircuitBreaker(dependency)
+    return breaker
@@ -20,6 +20,46 @@ class Settings(BaseSettings):
     AWS_COGNITO_USER_POOL_ID: str
     AWS_COGNITO_APP_CLIENT_ID: str
 
+    # Downstream HTTP clients (one pool per host)
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 10.0
+    HTTP_POOL_TIMEOUT_SECONDS: float = 5.0
+    HTTP_MAX_CONNECTIONS_PER_HOST: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS_PER_HOST: int = 20
+    HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 4.0
+    NOTIFICATION_TIMEOUT_SECONDS: float = 15.0
+
+    # Circuit breakers (one per downstream dependency)
+    CIRCUIT_BREAKER_WINDOW_SECONDS: int = 30
+    CIRCUIT_BREAKER_MINIMUM_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 3.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 15.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+
+    # Confirmation-email work queue (see src/workers/notification_worker.py)
+    # Topic exchange the ticket service consumes booking status events from
+    BOOKING_EXCHANGE: str = "booking"
+    NOTIFICATION_QUEUE: str = "booking_notifications"
+    NOTIFICATION_MAX_ATTEMPTS: int = 5
+    NOTIFICATION_RETRY_BASE_SECONDS: float = 5.0
+    NOTIFICATION_BATCH_SIZE: int = 20
+    NOTIFICATION_BATCH_WAIT_MS: int = 200
+    NOTIFICATION_RATE_PER_SECOND: float = 10.0
+
+    # Booking sagas (step log in a local SQLite file)
+    SAGA_DB_PATH: str = "booking_sagas.db"
+    SAGA_RESUME_AFTER_SECONDS: int = 60
+    SAGA_RECOVERY_INTERVAL_SECONDS: int = 30
+    SAGA_MAX_ATTEMPTS: int = 5
+    SAGA_RETENTION_HOURS: int = 24
+
+    # Booking availability pre-check cache
+    AVAILABILITY_CACHE_TTL_MS: int = 500
+    AVAILABILITY_CACHE_BYPASS_BELOW: int = 50
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 10000
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,112 @@
+"""
+Shared async HTTP clients for calls to downstream services.
+
+Each downstream host gets one pooled httpx.AsyncClient for the life of the
+process, so connections are kept alive and reused across bookings, and a
+slow or saturated service can only exhaust its own pool. Pool sizes,
+timeouts and keep-alive are configured in Settings.
+"""
+from typing import Dict
+from urllib.parse import urlsplit
+
+import httpx
+from prometheus_client import Counter, Gauge
+
+from .config import get_settings
+
+settings = get_settings()
+
+# Failures where the request never reached (or never got back from) the
+# downstream service; these are retried with backoff like requests'
+# ConnectionError was. A PoolTimeout means no connection was free, so the
+# request was never sent and is safe to retry.
+RETRYABLE_ERRORS = (httpx.NetworkError, httpx.ConnectTimeout, httpx.PoolTimeout, httpx.RemoteProtocolError)
+
+HTTP_POOL_CONNECTIONS = Gauge(
+    'downstream_http_pool_connections',
+    'Open connections in the downstream HTTP pool, by host and state (active/idle)',
+    ['host', 'state']
+)
+HTTP_POOL_LIMIT = Gauge(
+    'downstream_http_pool_max_connections',
+    'Configured connection limit of the downstream HTTP pool',
+    ['host']
+)
+HTTP_REQUESTS = Counter(
+    'downstream_http_requests_total',
+    'Requests sent to downstream services, by host',
+    ['host']
+)
+HTTP_POOL_TIMEOUTS = Counter(
+    'downstream_http_pool_timeouts_total',
+    'Requests that gave up waiting for a free pooled connection, by host',
+    ['host']
+)
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def _host_key(base_url: str) -> str:
+    parts = urlsplit(base_url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _count_connections(pool, idle: bool) -> int:
+    return sum(1 for connection in pool.connections if connection.is_idle() == idle)
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Pooled transport that counts requests and pool timeouts for its host"""
+
+    def __init__(self, host: str, **kwargs):
+        super().__init__(**kwargs)
+        self.host = host
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        HTTP_REQUESTS.labels(host=self.host).inc()
+        try:
+            return await super().handle_async_request(request)
+        except httpx.PoolTimeout:
+            HTTP_POOL_TIMEOUTS.labels(host=self.host).inc()
+            raise
+
+
+def _create_client(host: str) -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS_PER_HOST,
+        # Must stay below the downstream servers' keep-alive timeout (uvicorn: 5s),
+        # otherwise reusing an idle connection can race the server closing it
+        keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY_SECONDS
+    )
+    timeout = httpx.Timeout(
+        settings.HTTP_READ_TIMEOUT_SECONDS,
+        connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+        pool=settings.HTTP_POOL_TIMEOUT_SECONDS
+    )
+    transport = _InstrumentedTransport(host, limits=limits)
+    client = httpx.AsyncClient(transport=transport, timeout=timeout)
+
+    # Pool usage is read straight from the connection pool at scrape time
+    pool = transport._pool
+    HTTP_POOL_CONNECTIONS.labels(host=host, state="active").set_function(lambda: _count_connections(pool, idle=False))
+    HTTP_POOL_CONNECTIONS.labels(host=host, state="idle").set_function(lambda: _count_connections(pool, idle=True))
+    HTTP_POOL_LIMIT.labels(host=host).set(settings.HTTP_MAX_CONNECTIONS_PER_HOST)
+    return client
+
+
+def get_http_client(base_url: str) -> httpx.AsyncClient:
+    """Return the process-wide client for the host of `base_url`, creating it on first use"""
+    host = _host_key(base_url)
+    client = _clients.get(host)
+    if client is None or client.is_closed:
+        client = _clients[host] = _create_client(host)
+    return client
+
+
+async def close_http_client() -> None:
+    """Close every pooled client; called on shutdown"""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,85 @@
+import asyncio
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from prometheus_client import Counter
+
+T = TypeVar("T")
+
+REQUEST_MEMO_LOOKUPS = Counter(
+    'request_memo_lookups_total',
+    'Request-scoped lookups of downstream data by kind and outcome (hit, miss)',
+    ['kind', 'result']
+)
+
+
+class _RequestMemo:
+    def __init__(self):
+        self.entries: Dict[Tuple[str, Hashable], Any] = {}
+        self.active = True
+
+
+_current_memo: ContextVar[Optional[_RequestMemo]] = ContextVar("request_memo", default=None)
+
+
+def _active_memo() -> Optional[_RequestMemo]:
+    memo = _current_memo.get()
+    # Tasks spawned during a request inherit the memo; once the request is over they stop using it
+    return memo if memo is not None and memo.active else None
+
+
+class RequestMemoMiddleware:
+    """
+    Gives each HTTP request its own memo, so the same booking, event or token
+    looked up by the route handler and again by the controller (or saga step)
+    is fetched only once per request. Nothing is shared between requests.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        memo = _RequestMemo()
+        token = _current_memo.set(memo)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            memo.active = False
+            _current_memo.reset(token)
+
+
+async def memoize(kind: str, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+    """
+    Return the result of `load()` for (kind, key), loading it at most once per request.
+
+    Concurrent lookups within the request share one call. Failures aren't
+    remembered, so a later lookup tries again. Outside a request this just
+    calls `load()`.
+    """
+    memo = _active_memo()
+    if memo is None:
+        return await load()
+
+    entry = memo.entries.get((kind, key))
+    if entry is not None:
+        REQUEST_MEMO_LOOKUPS.labels(kind=kind, result="hit").inc()
+        return await asyncio.shield(entry)
+
+    REQUEST_MEMO_LOOKUPS.labels(kind=kind, result="miss").inc()
+    task = memo.entries[(kind, key)] = asyncio.ensure_future(load())
+    try:
+        return await asyncio.shield(task)
+    except BaseException:
+        if task.done() and memo.entries.get((kind, key)) is task:
+            del memo.entries[(kind, key)]
+        raise
+
+
+def forget(kind: str, key: Hashable) -> None:
+    """Drop a memoized value after the request changed it downstream"""
+    memo = _active_memo()
+    if memo is not None:
+        memo.entries.pop((kind, key), None)
@@ -0,0 +1,421 @@
+"""
+Minimal saga engine for multi-step booking flows.
+
+A saga is an ordered list of steps. Critical steps run on the request path;
+after each one the saga's progress and context are written to a local
+SQLite store, so a crashed flow can be picked up again. When a critical step
+fails, the steps already done are compensated in reverse order and the error
+is re-raised. Deferred steps (emails and other non-critical work) run in the
+background once the critical steps are done, are retried on failure, and
+never cause compensation.
+
+A recovery loop resumes sagas that were interrupted: unfinished critical
+steps are retried (steps must therefore be idempotent; `context["resumed"]`
+tells them when they may be repeating themselves), interrupted compensations
+are completed and pending deferred steps are retried.
+
+Credentials (the caller's bearer token) are never written to the store. They
+are only available to the steps of the first attempt, on the request path;
+steps and compensations run by the recovery loop or in the background get
+`context["credentials"] = None` and have to act as the service instead.
+"""
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from prometheus_client import Counter
+
+from .config import get_settings
+from .logging import logger
+
+settings = get_settings()
+
+# Saga statuses
+RUNNING = "running"            # critical steps in progress
+COMPENSATING = "compensating"  # a critical step failed, undoing completed steps
+COMPENSATED = "compensated"
+DEFERRED = "deferred"          # critical steps done, deferred steps pending
+COMPLETED = "completed"
+FAILED = "failed"              # gave up; needs a look by hand
+
+SAGA_TRANSITIONS = Counter(
+    'saga_status_total',
+    'Sagas reaching a status, by saga type',
+    ['saga_type', 'status']
+)
+
+class SagaCredentialsUnavailable(Exception):
+    """A step needs the caller's credentials but runs without them (e.g. after a restart)"""
+
+
+StepAction = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+@dataclass
+class SagaStep:
+    name: str
+    # Returns updates to merge into the saga context
+    action: StepAction
+    compensate: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    deferred: bool = False
+
+
+class SagaDefinition:
+    def __init__(self, saga_type: str, steps: List[SagaStep]):
+        critical = [step for step in steps if not step.deferred]
+        if steps[:len(critical)] != critical:
+            raise ValueError(f"Deferred steps of saga {saga_type} must come after its critical steps")
+        self.saga_type = saga_type
+        self.steps = steps
+        self.critical_count = len(critical)
+
+
+class SagaStore:
+    """
+    SQLite-backed saga log.
+
+    Every statement runs on one writer thread that owns the connection.
+    Statements queued while it is busy are committed together in a single
+    transaction (group commit), so concurrent bookings share commits instead
+    of taking turns on a lock. The log is in WAL mode with synchronous=NORMAL:
+    commits survive a process crash, and a power loss can at most drop the
+    last few, which then look like any interrupted saga to the recovery loop.
+
+    Several processes may share the file (e.g. multiple workers in one
+    container): resuming a saga claims it in the same statement that selects
+    it, so only one of them picks it up. SQLite must not be shared over a
+    network filesystem, so each replica keeps its own file and only ever
+    resumes its own sagas.
+    """
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sagas (
+                saga_id TEXT PRIMARY KEY,
+                saga_type TEXT NOT NULL,
+                status TEXT NOT NULL,
+                step_index INTEGER NOT NULL,
+                completed_steps TEXT NOT NULL,
+                context TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_sagas_status ON sagas (status, updated_at)")
+        # Saga logs written by earlier versions kept the caller's token; drop it from disk
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(sagas)")]
+        if "credentials" in columns:
+            self._conn.execute("ALTER TABLE sagas DROP COLUMN credentials")
+            # Rewrites the file without the old pages, then clears them out of the WAL too
+            self._conn.execute("VACUUM")
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+        self._queue: "queue.SimpleQueue[tuple]" = queue.SimpleQueue()
+        self._writer = threading.Thread(target=self._run_writer, name="saga-store", daemon=True)
+        self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            results = []
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for sql, params, loop, future in batch:
+                    try:
+                        results.append((loop, future, self._conn.execute(sql, params).fetchall(), None))
+                    except sqlite3.Error as e:
+                        results.append((loop, future, None, e))
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                results = [(loop, future, None, e) for _, _, loop, future in batch]
+
+            for loop, future, rows, error in results:
+                loop.call_soon_threadsafe(_settle, future, rows, error)
+
+    async def _execute(self, sql: str, params: tuple = ()) -> List[tuple]:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((sql, params, loop, future))
+        return await future
+
+    async def insert(self, saga: Dict[str, Any]) -> None:
+        await self._execute(
+            "INSERT INTO sagas (saga_id, saga_type, status, step_index, completed_steps, context, "
+            "attempts, last_error, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                saga["saga_id"], saga["saga_type"], saga["status"], saga["step_index"],
+                json.dumps(saga["completed_steps"]), json.dumps(saga["context"], default=str),
+                saga["attempts"], saga["last_error"], time.time(), time.time()
+            )
+        )
+
+    async def save(self, saga: Dict[str, Any]) -> None:
+        await self._execute(
+            "UPDATE sagas SET status = ?, step_index = ?, completed_steps = ?, context = ?, "
+            "attempts = ?, last_error = ?, updated_at = ? WHERE saga_id = ?",
+            (
+                saga["status"], saga["step_index"], json.dumps(saga["completed_steps"]),
+                json.dumps(saga["context"], default=str), saga["attempts"],
+                saga["last_error"], time.time(), saga["saga_id"]
+            )
+        )
+
+    async def claim_resumable(self, idle_seconds: float, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Unfinished sagas idle for `idle_seconds`, claimed for this process by
+        bumping their updated_at so no other process resumes them meanwhile
+        """
+        now = time.time()
+        rows = await self._execute(
+            "UPDATE sagas SET updated_at = ? WHERE saga_id IN ("
+            "SELECT saga_id FROM sagas WHERE status IN (?, ?, ?) AND updated_at < ? ORDER BY updated_at LIMIT ?"
+            ") RETURNING saga_id, saga_type, status, step_index, completed_steps, context, attempts, last_error",
+            (now, RUNNING, COMPENSATING, DEFERRED, now - idle_seconds, limit)
+        )
+        return [
+            {
+                "saga_id": row[0], "saga_type": row[1], "status": row[2], "step_index": row[3],
+                "completed_steps": json.loads(row[4]), "context": json.loads(row[5]), "credentials": None,
+                "attempts": row[6], "last_error": row[7]
+            }
+            for row in rows
+        ]
+
+    async def purge_finished(self, older_than_seconds: float) -> None:
+        await self._execute(
+            "DELETE FROM sagas WHERE status IN (?, ?) AND updated_at < ?",
+            (COMPLETED, COMPENSATED, time.time() - older_than_seconds)
+        )
+
+
+def _settle(future: asyncio.Future, rows: Optional[List[tuple]], error: Optional[Exception]) -> None:
+    if future.done():
+        return  # The caller was cancelled
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(rows)
+
+
+class SagaEngine:
+    def __init__(self, store: SagaStore):
+        self.store = store
+        self.resume_after = settings.SAGA_RESUME_AFTER_SECONDS
+        self.interval = settings.SAGA_RECOVERY_INTERVAL_SECONDS
+        self.max_attempts = settings.SAGA_MAX_ATTEMPTS
+        self.retention = settings.SAGA_RETENTION_HOURS * 3600
+        self._definitions: Dict[str, SagaDefinition] = {}
+        self._active: Set[str] = set()
+        self._background: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, definition: SagaDefinition) -> None:
+        self._definitions[definition.saga_type] = definition
+
+    # -- execution ------------------------------------------------------------
+
+    async def run(self, saga_type: str, context: Dict[str, Any], credentials: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Run the critical steps of a saga and return its context.
+
+        Deferred steps are scheduled in the background. If a critical step
+        fails, completed steps are compensated and the step's error is raised.
+        `credentials` (e.g. the caller's bearer token) are available to the
+        critical steps of this attempt, and their compensations, as
+        context["credentials"]. They are held in memory only and dropped once
+        the critical steps are done; a resumed saga runs without them.
+        """
+        definition = self._definitions[saga_type]
+        saga = {
+            "saga_id": str(uuid.uuid4()),
+            "saga_type": saga_type,
+            "status": RUNNING,
+            "step_index": 0,
+            "completed_steps": [],
+            "context": dict(context),
+            "credentials": credentials,
+            "attempts": 0,
+            "last_error": None
+        }
+        await self.store.insert(saga)
+        self._active.add(saga["saga_id"])
+        try:
+            await self._run_critical(definition, saga)
+        finally:
+            self._active.discard(saga["saga_id"])
+            saga["credentials"] = None
+
+        if saga["status"] == DEFERRED:
+            self._spawn(self._run_deferred(definition, saga))
+        return saga["context"]
+
+    def _step_context(self, saga: Dict[str, Any], resumed: bool) -> Dict[str, Any]:
+        return {**saga["context"], "credentials": saga["credentials"], "resumed": resumed}
+
+    async def _run_critical(self, definition: SagaDefinition, saga: Dict[str, Any], resumed: bool = False) -> None:
+        while saga["step_index"] < definition.critical_count:
+            step = definition.steps[saga["step_index"]]
+            try:
+                updates = await step.action(self._step_context(saga, resumed))
+            except Exception as e:
+                saga["last_error"] = f"{step.name}: {str(e)}"
+                await self._compensate(definition, saga)
+                raise
+            saga["context"].update(updates or {})
+            saga["completed_steps"].append(step.name)
+            saga["step_index"] += 1
+            resumed = False
+            # The last step's progress is saved together with the status change below
+            if saga["step_index"] < definition.critical_count:
+                await self.store.save(saga)
+
+        await self._set_status(saga, DEFERRED if definition.critical_count < len(definition.steps) else COMPLETED)
+
+    async def _compensate(self, definition: SagaDefinition, saga: Dict[str, Any]) -> None:
+        await self._set_status(saga, COMPENSATING)
+        steps = {step.name: step for step in definition.steps}
+        while saga["completed_steps"]:
+            step = steps[saga["completed_steps"][-1]]
+            if step.compensate is not None:
+                try:
+                    await step.compensate(self._step_context(saga, False))
+                except Exception as e:
+                    # Left in COMPENSATING; the recovery loop tries again
+                    saga["attempts"] += 1
+                    saga["last_error"] = f"compensate {step.name}: {str(e)}"
+                    logger.error(f"Compensation of {step.name} failed for saga {saga['saga_id']}: {str(e)}")
+                    if saga["attempts"] >= self.max_attempts:
+                        await self._set_status(saga, FAILED)
+                    else:
+                        await self.store.save(saga)
+                    return
+            saga["completed_steps"].pop()
+            await self.store.save(saga)
+        await self._set_status(saga, COMPENSATED)
+
+    async def _run_deferred(self, definition: SagaDefinition, saga: Dict[str, Any]) -> None:
+        self._active.add(saga["saga_id"])
+        try:
+            while saga["step_index"] < len(definition.steps):
+                step = definition.steps[saga["step_index"]]
+                try:
+                    updates = await step.action(self._step_context(saga, saga["attempts"] > 0))
+                except Exception as e:
+                    # Left in DEFERRED; the recovery loop retries it
+                    saga["attempts"] += 1
+                    saga["last_error"] = f"{step.name}: {str(e)}"
+                    logger.warning(f"Deferred step {step.name} failed for saga {saga['saga_id']}: {str(e)}")
+                    if saga["attempts"] >= self.max_attempts:
+                        await self._set_status(saga, FAILED)
+                    else:
+                        await self.store.save(saga)
+                    return
+                saga["context"].update(updates or {})
+                saga["completed_steps"].append(step.name)
+                saga["step_index"] += 1
+                saga["attempts"] = 0
+                if saga["step_index"] < len(definition.steps):
+                    await self.store.save(saga)
+            await self._set_status(saga, COMPLETED)
+        finally:
+            self._active.discard(saga["saga_id"])
+
+    async def _set_status(self, saga: Dict[str, Any], status: str) -> None:
+        saga["status"] = status
+        await self.store.save(saga)
+        SAGA_TRANSITIONS.labels(saga_type=saga["saga_type"], status=status).inc()
+        if status == FAILED:
+            logger.error(f"Saga {saga['saga_id']} ({saga['saga_type']}) failed: {saga['last_error']}")
+
+    def _spawn(self, coro: Awaitable[None]) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    # -- recovery -------------------------------------------------------------
+
+    async def resume(self, saga: Dict[str, Any]) -> None:
+        definition = self._definitions.get(saga["saga_type"])
+        if definition is None:
+            logger.error(f"No definition registered for saga type {saga['saga_type']}")
+            return
+
+        self._active.add(saga["saga_id"])
+        try:
+            if saga["status"] == RUNNING:
+                logger.info(f"Resuming saga {saga['saga_id']} at step {saga['step_index']}")
+                try:
+                    await self._run_critical(definition, saga, resumed=True)
+                except Exception:
+                    return  # Compensated (or left for the next pass)
+            elif saga["status"] == COMPENSATING:
+                await self._compensate(definition, saga)
+        finally:
+            self._active.discard(saga["saga_id"])
+
+        if saga["status"] == DEFERRED:
+            await self._run_deferred(definition, saga)
+
+    async def recover(self) -> None:
+        for saga in await self.store.claim_resumable(self.resume_after):
+            if saga["saga_id"] in self._active:
+                continue
+            try:
+                await self.resume(saga)
+            except Exception as e:
+                logger.error(f"Error resuming saga {saga['saga_id']}: {str(e)}")
+        await self.store.purge_finished(self.retention)
+
+    async def run_recovery(self) -> None:
+        """Resume interrupted sagas until cancelled"""
+        while True:
+            try:
+                await self.recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error recovering sagas: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run_recovery())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Let in-flight deferred steps finish; anything cut short is resumed on the next start
+        if self._background:
+            await asyncio.wait(self._background, timeout=5)
+
+
+@lru_cache()
+def get_saga_engine() -> SagaEngine:
+    return SagaEngine(SagaStore(settings.SAGA_DB_PATH))
@@ -1,7 +1,11 @@
 from fastapi import FastAPI
 from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .api.endpoints.booking import router as booking_router
+from .api.endpoints.booking import router as booking_router, get_booking_controller
+from .core.http import close_http_client
+from .core.request_memo import RequestMemoMiddleware
+from .services.logging_service import log_shipper
+from .services.notification_queue import notification_queue
 import asyncio
 import logging
 from prometheus_client import make_asgi_app, Counter, Histogram
@@ -57,6 +61,9 @@ app = FastAPI(
 # Add Prometheus middleware
 app.add_middleware(PrometheusMiddleware)
 
+# Per-request memo for bookings, events and token claims
+app.add_middleware(RequestMemoMiddleware)
+
 # Create metrics endpoint
 metrics_app = make_asgi_app()
 app.mount("/metrics", metrics_app)
@@ -90,7 +97,15 @@ async def startup_event():
     # Set the event loop policy for Windows if needed
     if asyncio.get_event_loop_policy()._loop_factory is not asyncio.SelectorEventLoop:
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    # Resume or compensate bookings interrupted by a previous shutdown
+    get_booking_controller().saga_engine.start()
     
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down the application")
+    await get_booking_controller().saga_engine.stop()
+    await notification_queue.close()
+    await close_http_client()
+    # Publish the logs still buffered (blocks for at most a few seconds)
+    await asyncio.to_thread(log_shipper.close)
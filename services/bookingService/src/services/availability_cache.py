@@ -0,0 +1,73 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from prometheus_client import Counter
+
+from ..core.config import get_settings
+
+settings = get_settings()
+
+AVAILABILITY_CACHE_REQUESTS = Counter(
+    'availability_cache_requests_total',
+    'Availability pre-checks by outcome (hit, coalesced, miss, bypass)',
+    ['result']
+)
+
+
+class AvailabilityCache:
+    """
+    Short-lived per-event cache of ticket availability for the booking pre-check.
+
+    Concurrent lookups for the same event share one request to the ticket
+    service (single-flight), and the answer is reused for a sub-second TTL.
+    Once an event is nearly sold out (fewer than AVAILABILITY_CACHE_BYPASS_BELOW
+    seats left) every lookup goes to the ticket service, so the last seats are
+    never judged on stale numbers.
+    """
+
+    def __init__(self):
+        self.ttl = settings.AVAILABILITY_CACHE_TTL_MS / 1000
+        self.bypass_below = settings.AVAILABILITY_CACHE_BYPASS_BELOW
+        self.max_entries = settings.AVAILABILITY_CACHE_MAX_ENTRIES
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+    def _is_scarce(self, availability: Dict[str, Any]) -> bool:
+        # total_capacity 0 means unlimited tickets
+        return int(availability["total_capacity"]) != 0 and int(availability["available_tickets"]) < self.bypass_below
+
+    async def get(self, event_id: str, load: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        entry = self._entries.get(event_id)
+        if entry is not None and self._is_scarce(entry[1]):
+            AVAILABILITY_CACHE_REQUESTS.labels(result="bypass").inc()
+            availability = await load()
+            self._store(event_id, availability)
+            return availability
+
+        if entry is not None and entry[0] > time.monotonic():
+            AVAILABILITY_CACHE_REQUESTS.labels(result="hit").inc()
+            return dict(entry[1])
+
+        task = self._inflight.get(event_id)
+        if task is not None:
+            AVAILABILITY_CACHE_REQUESTS.labels(result="coalesced").inc()
+        else:
+            AVAILABILITY_CACHE_REQUESTS.labels(result="miss").inc()
+            task = self._inflight[event_id] = asyncio.create_task(load())
+            task.add_done_callback(lambda done: self._settle(event_id, done))
+        # Shielded so one caller going away doesn't cancel the lookup for the others
+        return dict(await asyncio.shield(task))
+
+    def _settle(self, event_id: str, task: asyncio.Task) -> None:
+        self._inflight.pop(event_id, None)
+        if not task.cancelled() and task.exception() is None:
+            self._store(event_id, task.result())
+
+    def _store(self, event_id: str, availability: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        if len(self._entries) >= self.max_entries:
+            for key in [key for key, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[key]
+        if len(self._entries) < self.max_entries or event_id in self._entries:
+            self._entries[event_id] = (now + self.ttl, dict(availability))
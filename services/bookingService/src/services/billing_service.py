@@ -1,8 +1,10 @@
-import requests
-import time
-from typing import Dict, Any, Optional, Tuple
+import asyncio
+import httpx
+from typing import Dict, Any, List, Optional, Tuple
 from uuid import UUID
+from ..core.circuit_breaker import CircuitOpenError, get_circuit_breaker
 from ..core.config import get_settings
+from ..core.http import get_http_client
 from ..core.logging import logger
 from .logging_service import LoggingService
 from fastapi import HTTPException
@@ -16,21 +18,23 @@ class BillingServiceException(Exception):
 class BillingService:
     def __init__(self):
         self.base_url = settings.BILLING_SERVICE_URL
-        self.timeout = 10.0
         self.max_retries = 3
         self.initial_backoff = 1.0  # 1 second
+        self.batch_size = 100  # billing service limit per /payments/status request
+        self.breaker = get_circuit_breaker("billing_service")
         
         # Initialize logging service
         self.logger = LoggingService("billing_service")
 
-    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
+    async def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request to billing service"""
         url = f"{self.base_url}/{endpoint.lstrip('/')}"
         try:
-            response = requests.request(method, url, **kwargs)
-            response.raise_for_status()
+            async with self.breaker.guard():
+                response = await get_http_client(self.base_url).request(method.upper(), url, **kwargs)
+                response.raise_for_status()
             return response.json()
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             self.logger.log_error(
                 f"Billing service request error",
                 error_type="RequestException",
@@ -39,7 +43,7 @@ class BillingService:
             )
             raise HTTPException(status_code=500, detail=f"Billing service error: {str(e)}")
 
-    def create_payment_session(self, booking_id: str, amount: float, event_title: str, quantity: int) -> Dict[str, Any]:
+    async def create_payment_session(self, booking_id: str, amount: float, event_title: str, quantity: int) -> Dict[str, Any]:
         """Create a Stripe checkout session"""
         endpoint = "api/payments/create-session"
         data = {
@@ -48,9 +52,9 @@ class BillingService:
             "event_title": event_title,
             "quantity": quantity
         }
-        return self._make_request("POST", endpoint, json=data)
+        return await self._make_request("POST", endpoint, json=data)
 
-    def store_payment_intent(
+    async def store_payment_intent(
         self, 
         booking_id: str, 
         payment_intent_id: str, 
@@ -71,14 +75,14 @@ class BillingService:
             "customer_email": customer_email,
             "customer_name": customer_name
         }
-        return self._make_request("POST", endpoint, json=data)
+        return await self._make_request("POST", endpoint, json=data)
 
-    def get_payment_intent(self, booking_id: str) -> Dict[str, Any]:
+    async def get_payment_intent(self, booking_id: str) -> Dict[str, Any]:
         """Get payment intent information for a booking"""
         endpoint = f"api/payments/intent/{booking_id}"
-        return self._make_request("GET", endpoint)
+        return await self._make_request("GET", endpoint)
 
-    def verify_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    async def verify_webhook(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         """Verify and process payment webhook"""
         try:
             event_type = payload.get("type")
@@ -91,7 +95,7 @@ class BillingService:
                 status="WEBHOOK_RECEIVED"
             )
             
-            result = self._make_request(
+            result = await self._make_request(
                 "post",
                 "payments/webhook",
                 json=payload
@@ -108,10 +112,10 @@ class BillingService:
             )
             raise BillingServiceException(f"Failed to process webhook: {str(e)}")
 
-    def get_payment_status(self, booking_id: str) -> Optional[str]:
+    async def get_payment_status(self, booking_id: str) -> Optional[str]:
         """Get payment status for a booking"""
         try:
-            response = self._make_request(
+            response = await self._make_request(
                 "get",
                 f"payments/{booking_id}/status"
             )
@@ -125,7 +129,24 @@ class BillingService:
             )
             return None
 
-    def refund_payment(self, booking_id: str, amount: Optional[float] = None) -> Dict[str, Any]:
+    async def get_payment_statuses(self, booking_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Get the latest payment of several bookings in one request, keyed by
+        booking ID; bookings without a payment map to None
+        """
+        unique_ids = list(dict.fromkeys(booking_ids))
+        chunks = [unique_ids[i:i + self.batch_size] for i in range(0, len(unique_ids), self.batch_size)]
+        responses = await asyncio.gather(*(
+            self._make_request("post", "payments/status", json={"booking_ids": chunk})
+            for chunk in chunks
+        ))
+        return {
+            booking_id: payment
+            for response in responses
+            for booking_id, payment in response.get("payments", {}).items()
+        }
+
+    async def refund_payment(self, booking_id: str, amount: Optional[float] = None) -> Dict[str, Any]:
         """Refund a payment for a booking"""
         try:
             payload = {"booking_id": booking_id}
@@ -139,7 +160,7 @@ class BillingService:
                 status="REFUND_INITIATED"
             )
             
-            result = self._make_request(
+            result = await self._make_request(
                 "post",
                 f"payments/{booking_id}/refund",
                 json=payload
@@ -157,10 +178,43 @@ class BillingService:
             )
             raise BillingServiceException(f"Failed to refund payment: {str(e)}")
 
-    def verify_payment_completed(self, booking_id: str) -> Tuple[bool, Optional[str]]:
+    async def refund_unfulfilled_payment(self, booking_id: str) -> Dict[str, Any]:
+        """
+        Fully refund the payment of a booking that can no longer be confirmed,
+        e.g. one that expired while the user was still at checkout
+        """
+        try:
+            intent = await self._make_request("get", f"payments/intent/{booking_id}")
+            result = await self._make_request(
+                "post",
+                "api/refund/process",
+                json={
+                    "payment_intent_id": intent["payment_intent_id"],
+                    "reason": "requested_by_customer",
+                    "metadata": {"booking_id": booking_id, "refund_reason": "booking_expired"}
+                }
+            )
+
+            self.logger.log_payment_verification(
+                booking_id=booking_id,
+                transaction_id=booking_id,
+                status="REFUNDED_UNFULFILLED"
+            )
+            return result
+
+        except Exception as e:
+            self.logger.log_error(
+                "Error refunding unfulfilled booking payment",
+                transaction_id=booking_id,
+                error_type="RefundError",
+                error_details=str(e)
+            )
+            raise BillingServiceException(f"Failed to refund payment: {str(e)}")
+
+    async def verify_payment_completed(self, booking_id: str) -> Tuple[bool, Optional[str]]:
         """Verify if payment for a booking has been completed"""
         try:
-            response = self._make_request(
+            response = await self._make_request(
                 "get",
                 f"payments/{booking_id}/verify"
             )
@@ -185,6 +239,8 @@ class BillingService:
             
             return is_paid, error
             
+        except CircuitOpenError:
+            raise
         except Exception as e:
             self.logger.log_error(
                 "Error verifying payment completion",
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Optional
+
+from ..core.saga import SagaCredentialsUnavailable, SagaDefinition, SagaStep
+from .notification_queue import NotificationQueue
+from .ticket_service import BookingStatus, TicketService
+
+CREATE_BOOKING_SAGA = "create_booking"
+
+
+def create_booking_saga(ticket_service: TicketService, notification_queue: NotificationQueue) -> SagaDefinition:
+    """
+    create booking -> confirm if free -> (deferred) queue confirmation email
+
+    Expects event_id, user_id, ticket_quantity, total_amount, price, email,
+    user_email, idempotency_key, transaction_id and the event's title and
+    start/end times in the context; adds `booking`.
+
+    The caller's token (context["credentials"]) is only there on the first
+    attempt. Without it, a booking that was not created yet is given up on
+    (any booking the ticket service did create stays PENDING and is expired
+    by its sweeper), while confirmation and cancellation go through the
+    booking exchange as the service.
+    """
+
+    async def create_booking(context: Dict[str, Any]) -> Dict[str, Any]:
+        if context["credentials"] is None:
+            raise SagaCredentialsUnavailable("Cannot create a booking for the user without their token")
+        # The idempotency key makes a resumed attempt return the booking created before the crash
+        booking = await ticket_service.create_booking(
+            event_id=context["event_id"],
+            user_id=context["user_id"],
+            ticket_quantity=context["ticket_quantity"],
+            total_amount=context["total_amount"],
+            auth_token=context["credentials"],
+            email=context["email"],
+            idempotency_key=context["idempotency_key"]
+        )
+        return {"booking": booking}
+
+    async def cancel_booking(context: Dict[str, Any]) -> None:
+        booking_id = context["booking"]["booking_id"]
+        if context["credentials"] is None:
+            await notification_queue.publish_booking_status(
+                booking_id, BookingStatus.CANCELED.value, reason="SAGA_COMPENSATED"
+            )
+            return
+        await ticket_service.update_booking_status(
+            booking_id=booking_id,
+            status=BookingStatus.CANCELED.value,
+            auth_token=context["credentials"]
+        )
+
+    async def confirm_free_booking(context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if context["price"] != 0:
+            return None
+        booking_id = context["booking"]["booking_id"]
+        if context["credentials"] is None:
+            # The ticket service ignores the event if the booking is already confirmed
+            await notification_queue.publish_booking_status(
+                booking_id, BookingStatus.CONFIRMED.value, reason="SAGA_RESUMED"
+            )
+            return None
+        if context["resumed"]:
+            current = await ticket_service.get_booking(booking_id, context["credentials"])
+            if current and current.get("status") == BookingStatus.CONFIRMED.value:
+                return None
+        await ticket_service.update_booking_status(
+            booking_id=booking_id,
+            status=BookingStatus.CONFIRMED.value,
+            auth_token=context["credentials"]
+        )
+        return None
+
+    async def queue_confirmation_email(context: Dict[str, Any]) -> None:
+        # Paid bookings get their email once payment is confirmed
+        if context["price"] != 0:
+            return None
+        booking = context["booking"]
+        await notification_queue.enqueue_booking_confirmation(
+            booking_id=booking["booking_id"],
+            customer_email=context["user_email"],
+            event_name=context["event_title"],
+            ticket_quantity=booking["ticket_quantity"],
+            total_amount=0,
+            event_start_datetime=context["event_start_datetime"],
+            event_end_datetime=context["event_end_datetime"],
+            transaction_id=context["transaction_id"]
+        )
+        return None
+
+    return SagaDefinition(CREATE_BOOKING_SAGA, [
+        SagaStep("create_booking", create_booking, compensate=cancel_booking),
+        SagaStep("confirm_free_booking", confirm_free_booking),
+        SagaStep("queue_confirmation_email", queue_confirmation_email, deferred=True)
+    ])
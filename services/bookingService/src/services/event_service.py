@@ -1,12 +1,14 @@
-import requests
-import time
+import asyncio
+import httpx
 from typing import Optional, Dict, Any, List
 from uuid import UUID
+from ..core.circuit_breaker import CircuitOpenError, DependencyUnavailableError, get_circuit_breaker
 from ..core.config import get_settings
-from .logging_service import LoggingService
+from ..core.http import RETRYABLE_ERRORS, get_http_client
+from ..core.logging import logger
+from ..core.request_memo import memoize
 
 settings = get_settings()
-logger = LoggingService("event_service")
 
 class EventServiceException(Exception):
     """Custom exception for event service errors"""
@@ -15,11 +17,12 @@ class EventServiceException(Exception):
 class EventService:
     def __init__(self):
         self.base_url = settings.EVENT_SERVICE_URL
-        self.timeout = 10.0
         self.max_retries = 3
         self.initial_backoff = 1.0  # 1 second
+        self.batch_size = 100  # events service limit per /events/batch request
+        self.breaker = get_circuit_breaker("event_service")
 
-    def _make_request_with_retry(
+    async def _make_request_with_retry(
         self,
         endpoint: str,
         params: Optional[Dict[str, Any]] = None
@@ -27,37 +30,54 @@ class EventService:
         """Make HTTP request with retry mechanism"""
         retries = 0
         backoff = self.initial_backoff
+        client = get_http_client(self.base_url)
 
         while retries < self.max_retries:
             try:
-                response = requests.get(
-                    f"{self.base_url}/{endpoint}",
-                    params=params,
-                    timeout=self.timeout
-                )
-                response.raise_for_status()
+                async with self.breaker.guard():
+                    response = await client.get(
+                        f"{self.base_url}/{endpoint}",
+                        params=params
+                    )
+                    response.raise_for_status()
                 return response.json()
-            except requests.exceptions.ConnectionError as e:
+            except RETRYABLE_ERRORS as e:
                 retries += 1
                 if retries == self.max_retries:
                     logger.error(f"Network error after {retries} retries: {str(e)}")
-                    raise EventServiceException(f"Network error: {str(e)}")
+                    raise DependencyUnavailableError("event_service")
                 logger.warning(f"Network error (attempt {retries}/{self.max_retries}): {str(e)}")
-                time.sleep(backoff)
+                # No point backing off for a retry that would be rejected anyway
+                self.breaker.check()
+                await asyncio.sleep(backoff)
                 backoff *= 2  # Exponential backoff
-            except requests.exceptions.HTTPError as e:
+            except CircuitOpenError:
+                raise
+            except httpx.TimeoutException as e:
+                # A read/write timeout says the events service is slow, not that the event is missing
+                logger.error(f"Timeout from events service: {str(e)}")
+                raise DependencyUnavailableError("event_service")
+            except httpx.HTTPStatusError as e:
                 logger.error(f"HTTP error: {str(e)}")
+                if e.response.status_code >= 500:
+                    raise DependencyUnavailableError("event_service")
                 raise EventServiceException(f"HTTP error: {str(e)}")
             except Exception as e:
                 logger.error(f"Unexpected error: {str(e)}")
                 raise EventServiceException(f"Unexpected error: {str(e)}")
 
-    def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
-        """Get event details from the events service"""
+    async def get_event(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get event details from the events service (fetched at most once per request).
+        Returns None if the event doesn't exist; raises DependencyUnavailableError (503)
+        if the events service can't answer.
+        """
         try:
             # Convert string ID to UUID to match service expectation
             event_uuid = UUID(event_id)
-            return self._make_request_with_retry(f"api/v1/events/{event_uuid}")
+            return await memoize("event", event_uuid, lambda: self._make_request_with_retry(f"api/v1/events/{event_uuid}"))
+        except DependencyUnavailableError:
+            raise
         except ValueError as e:
             logger.error(f"Invalid event ID format: {str(e)}")
             return None
@@ -68,10 +88,20 @@ class EventService:
             logger.error(f"Unexpected error fetching event details: {str(e)}")
             return None
 
-    def get_all_events(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
+    async def get_events(self, event_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get details of several events, keyed by event ID, with one request per batch_size IDs"""
+        unique_ids = list(dict.fromkeys(str(UUID(event_id)) for event_id in event_ids))
+        chunks = [unique_ids[i:i + self.batch_size] for i in range(0, len(unique_ids), self.batch_size)]
+        results = await asyncio.gather(*(
+            self._make_request_with_retry("api/v1/events/batch", params={"ids": chunk})
+            for chunk in chunks
+        ))
+        return {event["id"]: event for events in results for event in events}
+
+    async def get_all_events(self, skip: int = 0, limit: int = 10) -> List[Dict[str, Any]]:
         """Get list of events with pagination"""
         try:
-            return self._make_request_with_retry(
+            return await self._make_request_with_retry(
                 "api/v1/events",
                 params={"skip": skip, "limit": limit}
             )
@@ -81,5 +111,3 @@ class EventService:
         except Exception as e:
             logger.error(f"Unexpected error fetching events list: {str(e)}")
             return []
-
-   
\ No newline at end of file
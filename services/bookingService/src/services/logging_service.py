@@ -1,9 +1,10 @@
 from typing import Dict, Any, Optional
-import json
 import pika
 from datetime import datetime
 import os
 
+from log_shipping import LogShipper
+
 # RabbitMQ Configuration
 RABBITMQ_HOST = os.getenv('RABBITMQ_HOST')
 RABBITMQ_PORT = 5672
@@ -11,40 +12,36 @@ RABBITMQ_USER = os.getenv('RABBITMQ_USER')
 RABBITMQ_PASS = os.getenv('RABBITMQ_PASS')
 LOGGING_QUEUE = os.getenv('LOGGING_QUEUE', 'logs_queue') 
 
+# One shipper per process: logs are buffered and published in batches from a
+# background thread over a single connection, so logging never stalls a request.
+log_shipper = LogShipper(
+    pika.ConnectionParameters(
+        host=RABBITMQ_HOST,
+        port=RABBITMQ_PORT,
+        credentials=pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+    ),
+    LOGGING_QUEUE
+)
+
 class LoggingService:
     def __init__(self, service_name: str):
         self.service_name = service_name
-        self.credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
-        self.parameters = pika.ConnectionParameters(
-            host=RABBITMQ_HOST,
-            port=RABBITMQ_PORT,
-            credentials=self.credentials
-        )
 
     def _send_log(self, message: str, level: str = "INFO", transaction_id: Optional[str] = None, **kwargs):
-        """Internal method to send logs to RabbitMQ"""
-        try:
-            payload = {
-                "service_name": self.service_name,
-                "timestamp": datetime.utcnow().isoformat(),
-                "level": level.upper(),
-                "message": message,
-                "transaction_id": transaction_id,
-                **kwargs
-            }
+        """Internal method to send logs to RabbitMQ (published in the background)"""
+        payload = {
+            "service_name": self.service_name,
+            "timestamp": datetime.utcnow().isoformat(),
+            "level": level.upper(),
+            "message": message,
+            "transaction_id": transaction_id,
+            **kwargs
+        }
+        log_shipper.ship(payload)
 
-            connection = pika.BlockingConnection(self.parameters)
-            channel = connection.channel()
-            channel.queue_declare(queue=LOGGING_QUEUE, durable=True)
-            
-            channel.basic_publish(
-                exchange="",
-                routing_key=LOGGING_QUEUE,
-                body=json.dumps(payload)
-            )
-            connection.close()
-        except Exception as e:
-            print(f"Failed to send log: {str(e)}")  # Fallback logging
+    def send_log(self, level: str, message: str, transaction_id: Optional[str] = None, **kwargs):
+        """Send a log entry with an arbitrary level"""
+        self._send_log(message, level=level, transaction_id=transaction_id, **kwargs)
 
     def log_booking_request(self, booking_details: Dict[str, Any], transaction_id: str):
         """Log when a booking request is received"""
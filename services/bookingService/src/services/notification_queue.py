@@ -0,0 +1,132 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+
+import aio_pika
+
+from ..core.config import get_settings
+from ..core.logging import logger
+
+settings = get_settings()
+
+
+def retry_queue_name(attempt: int) -> str:
+    return f"{settings.NOTIFICATION_QUEUE}.retry.{attempt}"
+
+
+def dead_letter_queue_name() -> str:
+    return f"{settings.NOTIFICATION_QUEUE}.dead"
+
+
+def retry_delay_ms(attempt: int) -> int:
+    """Delay before retry `attempt` (1-based): base, 2x base, 4x base, ..."""
+    return int(settings.NOTIFICATION_RETRY_BASE_SECONDS * 1000 * 2 ** (attempt - 1))
+
+
+async def declare_notification_queues(channel: aio_pika.abc.AbstractChannel) -> aio_pika.abc.AbstractQueue:
+    """
+    Declare the work queue plus its retry and dead-letter queues; returns the work queue.
+
+    Each retry attempt has its own queue with a fixed TTL that dead-letters
+    back into the work queue, so a long backoff never holds up a short one.
+    """
+    work_queue = await channel.declare_queue(settings.NOTIFICATION_QUEUE, durable=True)
+    for attempt in range(1, settings.NOTIFICATION_MAX_ATTEMPTS):
+        await channel.declare_queue(
+            retry_queue_name(attempt),
+            durable=True,
+            arguments={
+                "x-message-ttl": retry_delay_ms(attempt),
+                "x-dead-letter-exchange": "",
+                "x-dead-letter-routing-key": settings.NOTIFICATION_QUEUE
+            }
+        )
+    await channel.declare_queue(dead_letter_queue_name(), durable=True)
+    return work_queue
+
+
+def build_message(body: Dict[str, Any], attempt: int = 0) -> aio_pika.Message:
+    return aio_pika.Message(
+        body=json.dumps(body, default=str).encode(),
+        delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        content_type="application/json",
+        headers={"x-attempt": attempt}
+    )
+
+
+class NotificationQueue:
+    """
+    Publisher side of the confirmation-email work queue.
+
+    Bookings only wait for RabbitMQ to confirm the message is stored; the
+    notification worker (src/workers/notification_worker.py) does the
+    actual sending, with retries and rate limiting.
+    """
+
+    def __init__(self):
+        self.url = settings.RABBITMQ_URL
+        self.connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+        self.channel: Optional[aio_pika.abc.AbstractChannel] = None
+        self.booking_exchange: Optional[aio_pika.abc.AbstractExchange] = None
+        self._lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        async with self._lock:
+            if self.connection is None:
+                self.connection = await aio_pika.connect_robust(self.url)
+                # Publisher confirms are on by default, so publish() returns once the broker has the message
+                self.channel = await self.connection.channel()
+                await declare_notification_queues(self.channel)
+
+    async def close(self) -> None:
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+            self.channel = None
+            self.booking_exchange = None
+
+    async def enqueue_booking_confirmation(
+        self,
+        booking_id: str,
+        customer_email: str,
+        event_name: str,
+        ticket_quantity: int,
+        total_amount: float,
+        event_start_datetime: str,
+        event_end_datetime: str,
+        transaction_id: Optional[str] = None
+    ) -> None:
+        """Queue a booking confirmation email"""
+        await self.connect()
+        body = {
+            "booking_id": booking_id,
+            "customer_email": customer_email,
+            "event_name": event_name,
+            "ticket_quantity": ticket_quantity,
+            "total_amount": total_amount,
+            "event_start_datetime": event_start_datetime,
+            "event_end_datetime": event_end_datetime,
+            "transaction_id": transaction_id or booking_id
+        }
+        await self.channel.default_exchange.publish(build_message(body), routing_key=settings.NOTIFICATION_QUEUE)
+        logger.debug(f"Queued booking confirmation for booking {booking_id}")
+
+    async def publish_booking_status(self, booking_id: str, status: str, reason: str) -> None:
+        """
+        Publish a booking status change to the booking exchange, which the
+        ticket service applies without a user token. Used by saga steps that
+        run without the caller's credentials (recovery, compensation).
+        """
+        await self.connect()
+        async with self._lock:
+            if self.booking_exchange is None:
+                self.booking_exchange = await self.channel.declare_exchange(
+                    settings.BOOKING_EXCHANGE, aio_pika.ExchangeType.TOPIC, durable=True
+                )
+        body = {"booking_id": booking_id, "status": status, "reason": reason}
+        routing_key = "booking.confirmed" if status == "CONFIRMED" else "booking.cancelled"
+        await self.booking_exchange.publish(build_message(body), routing_key=routing_key)
+        logger.debug(f"Published {routing_key} for booking {booking_id} ({reason})")
+
+
+notification_queue = NotificationQueue()
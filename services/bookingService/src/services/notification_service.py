@@ -1,6 +1,8 @@
 from typing import Dict, Any, Optional
-import requests
+import httpx
+from ..core.circuit_breaker import get_circuit_breaker
 from ..core.config import get_settings
+from ..core.http import get_http_client
 from ..core.logging import logger
 
 settings = get_settings()
@@ -14,8 +16,9 @@ class NotificationService:
         # Base URL for the notification service
         self.base_url = settings.NOTIFICATIONS_MICROSERVICE_URL
         self.booking_endpoint = f"{self.base_url}/booking"  # For booking confirmations
+        self.breaker = get_circuit_breaker("notification_service")
 
-    def send_booking_confirmation(
+    async def send_booking_confirmation(
         self,
         booking_id: str,
         customer_email: str,
@@ -38,32 +41,26 @@ class NotificationService:
                 "total_amount": total_amount
             }
 
-            logger.info(f"Attempting to send booking confirmation to: {customer_email}")
-            logger.info(f"Using endpoint URL: {self.booking_endpoint}")
-            logger.info(f"Full notification payload: {payload}")
-
             # Make request to OutSystems notification service
-            response = requests.post(
-                self.booking_endpoint,
-                json=payload,
-                headers={'Content-Type': 'application/json'}  # Explicitly set content type
-            )
-            
-            logger.info(f"Response status code: {response.status_code}")
-            logger.info(f"Response headers: {dict(response.headers)}")
-            logger.info(f"Response content: {response.text}")
-            
-            response.raise_for_status()
+            async with self.breaker.guard():
+                response = await get_http_client(self.base_url).post(
+                    self.booking_endpoint,
+                    json=payload,
+                    headers={'Content-Type': 'application/json'},  # Explicitly set content type
+                    timeout=settings.NOTIFICATION_TIMEOUT_SECONDS
+                )
+                logger.debug(f"Notification service responded {response.status_code} for booking {booking_id}")
+                response.raise_for_status()
             
             response_data = response.json()
             if not response_data.get("Success", False): 
                 error_msg = response_data.get("ErrorMsg") or "Unknown error from notification service"
                 raise NotificationServiceException(f"Notification service error: {error_msg}")
                 
-            logger.info(f"Successfully sent booking confirmation for booking {booking_id} to {customer_email}")
+            logger.info(f"Sent booking confirmation for booking {booking_id}")
             return response_data
             
-        except requests.exceptions.RequestException as e:
+        except httpx.HTTPError as e:
             logger.error(f"Failed to send booking confirmation: {str(e)}")
             raise NotificationServiceException(f"Failed to send booking confirmation: {str(e)}")
         except Exception as e:
@@ -1,12 +1,16 @@
-import requests
-import time
+import asyncio
+import httpx
 from typing import Dict, Any, List, Optional
 from uuid import UUID
 from enum import Enum
 from datetime import datetime
+from ..core.circuit_breaker import CircuitOpenError, DependencyUnavailableError, get_circuit_breaker
 from ..core.config import get_settings
+from ..core.http import RETRYABLE_ERRORS, get_http_client
+from ..core.request_memo import forget, memoize
 from fastapi import HTTPException
 from .logging_service import LoggingService
+from .availability_cache import AvailabilityCache
 import logging
 
 settings = get_settings()
@@ -36,12 +40,13 @@ class BookingStatus(str, Enum):
 class TicketService:
     def __init__(self):
         self.base_url = settings.TICKET_SERVICE_URL
-        self.timeout = 10.0
         self.max_retries = 3
         self.initial_backoff = 1.0
+        self.breaker = get_circuit_breaker("ticket_service")
+        self.availability_cache = AvailabilityCache()
         self.logger = LoggingService("ticket_service")
 
-    def _make_request_with_retry(
+    async def _make_request_with_retry(
         self,
         method: str,
         endpoint: str,
@@ -51,7 +56,7 @@ class TicketService:
         """Make HTTP request with retry mechanism"""
         retries = 0
         backoff = self.initial_backoff
-        kwargs['timeout'] = self.timeout
+        client = get_http_client(self.base_url)
 
         if auth_token:
             if 'headers' not in kwargs:
@@ -65,10 +70,11 @@ class TicketService:
             try:
                 url = f"{self.base_url}/{endpoint}"
                 logger.debug(f"Making {method.upper()} request to {url}")
-                response = getattr(requests, method)(url, **kwargs)
-                response.raise_for_status()
+                async with self.breaker.guard():
+                    response = await client.request(method.upper(), url, **kwargs)
+                    response.raise_for_status()
                 return response.json()
-            except requests.exceptions.ConnectionError as e:
+            except RETRYABLE_ERRORS as e:
                 retries += 1
                 if retries == self.max_retries:
                     error_msg = f"Network error after {retries} retries: {str(e)}"
@@ -79,11 +85,22 @@ class TicketService:
                         error_details=str(e),
                         retries=retries
                     )
-                    raise TicketServiceException(error_msg)
+                    raise DependencyUnavailableError("ticket_service")
                 logger.warning(f"Network error (attempt {retries}/{self.max_retries}): {str(e)}")
-                time.sleep(backoff)
+                # No point backing off for a retry that would be rejected anyway
+                self.breaker.check()
+                await asyncio.sleep(backoff)
                 backoff *= 2
-            except requests.exceptions.HTTPError as e:
+            except CircuitOpenError:
+                raise
+            except httpx.TimeoutException as e:
+                # Slow, not broken: the caller should retry later rather than see a 500
+                logger.error(f"Timeout from ticket service: {str(e)}")
+                raise DependencyUnavailableError("ticket_service")
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code == 409:
+                    # A conflict the caller should see as such, e.g. the event sold out
+                    raise HTTPException(status_code=409, detail=self._error_detail(e.response))
                 error_msg = f"HTTP error: {str(e)}"
                 logger.error(error_msg)
                 self.logger.log_error(
@@ -103,14 +120,23 @@ class TicketService:
                 )
                 raise TicketServiceException(error_msg)
 
-    def get_booking(self, booking_id: str, auth_token: str = None) -> Dict[str, Any]:
-        """Get booking details"""
+    @staticmethod
+    def _error_detail(response: httpx.Response) -> str:
         try:
-            return self._make_request_with_retry(
+            return response.json().get("detail") or response.text
+        except ValueError:
+            return response.text
+
+    async def get_booking(self, booking_id: str, auth_token: str = None) -> Dict[str, Any]:
+        """Get booking details (fetched at most once per request)"""
+        try:
+            return await memoize("booking", booking_id, lambda: self._make_request_with_retry(
                 "get",
                 f"api/v1/mgmt/bookings/{booking_id}",
                 auth_token=auth_token
-            )
+            ))
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             error_msg = f"Error getting booking details: {str(e)}"
             logger.error(error_msg)
@@ -122,7 +148,7 @@ class TicketService:
             )
             raise HTTPException(status_code=500, detail=error_msg)
 
-    def update_booking_status(
+    async def update_booking_status(
         self,
         booking_id: str,
         status: str,
@@ -150,11 +176,15 @@ class TicketService:
                 raise ValueError(error_msg)
             
             logger.info(f"Updating booking {booking_id} to status {status}")
-            result = self._make_request_with_retry(
-                "post",
-                f"api/v1/mgmt/bookings/{booking_id}/{endpoint}",
-                auth_token=auth_token
-            )
+            try:
+                result = await self._make_request_with_retry(
+                    "post",
+                    f"api/v1/mgmt/bookings/{booking_id}/{endpoint}",
+                    auth_token=auth_token
+                )
+            finally:
+                # The booking this request may have memoized is stale now (or unknown if the update failed)
+                forget("booking", booking_id)
 
             logger.info(f"Successfully updated booking {booking_id} to {status}")
             
@@ -182,6 +212,8 @@ class TicketService:
                 error_details=error_msg
             )
             raise HTTPException(status_code=400, detail=error_msg)
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             error_msg = f"Error updating booking status: {str(e)}"
             logger.error(error_msg)
@@ -193,14 +225,17 @@ class TicketService:
             )
             raise HTTPException(status_code=500, detail=error_msg)
 
-    def get_user_bookings(self, user_id: str) -> List[Dict[str, Any]]:
-        """Get all bookings for a user"""
+    async def get_user_bookings(self, user_id: str, auth_token: str = None) -> List[Dict[str, Any]]:
+        """Get all bookings for a user (the ticket service only returns them to that user's token)"""
         try:
             user_uuid = UUID(user_id)
-            return self._make_request_with_retry(
+            return await self._make_request_with_retry(
                 "get",
-                f"api/v1/mgmt/bookings/user/{user_uuid}"
+                f"api/v1/mgmt/bookings/user/{user_uuid}",
+                auth_token=auth_token
             )
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             error_msg = f"Failed to get user bookings: {str(e)}"
             logger.error(error_msg)
@@ -212,14 +247,16 @@ class TicketService:
             )
             raise TicketServiceException(error_msg)
 
-    def get_event_tickets(self, event_id: str) -> List[Dict[str, Any]]:
+    async def get_event_tickets(self, event_id: str) -> List[Dict[str, Any]]:
         """Get all tickets for an event"""
         try:
             event_uuid = UUID(event_id)
-            return self._make_request_with_retry(
+            return await self._make_request_with_retry(
                 "get",
                 f"api/v1/tickets/event/{event_uuid}"
             )
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             self.logger.log_error(
                 "Error getting event tickets",
@@ -230,15 +267,17 @@ class TicketService:
             )
             raise TicketServiceException(f"Failed to get event tickets: {str(e)}")
 
-    def get_user_event_tickets(self, user_id: str, event_id: str) -> List[Dict[str, Any]]:
+    async def get_user_event_tickets(self, user_id: str, event_id: str) -> List[Dict[str, Any]]:
         """Get user's tickets for a specific event"""
         try:
             user_uuid = UUID(user_id)
             event_uuid = UUID(event_id)
-            return self._make_request_with_retry(
+            return await self._make_request_with_retry(
                 "get",
                 f"api/v1/tickets/user/{user_uuid}/event/{event_uuid}"
             )
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             self.logger.log_error(
                 "Error getting user event tickets",
@@ -250,16 +289,22 @@ class TicketService:
             )
             raise TicketServiceException(f"Failed to get user event tickets: {str(e)}")
 
-    def create_booking(
+    async def create_booking(
         self,
         event_id: str,
         user_id: str,
         ticket_quantity: int,
         total_amount: float,
         auth_token: str = None,
-        email: str = None
+        email: str = None,
+        idempotency_key: str = None
     ) -> Dict[str, Any]:
-        """Create a new booking"""
+        """
+        Create a new booking.
+
+        `idempotency_key` is sent as the Idempotency-Key header on every retry,
+        so a retried request can never create a second booking.
+        """
         try:
             logger.info(f"Creating booking for event {event_id}")
             # Prepare request data according to BookingRequest schema
@@ -269,11 +314,13 @@ class TicketService:
                 "total_amount": total_amount
             }
 
-            result = self._make_request_with_retry(
+            headers = {"Idempotency-Key": idempotency_key} if idempotency_key else {}
+            result = await self._make_request_with_retry(
                 "post",
                 "api/v1/mgmt/bookings/book",
                 auth_token=auth_token,
-                json=booking_data
+                json=booking_data,
+                headers=headers
             )
 
             logger.info(f"Successfully created booking {result['booking_id']}")
@@ -284,6 +331,8 @@ class TicketService:
 
             return result
 
+        except HTTPException:
+            raise
         except Exception as e:
             error_msg = f"Error creating booking: {str(e)}"
             logger.error(error_msg)
@@ -297,14 +346,24 @@ class TicketService:
             )
             raise HTTPException(status_code=500, detail=error_msg)
 
-    def get_available_tickets(self, event_id: str, auth_token: str) -> dict:
-        """Check ticket availability for an event"""
+    async def get_available_tickets(self, event_id: str, auth_token: str) -> dict:
+        """
+        Check ticket availability for an event.
+
+        Answers come from a short-lived per-event cache (see AvailabilityCache),
+        so they are only a pre-check: the ticket service checks capacity again
+        under a per-event lock when the booking is created, and answers 409 if
+        the seats are gone.
+        """
         try:
             logger.debug(f"Checking ticket availability for event {event_id}")
-            response = self._make_request_with_retry(
-                "get",
-                f"api/v1/tickets/event/{event_id}/available",
-                auth_token=auth_token
+            response = await self.availability_cache.get(
+                str(event_id),
+                lambda: self._make_request_with_retry(
+                    "get",
+                    f"api/v1/tickets/event/{event_id}/available",
+                    auth_token=auth_token
+                )
             )
             logger.debug(f"Ticket availability response: {response}")
             return {
@@ -312,6 +371,8 @@ class TicketService:
                 "total_capacity": response["total_capacity"],
                 "booked_tickets": response["booked_tickets"]
             }
+        except DependencyUnavailableError:
+            raise
         except Exception as e:
             error_msg = f"Failed to check ticket availability: {str(e)}"
             logger.error(error_msg)
@@ -0,0 +1,169 @@
+"""
+Confirmation-email worker for the booking service.
+
+Drains the durable notification queue filled by the booking API and sends
+each email through NotificationService. Messages are taken in batches (up to
+NOTIFICATION_BATCH_SIZE, or whatever arrived within NOTIFICATION_BATCH_WAIT_MS),
+sent concurrently but no faster than NOTIFICATION_RATE_PER_SECOND, and
+acknowledged together once every message of the batch was either sent or
+handed to a retry queue. Failed sends are retried with exponential backoff
+via per-attempt TTL queues and parked in the dead-letter queue after
+NOTIFICATION_MAX_ATTEMPTS.
+
+Run from the service root:
+    python -m src.workers.notification_worker
+"""
+import asyncio
+import json
+import signal
+import time
+from typing import List
+
+import aio_pika
+
+from ..core.config import get_settings
+from ..core.http import close_http_client
+from ..core.logging import logger
+from ..services.logging_service import LoggingService
+from ..services.notification_queue import (
+    build_message,
+    dead_letter_queue_name,
+    declare_notification_queues,
+    retry_queue_name
+)
+from ..services.notification_service import NotificationService
+
+settings = get_settings()
+
+
+class RateLimiter:
+    """Spaces out acquisitions to at most `rate` per second"""
+
+    def __init__(self, rate: float):
+        self.interval = 1 / rate
+        self._next = 0.0
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class NotificationWorker:
+    def __init__(self):
+        self.batch_size = settings.NOTIFICATION_BATCH_SIZE
+        self.batch_wait = settings.NOTIFICATION_BATCH_WAIT_MS / 1000
+        self.max_attempts = settings.NOTIFICATION_MAX_ATTEMPTS
+        self.rate_limiter = RateLimiter(settings.NOTIFICATION_RATE_PER_SECOND)
+        self.notification_service = NotificationService()
+        self.logging_service = LoggingService("booking_notification_worker")
+        self.channel = None
+        self._incoming: asyncio.Queue = asyncio.Queue()
+        self._stopping = asyncio.Event()
+
+    async def _next_batch(self) -> List[aio_pika.abc.AbstractIncomingMessage]:
+        """Wait for one message, then collect more until the batch is full or the wait is over"""
+        batch = [await self._incoming.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._incoming.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _send(self, message: aio_pika.abc.AbstractIncomingMessage) -> None:
+        try:
+            body = json.loads(message.body)
+        except ValueError:
+            logger.error("Unreadable notification message, moving it to the dead-letter queue")
+            await self.channel.default_exchange.publish(
+                aio_pika.Message(body=message.body, delivery_mode=aio_pika.DeliveryMode.PERSISTENT),
+                routing_key=dead_letter_queue_name()
+            )
+            return
+
+        attempt = int((message.headers or {}).get("x-attempt", 0))
+        transaction_id = body.pop("transaction_id", None) or body["booking_id"]
+
+        await self.rate_limiter.acquire()
+        try:
+            await self.notification_service.send_booking_confirmation(**body)
+        except Exception as e:
+            await self._retry_or_park(body, transaction_id, attempt + 1, str(e))
+            return
+
+        self.logging_service.log_email_sent(
+            booking_id=body["booking_id"],
+            transaction_id=transaction_id,
+            email=body["customer_email"]
+        )
+
+    async def _retry_or_park(self, body: dict, transaction_id: str, attempt: int, error: str) -> None:
+        body = {**body, "transaction_id": transaction_id}
+        if attempt < self.max_attempts:
+            logger.warning(f"Confirmation for booking {body['booking_id']} failed (attempt {attempt}), retrying: {error}")
+            routing_key = retry_queue_name(attempt)
+        else:
+            routing_key = dead_letter_queue_name()
+            self.logging_service.log_error(
+                "Giving up on booking confirmation email",
+                transaction_id=transaction_id,
+                booking_id=body["booking_id"],
+                error_type="EmailError",
+                error_details=error,
+                attempts=attempt
+            )
+        await self.channel.default_exchange.publish(build_message(body, attempt), routing_key=routing_key)
+
+    async def run(self) -> None:
+        connection = await aio_pika.connect_robust(settings.RABBITMQ_URL)
+        try:
+            self.channel = await connection.channel()
+            await self.channel.set_qos(prefetch_count=self.batch_size * 2)
+            queue = await declare_notification_queues(self.channel)
+            consumer_tag = await queue.consume(self._incoming.put)
+            logger.info(
+                f"Notification worker consuming {settings.NOTIFICATION_QUEUE} "
+                f"(batch={self.batch_size}, rate={settings.NOTIFICATION_RATE_PER_SECOND}/s)"
+            )
+
+            while not self._stopping.is_set():
+                next_batch = asyncio.create_task(self._next_batch())
+                stopping = asyncio.create_task(self._stopping.wait())
+                await asyncio.wait({next_batch, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+                if not next_batch.done():
+                    next_batch.cancel()
+                    break
+
+                batch = next_batch.result()
+                await asyncio.gather(*(self._send(message) for message in batch))
+                # Every message was sent or re-queued for retry; settle the whole batch in one ack
+                await batch[-1].ack(multiple=True)
+
+            # Unacknowledged deliveries still buffered here are redelivered to another worker
+            await queue.cancel(consumer_tag)
+        finally:
+            await connection.close()
+            await close_http_client()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+
+async def main() -> None:
+    worker = NotificationWorker()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, worker.stop)
+    await worker.run()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
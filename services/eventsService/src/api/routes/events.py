@@ -1,6 +1,6 @@
 ## integrate api endpoints with the service
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import UUID4
@@ -8,6 +8,7 @@ from src.schemas.event import EventCreate, EventUpdate, EventRead, EventCreateRe
 from src.services.event_service import (
     create_event,
     get_event_by_id,
+    get_events_by_ids,
     get_all_events,
     update_event,
     delete_event,
@@ -17,6 +18,8 @@ from src.core.auth import get_current_user_id, validate_token
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
+MAX_BATCH_EVENTS = 100
+
 @router.post("/create", response_model=EventCreateResponse)
 async def create_event_endpoint(event: EventCreate, db: AsyncSession = Depends(get_db) ):
     """
@@ -24,6 +27,17 @@ async def create_event_endpoint(event: EventCreate, db: AsyncSession = Depends(g
     """
     return await create_event(event, db)
 
+# Declared before /{event_id} so "batch" isn't parsed as an event ID
+@router.get("/batch", response_model=List[EventRead])
+async def get_events_by_ids_endpoint(ids: List[UUID4] = Query(...), db: AsyncSession = Depends(get_db)):
+    """
+    Retrieve several events at once, e.g. /events/batch?ids=<id>&ids=<id>.
+    IDs that don't match an event are left out of the response.
+    """
+    if len(ids) > MAX_BATCH_EVENTS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_EVENTS} event IDs per request")
+    return await get_events_by_ids(list(dict.fromkeys(ids)), db)
+
 @router.get("/{event_id}", response_model=EventRead)
 async def get_event_by_id_endpoint(event_id: UUID4, db: AsyncSession = Depends(get_db)):
     """
@@ -10,6 +10,8 @@ from ..models.eventOrganizers import EventOrganizer
 from ..models.category import Category
 from ..schemas.event import EventCreate, EventUpdate, Organizer, Venue
 from pydantic import UUID4
+from collections import defaultdict
+from typing import List
 import json
 
 async def create_event(event_data: EventCreate, db: AsyncSession):
@@ -124,6 +126,68 @@ async def get_event_by_id(event_id: UUID4, db: AsyncSession):
         "organizer": organizer
     }
 
+############################################################################################################
+# Get several events by ID in three queries, whatever the number of IDs; unknown IDs are left out
+async def get_events_by_ids(event_ids: List[UUID4], db: AsyncSession):
+    if not event_ids:
+        return []
+
+    result = await db.execute(select(Event).filter(Event.id.in_(event_ids)))
+    events = result.scalars().all()
+    found_ids = [event.id for event in events]
+    if not found_ids:
+        return []
+
+    # Fetch categories for all events at once
+    category_result = await db.execute(
+        select(EventCategory.event_id, Category.name)
+        .join(Category, Category.id == EventCategory.category_id)
+        .filter(EventCategory.event_id.in_(found_ids))
+    )
+    categories_by_event = defaultdict(list)
+    for event_id, category_name in category_result.all():
+        categories_by_event[event_id].append(category_name)
+
+    # Fetch organizers for all events at once
+    organizer_result = await db.execute(
+        select(EventOrganizer)
+        .filter(EventOrganizer.event_id.in_(found_ids))
+    )
+    organizers_by_event = {}
+    for organizer_obj in organizer_result.scalars().all():
+        organizers_by_event.setdefault(organizer_obj.event_id, Organizer(
+            id=str(organizer_obj.organizer_id),
+            username=organizer_obj.organizer_username
+        ))
+
+    event_list = []
+    for event in events:
+        if event.venue:
+            try:
+                venue_obj = Venue(**json.loads(event.venue)) # as venue is stored as a json string in db
+            except Exception:
+                venue_obj = None
+        else:
+            venue_obj = None
+
+        event_list.append({
+            "id": event.id,
+            "title": event.title,
+            "description": event.description,
+            "startDateTime": event.start_date_time,
+            "endDateTime": event.end_date_time,
+            "imageUrl": event.image_url,
+            "venue": venue_obj,
+            "price": event.price,
+            "capacity": event.capacity,
+            "createdAt": event.created_at,
+            "updatedAt": event.updated_at,
+            "categories": categories_by_event[event.id],
+            "organizer": organizers_by_event.get(event.id)
+        })
+
+    return event_list
+
 ############################################################################################################
 # Get all events along with their categories and organizers
 async def get_all_events(db: AsyncSession, skip: int = 0, limit: int = 100):
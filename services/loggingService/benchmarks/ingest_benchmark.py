@@ -0,0 +1,92 @@
+"""
+Ingestion benchmark: sustained logs/sec through RabbitMQ into PostgreSQL.
+
+Publishes BENCH_LOGS messages to the logs queue as fast as the broker takes
+them, then waits until the running logging service has stored all of them
+and reports the sustained ingestion rate. Every run tags its rows with a
+unique service_name, so earlier data doesn't skew the count.
+
+Needs RabbitMQ, the logging database and the consumer (consumer.py)
+running, configured through the same environment variables as the
+service. Run from the service root:
+    python -m benchmarks.ingest_benchmark
+"""
+import json
+import os
+import time
+import uuid
+
+import pika
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env", override=True)
+
+BENCH_LOGS = int(os.getenv("BENCH_LOGS", "100000"))
+BENCH_TIMEOUT_SECONDS = int(os.getenv("BENCH_TIMEOUT_SECONDS", "600"))
+POLL_INTERVAL_SECONDS = 0.5
+
+
+def count_stored(conn, service_name):
+    with conn.cursor() as cur:
+        cur.execute("SELECT count(*) FROM logs WHERE service_name = %s", (service_name,))
+        return cur.fetchone()[0]
+
+
+def main():
+    service_name = f"ingest-benchmark-{uuid.uuid4().hex[:8]}"
+    queue = os.getenv("RABBITMQ_QUEUE")
+
+    connection = pika.BlockingConnection(pika.ConnectionParameters(
+        host=os.getenv("RABBITMQ_HOST"),
+        credentials=pika.PlainCredentials(os.getenv("RABBITMQ_USER"), os.getenv("RABBITMQ_PASS"))
+    ))
+    channel = connection.channel()
+    channel.queue_declare(queue=queue, durable=True)
+
+    db = psycopg2.connect(
+        host=os.getenv("LOGGING_DB_HOST"),
+        port=5432,
+        user=os.getenv("LOGGING_DB_USER"),
+        password=os.getenv("LOGGING_DB_PASSWORD"),
+        dbname=os.getenv("LOGGING_DB")
+    )
+    db.autocommit = True
+
+    print(f"Publishing {BENCH_LOGS} logs as service_name={service_name}")
+    start = time.monotonic()
+    for i in range(BENCH_LOGS):
+        channel.basic_publish(
+            exchange="",
+            routing_key=queue,
+            body=json.dumps({
+                "service_name": service_name,
+                "level": "INFO",
+                "message": f"benchmark log line {i}",
+                "transaction_id": str(uuid.uuid4())
+            }),
+            properties=pika.BasicProperties(delivery_mode=2)
+        )
+    published = time.monotonic() - start
+    connection.close()
+    print(f"Published in {published:.1f}s ({BENCH_LOGS / published:,.0f} logs/sec)")
+
+    stored = 0
+    while stored < BENCH_LOGS and time.monotonic() - start < BENCH_TIMEOUT_SECONDS:
+        time.sleep(POLL_INTERVAL_SECONDS)
+        stored = count_stored(db, service_name)
+    elapsed = time.monotonic() - start
+
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM logs WHERE service_name = %s", (service_name,))
+    db.close()
+
+    if stored < BENCH_LOGS:
+        print(f"Timed out after {elapsed:.0f}s with {stored}/{BENCH_LOGS} logs stored "
+              f"({stored / elapsed:,.0f} logs/sec)")
+        return
+    print(f"Stored {stored} logs in {elapsed:.1f}s: {stored / elapsed:,.0f} logs/sec sustained")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Query plan benchmark: old vs. sargable predicates on a large logs table.
+
+Creates a scratch copy of the logs table (same columns and indexes, so the
+migrations must have been applied), fills it with BENCH_ROWS synthetic rows
+spread over BENCH_DAYS days in timestamp order, and prints EXPLAIN ANALYZE
+output for each filter combination twice: as the old fixed-path endpoints
+queried it (DATE(timestamp), lower(column)) and as /logs/query does now
+(plain column predicates, one keyset page).
+The scratch table is dropped afterwards.
+
+Needs the logging database, configured through the same environment
+variables as the service. Run from the service root:
+    python -m benchmarks.query_plan_benchmark
+"""
+import os
+import time
+from datetime import date, timedelta
+
+import psycopg2
+from dotenv import load_dotenv
+
+load_dotenv(dotenv_path="../../.env", override=True)
+
+BENCH_ROWS = int(os.getenv("BENCH_ROWS", "10000000"))
+BENCH_DAYS = int(os.getenv("BENCH_DAYS", "90"))
+TABLE = "logs_plan_benchmark"
+
+SERVICES = ["booking_service", "ticket_management_service", "refund_composite_service", "billing_service",
+            "notification_service", "event_service", "booking_notification_worker", "saga_engine"]
+# Mostly INFO, as in production
+LEVELS = ["INFO"] * 16 + ["DEBUG"] * 2 + ["WARN", "ERROR"]
+
+FIRST_DAY = date(2026, 1, 1)
+DAY = (FIRST_DAY + timedelta(days=BENCH_DAYS // 2)).isoformat()
+NEXT_DAY = (FIRST_DAY + timedelta(days=BENCH_DAYS // 2 + 1)).isoformat()
+RANGE_END = (FIRST_DAY + timedelta(days=BENCH_DAYS // 2 + 6)).isoformat()
+RANGE_END_EXCLUSIVE = (FIRST_DAY + timedelta(days=BENCH_DAYS // 2 + 7)).isoformat()
+
+# (filters, previous query, current query)
+PAGE = "ORDER BY timestamp DESC, id DESC LIMIT 101"
+QUERIES = [
+    (
+        "transaction_id + level",
+        f"SELECT * FROM {TABLE} WHERE transaction_id = 'txn-123456' AND lower(level) = lower('error')",
+        f"SELECT * FROM {TABLE} WHERE transaction_id = 'txn-123456' AND level = 'ERROR' {PAGE}",
+    ),
+    (
+        "day + level",
+        f"SELECT * FROM {TABLE} WHERE DATE(timestamp) = '{DAY}' AND lower(level) = lower('error')",
+        f"SELECT * FROM {TABLE} WHERE level = 'ERROR' AND timestamp >= '{DAY}' AND timestamp < '{NEXT_DAY}' {PAGE}",
+    ),
+    (
+        "service + level",
+        f"SELECT * FROM {TABLE} WHERE lower(service_name) = lower('Billing_Service') AND lower(level) = lower('error')",
+        f"SELECT * FROM {TABLE} WHERE service_name = 'billing_service' AND level = 'ERROR' {PAGE}",
+    ),
+    (
+        "date range + level",
+        f"SELECT * FROM {TABLE} WHERE DATE(timestamp) BETWEEN '{DAY}' AND '{RANGE_END}' AND lower(level) = lower('warn')",
+        f"SELECT * FROM {TABLE} WHERE level = 'WARN' AND timestamp >= '{DAY}' AND timestamp < '{RANGE_END_EXCLUSIVE}' {PAGE}",
+    ),
+    (
+        "service + level + date range",
+        f"SELECT * FROM {TABLE} WHERE lower(service_name) = lower('booking_service') AND lower(level) = lower('error') "
+        f"AND DATE(timestamp) BETWEEN '{DAY}' AND '{RANGE_END}'",
+        f"SELECT * FROM {TABLE} WHERE service_name = 'booking_service' AND level = 'ERROR' "
+        f"AND timestamp >= '{DAY}' AND timestamp < '{RANGE_END_EXCLUSIVE}' {PAGE}",
+    ),
+]
+
+
+def create_table(cur):
+    cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    cur.execute(f"CREATE TABLE {TABLE} (LIKE logs INCLUDING ALL)")
+    print(f"Inserting {BENCH_ROWS:,} rows over {BENCH_DAYS} days...")
+    start = time.monotonic()
+    cur.execute(
+        f"""
+        INSERT INTO {TABLE} (service_name, level, message, transaction_id, timestamp)
+        SELECT (%(services)s)[1 + (i %% cardinality(%(services)s))],
+               (%(levels)s)[1 + ((i * 7) %% cardinality(%(levels)s))],
+               'benchmark log line ' || i,
+               'txn-' || (i %% 1000000),
+               %(first_day)s::timestamp + (i * (%(days)s * interval '1 day') / %(rows)s)
+        FROM generate_series(1, %(rows)s) AS i
+        """,
+        {"services": SERVICES, "levels": LEVELS, "first_day": FIRST_DAY,
+         "days": BENCH_DAYS, "rows": BENCH_ROWS}
+    )
+    cur.execute(f"ANALYZE {TABLE}")
+    print(f"Loaded in {time.monotonic() - start:.0f}s\n")
+
+
+def explain(cur, query):
+    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS) {query}")
+    return "\n".join(f"    {row[0]}" for row in cur.fetchall())
+
+
+def main():
+    conn = psycopg2.connect(
+        host=os.getenv("LOGGING_DB_HOST"),
+        port=5432,
+        user=os.getenv("LOGGING_DB_USER"),
+        password=os.getenv("LOGGING_DB_PASSWORD"),
+        dbname=os.getenv("LOGGING_DB")
+    )
+    conn.autocommit = True
+    try:
+        with conn.cursor() as cur:
+            create_table(cur)
+            for filters, previous, current in QUERIES:
+                print(f"== {filters} ==")
+                print(f"  previous: {previous}")
+                print(explain(cur, previous))
+                print(f"  current:  {current}")
+                print(explain(cur, current))
+                print()
+    finally:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+
+import psycopg2
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+from dotenv import load_dotenv
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+
+
+# Configuration shared by the API (logging_service.py) and the consumer (consumer.py)
+
+load_dotenv(dotenv_path="../../.env", override=True)
+
+POSTGRES_HOST=os.getenv("LOGGING_DB_HOST")
+POSTGRES_PORT=5432
+POSTGRES_USER=os.getenv("LOGGING_DB_USER")
+POSTGRES_PASSWORD=os.getenv("LOGGING_DB_PASSWORD")
+POSTGRES_DB=os.getenv("LOGGING_DB")
+
+RABBITMQ_HOST = os.getenv("RABBITMQ_HOST")
+RABBITMQ_QUEUE = os.getenv("RABBITMQ_QUEUE")
+
+RABBITMQ_USER = os.getenv("RABBITMQ_USER")
+RABBITMQ_PASS = os.getenv("RABBITMQ_PASS")
+
+# Connection pool, one per process
+DB_POOL_MIN_CONNECTIONS = int(os.getenv("LOGGING_DB_POOL_MIN", "1"))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv("LOGGING_DB_POOL_MAX", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("LOGGING_DB_POOL_TIMEOUT_SECONDS", "5"))
+
+# Prometheus metrics
+# Gauges are summed over the live processes when metrics are collected from PROMETHEUS_MULTIPROC_DIR
+DB_POOL_CONNECTIONS = Gauge(
+    'db_pool_connections',
+    'Database connections in the pool by state (in_use, idle)',
+    ['state'],
+    multiprocess_mode='livesum'
+)
+DB_POOL_MAX = Gauge(
+    'db_pool_max_connections',
+    'Maximum number of database connections in the pool',
+    multiprocess_mode='livesum'
+)
+DB_POOL_MAX.set(DB_POOL_MAX_CONNECTIONS)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Time spent waiting for a database connection from the pool',
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+DB_POOL_EXHAUSTED = Counter(
+    'db_pool_exhausted_total',
+    'Number of times a caller found every pooled connection in use and had to wait'
+)
+DB_POOL_TIMEOUTS = Counter(
+    'db_pool_timeouts_total',
+    'Number of times no pooled connection became available in time'
+)
+
+def metrics_registry():
+    """
+    The registry to expose on /metrics. With PROMETHEUS_MULTIPROC_DIR set,
+    every process (API workers or consumer processes) writes its metrics
+    there and they are aggregated at collection time; otherwise it is just
+    this process's registry.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+# Database connection pool, shared by the threads of one process
+
+_db_pool = None
+_db_pool_lock = threading.Lock()
+# Bounds callers to the pool size: ThreadedConnectionPool raises instead of waiting when it runs out
+_db_pool_slots = threading.BoundedSemaphore(DB_POOL_MAX_CONNECTIONS)
+
+def get_db_pool():
+    """Creates the connection pool on first use."""
+    global _db_pool
+    with _db_pool_lock:
+        if _db_pool is None:
+            _db_pool = ThreadedConnectionPool(
+                DB_POOL_MIN_CONNECTIONS,
+                DB_POOL_MAX_CONNECTIONS,
+                host=POSTGRES_HOST,
+                port=POSTGRES_PORT,
+                user=POSTGRES_USER,
+                password=POSTGRES_PASSWORD,
+                dbname=POSTGRES_DB
+            )
+            DB_POOL_CONNECTIONS.labels(state="idle").set(len(_db_pool._pool))
+        return _db_pool
+
+@contextmanager
+def db_connection():
+    """
+    Borrows a connection from the pool, waiting up to DB_POOL_TIMEOUT_SECONDS
+    for one to be returned if all are in use. The connection goes back to the
+    pool when the block exits, rolled back if a transaction was left open, and
+    is discarded instead if it broke.
+    """
+    start_time = time.monotonic()
+    if not _db_pool_slots.acquire(blocking=False):
+        DB_POOL_EXHAUSTED.inc()
+        if not _db_pool_slots.acquire(timeout=DB_POOL_TIMEOUT_SECONDS):
+            DB_POOL_TIMEOUTS.inc()
+            raise PoolError(f"No database connection available within {DB_POOL_TIMEOUT_SECONDS}s")
+    DB_POOL_WAIT.observe(time.monotonic() - start_time)
+
+    conn = None
+    broken = False
+    try:
+        pool = get_db_pool()
+        conn = pool.getconn()
+        DB_POOL_CONNECTIONS.labels(state="in_use").inc()
+        DB_POOL_CONNECTIONS.labels(state="idle").set(len(pool._pool))
+        yield conn
+    except psycopg2.OperationalError:
+        broken = True
+        raise
+    finally:
+        if conn is not None:
+            DB_POOL_CONNECTIONS.labels(state="in_use").dec()
+            broken = broken or conn.closed != 0
+            if not broken and conn.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            pool.putconn(conn, close=broken)
+            DB_POOL_CONNECTIONS.labels(state="idle").set(len(pool._pool))
+        _db_pool_slots.release()
+
+# Stored forms of the filterable columns
+
+def normalize_service_name(service_name):
+    """Service names are stored lower-case, so lookups can compare the indexed column directly."""
+    return str(service_name).strip().lower()
+
+def normalize_level(level):
+    """Levels are stored upper-case (INFO, WARN, ERROR), so lookups can compare the indexed column directly."""
+    return str(level).strip().upper()
+
+# Levels exported as metric label values; anything else is counted as OTHER
+METRIC_LEVELS = frozenset(("DEBUG", "INFO", "WARN", "WARNING", "ERROR", "CRITICAL", "FATAL"))
+
+def metric_level(level):
+    """Clamp a normalized level to METRIC_LEVELS, so publishers can't create unbounded label values."""
+    return level if level in METRIC_LEVELS else "OTHER"
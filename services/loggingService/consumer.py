@@ -0,0 +1,381 @@
+import os
+import sys
+import json
+import time
+import signal
+import threading
+import multiprocessing
+from collections import defaultdict
+
+import pika
+import psycopg2
+from psycopg2.extras import Json, execute_values
+
+from prometheus_client import Counter, Histogram, multiprocess, start_http_server
+
+from common import (
+    RABBITMQ_HOST, RABBITMQ_QUEUE, RABBITMQ_USER, RABBITMQ_PASS,
+    db_connection, metric_level, metrics_registry, normalize_level, normalize_service_name
+)
+
+
+# Worker processes consuming the logs queue, and the port their metrics are served on
+LOG_CONSUMER_PROCESSES = int(os.getenv("LOG_CONSUMER_PROCESSES", "2"))
+LOG_CONSUMER_METRICS_PORT = int(os.getenv("LOG_CONSUMER_METRICS_PORT", "9001"))
+
+# Consumer batching
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "500"))
+LOG_BATCH_WAIT_MS = int(os.getenv("LOG_BATCH_WAIT_MS", "200"))
+LOG_PREFETCH_COUNT = int(os.getenv("LOG_PREFETCH_COUNT", str(LOG_BATCH_SIZE * 2)))
+
+# Partitioning and retention
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "30"))
+LOG_PARTITION_DAYS_AHEAD = int(os.getenv("LOG_PARTITION_DAYS_AHEAD", "7"))
+LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS = int(os.getenv("LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS", "3600"))
+LOG_ROLLUP_RETENTION_DAYS = int(os.getenv("LOG_ROLLUP_RETENTION_DAYS", "90"))
+PARTITION_MAINTENANCE_LOCK_ID = 7_404_170_001
+
+# Stores the logs and adds them to the per-minute rollup in one statement
+INSERT_LOGS_SQL = """
+    WITH inserted AS (
+        INSERT INTO logs (service_name, level, message, transaction_id, payload)
+        VALUES %s
+        RETURNING service_name, level, timestamp
+    )
+    INSERT INTO log_counts_minute (service_name, level, minute, count)
+    SELECT service_name, level, date_trunc('minute', timestamp), count(*)
+    FROM inserted
+    GROUP BY 1, 2, 3
+    -- A consistent order keeps concurrent consumers from deadlocking on the same counters
+    ORDER BY 1, 2, 3
+    ON CONFLICT (service_name, level, minute)
+    DO UPDATE SET count = log_counts_minute.count + EXCLUDED.count
+"""
+
+# Create Prometheus metrics
+LOGS_PROCESSED = Counter(
+    'logs_processed_total',
+    'Total number of logs processed from RabbitMQ'
+)
+LOGS_INGESTED = Counter(
+    'logs_ingested_total',
+    'Total number of logs stored, by the service that sent them and level',
+    ['service', 'level']
+)
+LOGS_REJECTED = Counter(
+    'logs_rejected_total',
+    'Total number of log messages dropped as unreadable or rejected by the database'
+)
+LOG_BATCH_ROWS = Histogram(
+    'log_ingest_batch_rows',
+    'Number of log rows written per batch',
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500, 5000)
+)
+LOG_BATCH_FLUSH_LATENCY = Histogram(
+    'log_ingest_batch_flush_seconds',
+    'Time to insert and commit one batch of log rows'
+)
+LOG_PARTITION_MAINTENANCE_RUNS = Counter(
+    'log_partition_maintenance_runs_total',
+    'Number of completed log partition maintenance runs'
+)
+LOG_PARTITION_MAINTENANCE_ERRORS = Counter(
+    'log_partition_maintenance_errors_total',
+    'Number of failed log partition maintenance runs'
+)
+RABBITMQ_CONNECTION_ERRORS = Counter(
+    'rabbitmq_connection_errors_total',
+    'Total number of RabbitMQ connection errors'
+)
+
+# RabbitMQ Consumer
+
+def parse_log(body):
+    """
+    Turns a message body into a row for the logs table, or None if it isn't a usable log.
+    """
+    try:
+        data = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+
+    # Validate fields
+    if not isinstance(data, dict) or not all(k in data for k in ("service_name", "level", "message")):
+        return None
+    # Anything else (objects, arrays, NUL characters) can't be stored in the text columns
+    fields = (data["service_name"], data["level"], data["message"], data.get("transaction_id"))
+    if not all(isinstance(field, str) for field in fields[:3]) or not isinstance(fields[3], (str, type(None))):
+        return None
+    if any(field is not None and "\x00" in field for field in fields):
+        return None
+
+    return (
+        normalize_service_name(data["service_name"]),
+        normalize_level(data["level"]),
+        data["message"],
+        data.get("transaction_id", None),
+        # Everything the publisher sent, structured extras included
+        Json(data)
+    )
+
+# Failures of the connection rather than of the rows; the batch is redelivered after reconnecting
+CONNECTION_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+def insert_logs(conn, rows):
+    """
+    Writes a batch of log rows (and their rollup counts) in one statement and
+    commits. Rows the database rejects (e.g. an over-long level, or a payload
+    jsonb can't hold) are skipped one by one instead of failing the whole
+    batch, so one bad message can't hold up the queue; returns the rows stored.
+    """
+    cur = conn.cursor()
+    try:
+        execute_values(cur, INSERT_LOGS_SQL, rows, page_size=len(rows))
+        conn.commit()
+        return rows
+    except CONNECTION_ERRORS:
+        raise
+    except (psycopg2.Error, ValueError):
+        conn.rollback()
+    finally:
+        cur.close()
+
+    stored = []
+    cur = conn.cursor()
+    try:
+        for row in rows:
+            cur.execute("SAVEPOINT log_row")
+            try:
+                execute_values(cur, INSERT_LOGS_SQL, [row])
+                stored.append(row)
+            except CONNECTION_ERRORS:
+                raise
+            except (psycopg2.Error, ValueError) as e:
+                print("Skipping log row rejected by the database:", e)
+                cur.execute("ROLLBACK TO SAVEPOINT log_row")
+        conn.commit()
+    finally:
+        cur.close()
+    LOGS_REJECTED.inc(len(rows) - len(stored))
+    return stored
+
+def consume_batches(channel):
+    """
+    Reads messages into batches of up to LOG_BATCH_SIZE rows, or whatever
+    arrived within LOG_BATCH_WAIT_MS, writes each batch with a single INSERT
+    and then acknowledges every message of the batch at once.
+
+    Nothing is acked before its batch is committed: if the database or the
+    broker goes away, the unacked messages are redelivered after reconnecting.
+    """
+    rows = []
+    last_delivery_tag = None
+    deadline = None
+
+    for method, properties, body in channel.consume(
+        queue=RABBITMQ_QUEUE,
+        auto_ack=False,
+        inactivity_timeout=LOG_BATCH_WAIT_MS / 1000
+    ):
+        if method is not None:
+            row = parse_log(body)
+            if row is None:
+                # Unusable messages are acked with the batch so they don't get stuck in unacked
+                LOGS_REJECTED.inc()
+            else:
+                rows.append(row)
+            last_delivery_tag = method.delivery_tag
+            if deadline is None:
+                deadline = time.monotonic() + LOG_BATCH_WAIT_MS / 1000
+
+        if last_delivery_tag is None:
+            continue
+        if len(rows) < LOG_BATCH_SIZE and time.monotonic() < deadline:
+            continue
+
+        if rows:
+            start_time = time.monotonic()
+            with db_connection() as conn:
+                stored = insert_logs(conn, rows)
+            LOG_BATCH_FLUSH_LATENCY.observe(time.monotonic() - start_time)
+            LOG_BATCH_ROWS.observe(len(rows))
+            LOGS_PROCESSED.inc(len(stored))
+            counts = defaultdict(int)
+            for service_name, level in (row[:2] for row in stored):
+                counts[(service_name, metric_level(level))] += 1
+            for (service_name, level), count in counts.items():
+                LOGS_INGESTED.labels(service=service_name, level=level).inc(count)
+        channel.basic_ack(delivery_tag=last_delivery_tag, multiple=True)
+
+        rows = []
+        last_delivery_tag = None
+        deadline = None
+
+def run_rabbitmq_consumer():
+    """
+    Continuously tries to connect to RabbitMQ and consume messages.
+    Reconnects if the connection fails.
+    """
+    while True:
+        try:
+            print(f"Attempting RabbitMQ connection to host: {RABBITMQ_HOST}")
+
+            # Credentials (guest/guest by default)
+            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+
+            # Create connection parameters
+            parameters = pika.ConnectionParameters(
+                host=RABBITMQ_HOST,
+                credentials=credentials,
+                socket_timeout=5,  # Set explicit timeout
+                connection_attempts=1  # Only try once per loop iteration
+            )
+
+            print(f"connection before")
+            connection = None  # Initialize to avoid UnboundLocalError
+
+            try:
+                # Establish connection with more explicit error handling
+                connection = pika.BlockingConnection(parameters)
+                print(f"connection after - SUCCESS")
+                
+                # Only proceed if we have a valid connection
+                if connection and connection.is_open:
+                    print("RabbitMQ connection established!")
+                    channel = connection.channel()
+
+                    print(f"Declaring queue: {RABBITMQ_QUEUE}")
+                    channel.queue_declare(queue=RABBITMQ_QUEUE, durable=True)
+
+                    # Enough unacked messages in flight to fill one batch while the previous one is written
+                    channel.basic_qos(prefetch_count=LOG_PREFETCH_COUNT)
+
+                    print(f"Listening for logs on RabbitMQ queue: {RABBITMQ_QUEUE}")
+                    consume_batches(channel)
+                else:
+                    print("Connection created but not open. Retrying in 5 seconds...")
+                    if connection:
+                        try:
+                            connection.close()
+                        except:
+                            pass
+                    time.sleep(5)
+                    
+            except pika.exceptions.AMQPConnectionError as e:
+                print(f"AMQP Connection Error during connection attempt: {e}")
+                RABBITMQ_CONNECTION_ERRORS.inc()
+                time.sleep(5)
+            except pika.exceptions.ConnectionClosedByBroker as e:
+                print(f"Connection closed by broker: {e}")
+                RABBITMQ_CONNECTION_ERRORS.inc()
+                time.sleep(5)
+            except pika.exceptions.ConnectionWrongStateError as e:
+                print(f"Connection wrong state: {e}")
+                RABBITMQ_CONNECTION_ERRORS.inc()
+                time.sleep(5)
+            except psycopg2.Error as e:
+                # Unacked messages go back to the queue when the channel closes
+                print(f"Database error while storing logs: {e}")
+                if connection and connection.is_open:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
+            except Exception as e:
+                print(f"Unexpected error during connection attempt: {type(e).__name__}: {e}")
+                RABBITMQ_CONNECTION_ERRORS.inc()
+                # Closing the connection returns its unacked messages to the queue right away
+                if connection and connection.is_open:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                time.sleep(5)
+                
+        except Exception as e:
+            print(f"Outer exception: {type(e).__name__}: {e}")
+            RABBITMQ_CONNECTION_ERRORS.inc()
+            time.sleep(5)
+
+# Partition maintenance
+
+def maintain_partitions():
+    """
+    Creates the daily logs partitions for the next LOG_PARTITION_DAYS_AHEAD days,
+    drops the ones older than LOG_RETENTION_DAYS and deletes rollup counts older
+    than LOG_ROLLUP_RETENTION_DAYS. The advisory lock keeps
+    several logging service processes from doing it at the same time.
+    """
+    with db_connection() as conn, conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_xact_lock(%s)", (PARTITION_MAINTENANCE_LOCK_ID,))
+        if not cur.fetchone()[0]:
+            return
+        cur.execute("SELECT ensure_logs_partitions(%s)", (LOG_PARTITION_DAYS_AHEAD,))
+        cur.execute(
+            "SELECT drop_logs_partitions_before(current_date - %s)",
+            (LOG_RETENTION_DAYS,)
+        )
+        dropped = cur.fetchone()[0]
+        cur.execute(
+            "DELETE FROM log_counts_minute WHERE minute < current_date - %s",
+            (LOG_ROLLUP_RETENTION_DAYS,)
+        )
+        conn.commit()
+    if dropped:
+        print(f"Dropped {dropped} log partition(s) older than {LOG_RETENTION_DAYS} days")
+    LOG_PARTITION_MAINTENANCE_RUNS.inc()
+
+def run_partition_maintenance():
+    """
+    Runs partition maintenance at startup and then every
+    LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS.
+    """
+    while True:
+        try:
+            maintain_partitions()
+        except psycopg2.Error as e:
+            print(f"Partition maintenance failed: {e}")
+            LOG_PARTITION_MAINTENANCE_ERRORS.inc()
+        time.sleep(LOG_PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+# Start
+
+def start_consumer_process(context):
+    process = context.Process(target=run_rabbitmq_consumer, daemon=True)
+    process.start()
+    return process
+
+def supervise_consumers():
+    """
+    Runs LOG_CONSUMER_PROCESSES consumer processes on the logs queue and
+    restarts any that exit. RabbitMQ spreads the messages between their
+    channels, each with its own prefetch and database pool. The processes
+    are spawned rather than forked, so none inherits this process's
+    database connections or threads.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes = [start_consumer_process(context) for _ in range(LOG_CONSUMER_PROCESSES)]
+    while True:
+        time.sleep(1)
+        for i, process in enumerate(processes):
+            if not process.is_alive():
+                print(f"Consumer process {process.pid} exited with {process.exitcode}, restarting")
+                if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+                    multiprocess.mark_process_dead(process.pid)
+                processes[i] = start_consumer_process(context)
+
+if __name__ == '__main__':
+    print(f"Starting {LOG_CONSUMER_PROCESSES} log consumer process(es)...")
+
+    # Stopping the container ends the daemon consumer processes too; unacked messages are redelivered
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    # Metrics of this process and all consumer processes
+    start_http_server(LOG_CONSUMER_METRICS_PORT, registry=metrics_registry())
+
+    # Keep daily partitions created ahead of time and expired ones dropped
+    maintenance_thread = threading.Thread(target=run_partition_maintenance, daemon=True)
+    maintenance_thread.start()
+
+    supervise_consumers()
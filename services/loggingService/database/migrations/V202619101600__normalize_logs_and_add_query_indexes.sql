@@ -0,0 +1,22 @@
+-- Feature 2: Sargable log queries
+
+-- Service names are stored lower-case and levels upper-case (the consumer
+-- normalizes at ingest), so queries compare plain columns instead of
+-- lower(column) and can use the indexes below.
+UPDATE logs
+SET service_name = lower(trim(service_name)),
+    level = upper(trim(level))
+WHERE service_name IS DISTINCT FROM lower(trim(service_name))
+   OR level IS DISTINCT FROM upper(trim(level));
+
+-- Service + level, optionally narrowed to a time range
+CREATE INDEX IF NOT EXISTS idx_logs_service_level_timestamp ON logs(service_name, level, timestamp);
+
+-- Level within a time range
+CREATE INDEX IF NOT EXISTS idx_logs_level_timestamp ON logs(level, timestamp);
+
+-- Rows arrive in timestamp order, so a BRIN index covers plain time ranges at a fraction of a B-tree's size
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp_brin ON logs USING BRIN (timestamp);
+
+-- Superseded by idx_logs_service_level_timestamp, which has service_name as its leading column
+DROP INDEX IF EXISTS idx_logs_service_name;
@@ -0,0 +1,113 @@
+-- Feature 3: Daily partitions for logs
+
+-- logs becomes a range-partitioned table with one partition per day
+-- (logs_pYYYYMMDD). Date-filtered queries only touch the partitions in their
+-- range, and retention drops whole partitions instead of deleting rows. The
+-- logging service creates partitions ahead of time and drops expired ones
+-- through the functions below. Rows that arrive for a day without a partition
+-- land in logs_default and are moved out when that day's partition is created.
+
+ALTER TABLE logs RENAME TO logs_unpartitioned;
+ALTER INDEX IF EXISTS logs_pkey RENAME TO logs_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_logs_service_level_timestamp;
+DROP INDEX IF EXISTS idx_logs_level_timestamp;
+DROP INDEX IF EXISTS idx_logs_timestamp_brin;
+DROP INDEX IF EXISTS idx_logs_transaction_id;
+
+CREATE TABLE logs (
+    id BIGSERIAL,
+    service_name VARCHAR(100),
+    level VARCHAR(10),
+    message TEXT,
+    transaction_id VARCHAR(50),
+    timestamp TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- The partition key has to be part of the primary key
+    PRIMARY KEY (id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+-- Created on the parent, so every partition gets them
+CREATE INDEX IF NOT EXISTS idx_logs_service_level_timestamp ON logs(service_name, level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_level_timestamp ON logs(level, timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp_brin ON logs USING BRIN (timestamp);
+CREATE INDEX IF NOT EXISTS idx_logs_transaction_id ON logs(transaction_id);
+
+CREATE TABLE IF NOT EXISTS logs_default PARTITION OF logs DEFAULT;
+
+-- Create the partition for one day, moving any of that day's rows out of logs_default
+CREATE OR REPLACE FUNCTION create_logs_partition(day DATE) RETURNS VOID AS $$
+DECLARE
+    partition_name TEXT := 'logs_p' || to_char(day, 'YYYYMMDD');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN;
+    END IF;
+
+    EXECUTE format('CREATE TABLE %I (LIKE logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)', partition_name);
+    EXECUTE format(
+        'WITH moved AS (DELETE FROM logs_default WHERE timestamp >= %L AND timestamp < %L RETURNING *)
+         INSERT INTO %I SELECT * FROM moved',
+        day, day + 1, partition_name
+    );
+    EXECUTE format(
+        'ALTER TABLE logs ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+        partition_name, day, day + 1
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Make sure partitions exist from today through days_ahead days from now
+CREATE OR REPLACE FUNCTION ensure_logs_partitions(days_ahead INTEGER) RETURNS VOID AS $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN SELECT generate_series(current_date, current_date + days_ahead, interval '1 day')::date LOOP
+        PERFORM create_logs_partition(day);
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Drop the daily partitions of days before cutoff; returns how many were dropped
+CREATE OR REPLACE FUNCTION drop_logs_partitions_before(cutoff DATE) RETURNS INTEGER AS $$
+DECLARE
+    partition_name TEXT;
+    dropped INTEGER := 0;
+BEGIN
+    FOR partition_name IN
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = 'logs'
+          AND child.relname ~ '^logs_p[0-9]{8}$'
+          AND to_date(substring(child.relname from 7), 'YYYYMMDD') < cutoff
+    LOOP
+        EXECUTE format('DROP TABLE %I', partition_name);
+        dropped := dropped + 1;
+    END LOOP;
+    -- Rows for a day that never had a partition are expired too
+    DELETE FROM logs_default WHERE timestamp < cutoff;
+    RETURN dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Partitions for the days already logged and the week ahead, then copy the old rows over
+DO $$
+DECLARE
+    day DATE;
+BEGIN
+    FOR day IN
+        SELECT DISTINCT timestamp::date FROM logs_unpartitioned WHERE timestamp IS NOT NULL
+    LOOP
+        PERFORM create_logs_partition(day);
+    END LOOP;
+    PERFORM ensure_logs_partitions(7);
+END;
+$$;
+
+INSERT INTO logs (id, service_name, level, message, transaction_id, timestamp)
+SELECT id, service_name, level, message, transaction_id, COALESCE(timestamp, CURRENT_TIMESTAMP)
+FROM logs_unpartitioned;
+
+SELECT setval(pg_get_serial_sequence('logs', 'id'), COALESCE((SELECT max(id) FROM logs), 0) + 1, false);
+
+DROP TABLE logs_unpartitioned;
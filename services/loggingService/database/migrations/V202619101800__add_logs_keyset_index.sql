@@ -0,0 +1,6 @@
+-- Feature 4: Keyset pagination for /logs/query
+
+-- /logs/query pages through logs ordered by (timestamp, id), newest first.
+-- Queries filtered by service or level are served by their composite
+-- indexes; this one covers unfiltered and time-range-only pages.
+CREATE INDEX IF NOT EXISTS idx_logs_timestamp_id ON logs(timestamp, id);
@@ -0,0 +1,12 @@
+-- Feature 5: Structured and full-text log search
+
+-- The whole message as published, including structured extras such as
+-- error_type, booking_details or error_context. Rows stored before this
+-- migration have no payload.
+ALTER TABLE logs ADD COLUMN IF NOT EXISTS payload JSONB;
+
+-- Field filters are containment queries (payload @> '{"error_type": "..."}')
+CREATE INDEX IF NOT EXISTS idx_logs_payload ON logs USING GIN (payload jsonb_path_ops);
+
+-- Text search over messages; /logs/search uses this exact expression
+CREATE INDEX IF NOT EXISTS idx_logs_message_tsv ON logs USING GIN (to_tsvector('english', coalesce(message, '')));
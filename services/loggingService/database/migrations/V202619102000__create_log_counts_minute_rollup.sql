@@ -0,0 +1,21 @@
+-- Feature 6: Per-minute log count rollups
+
+-- Logs per service, level and minute. The consumer adds each batch's counts
+-- in the same transaction that stores the logs, so /logs/stats never has to
+-- scan the logs table. Backfilled here from the logs already stored.
+CREATE TABLE IF NOT EXISTS log_counts_minute (
+    service_name VARCHAR(100) NOT NULL,
+    level VARCHAR(10) NOT NULL,
+    minute TIMESTAMP NOT NULL,
+    count BIGINT NOT NULL,
+    PRIMARY KEY (service_name, level, minute)
+);
+
+-- Time-range queries across all services
+CREATE INDEX IF NOT EXISTS idx_log_counts_minute_minute ON log_counts_minute(minute);
+
+INSERT INTO log_counts_minute (service_name, level, minute, count)
+SELECT coalesce(service_name, ''), coalesce(level, ''), date_trunc('minute', timestamp), count(*)
+FROM logs
+GROUP BY 1, 2, 3
+ON CONFLICT (service_name, level, minute) DO UPDATE SET count = EXCLUDED.count;
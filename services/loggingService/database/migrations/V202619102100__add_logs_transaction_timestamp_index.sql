@@ -0,0 +1,7 @@
+-- Feature 7: Transaction traces
+
+-- /logs/trace reads every log of one transaction in time order
+CREATE INDEX IF NOT EXISTS idx_logs_transaction_id_timestamp ON logs(transaction_id, timestamp);
+
+-- Superseded by idx_logs_transaction_id_timestamp, which has transaction_id as its leading column
+DROP INDEX IF EXISTS idx_logs_transaction_id;
@@ -0,0 +1,21 @@
+import os
+
+from prometheus_client import multiprocess
+
+
+# gunicorn -c gunicorn.conf.py logging_service:app
+
+bind = f"0.0.0.0:{os.getenv('LOGGING_API_PORT', '9000')}"
+
+# Each worker process has its own database pool (up to LOGGING_DB_POOL_MAX connections)
+workers = int(os.getenv("LOGGING_API_WORKERS", "4"))
+# Threads let a worker keep answering while it streams an NDJSON export
+worker_class = "gthread"
+threads = int(os.getenv("LOGGING_API_THREADS", "4"))
+
+accesslog = "-"
+
+def child_exit(server, worker):
+    # Drops the exited worker's live gauges (db_pool_connections) from /metrics
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(worker.pid)
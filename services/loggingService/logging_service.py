@@ -1,32 +1,24 @@
 import os
 import time
 import json
-import threading
-from datetime import datetime
+import uuid
+import base64
+from datetime import datetime, timedelta, timezone
 
-import pika
 import psycopg2
-from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
+from psycopg2.extras import Json
 
-from dotenv import load_dotenv
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flasgger import Swagger
-from prometheus_client import Counter, Histogram, generate_latest
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 
+from common import db_connection, metrics_registry, normalize_level, normalize_service_name
 
-load_dotenv(dotenv_path="../../.env", override=True)
 
-POSTGRES_HOST=os.getenv("LOGGING_DB_HOST")
-POSTGRES_PORT=5432
-POSTGRES_USER=os.getenv("LOGGING_DB_USER")
-POSTGRES_PASSWORD=os.getenv("LOGGING_DB_PASSWORD")
-POSTGRES_DB=os.getenv("LOGGING_DB")
-
-RABBITMQ_HOST = os.getenv("RABBITMQ_HOST")
-RABBITMQ_QUEUE = os.getenv("RABBITMQ_QUEUE")
-
-RABBITMQ_USER = os.getenv("RABBITMQ_USER")
-RABBITMQ_PASS = os.getenv("RABBITMQ_PASS")
+# Log queries
+LOG_QUERY_DEFAULT_LIMIT = int(os.getenv("LOG_QUERY_DEFAULT_LIMIT", "100"))
+LOG_QUERY_MAX_LIMIT = int(os.getenv("LOG_QUERY_MAX_LIMIT", "1000"))
+LOG_EXPORT_FETCH_SIZE = int(os.getenv("LOG_EXPORT_FETCH_SIZE", "2000"))
 
 # Create Prometheus metrics
 REQUEST_COUNT = Counter(
@@ -39,152 +31,145 @@ REQUEST_LATENCY = Histogram(
     'HTTP Request Latency', 
     ['method', 'endpoint']
 )
-LOGS_PROCESSED = Counter(
-    'logs_processed_total',
-    'Total number of logs processed from RabbitMQ'
-)
-RABBITMQ_CONNECTION_ERRORS = Counter(
-    'rabbitmq_connection_errors_total',
-    'Total number of RabbitMQ connection errors'
-)
-
 
-def get_db_connection():
-    """Creates a new DB connection."""
-    return psycopg2.connect(
-        host=POSTGRES_HOST,
-        port=POSTGRES_PORT,
-        user=POSTGRES_USER,
-        password=POSTGRES_PASSWORD,
-        dbname=POSTGRES_DB
-    )
-
-# RabbitMQ Consumer
+# Log queries
+
+LOG_COLUMNS = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
+LOG_COLUMNS_SQL = ", ".join(LOG_COLUMNS)
+# Must match the expression of idx_logs_message_tsv for the index to be used
+MESSAGE_TSVECTOR_SQL = "to_tsvector('english', coalesce(message, ''))"
+# Levels counted as errors by /logs/stats
+ERROR_LEVELS = ("ERROR", "CRITICAL", "FATAL")
+STATS_INTERVALS = ("minute", "hour", "day")
+# Most entries /logs/trace returns for one transaction
+LOG_TRACE_MAX_ENTRIES = int(os.getenv("LOG_TRACE_MAX_ENTRIES", "5000"))
+# /logs/search parameters that aren't payload field filters
+SEARCH_PARAMS = {"q", "service", "level", "transaction_id", "start", "end", "limit"}
+
+def row_to_log(row):
+    log = dict(zip(LOG_COLUMNS, row))
+    log["timestamp"] = log["timestamp"].isoformat()
+    return log
+
+def encode_cursor(row):
+    """Opaque keyset cursor holding the (timestamp, id) of the last row of a page"""
+    log = row_to_log(row)
+    return base64.urlsafe_b64encode(json.dumps([log["timestamp"], log["id"]]).encode()).decode()
+
+def decode_cursor(cursor):
+    try:
+        timestamp, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(timestamp), int(log_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
 
-def on_message(ch, method, properties, body):
+def parse_time_bound(value, is_end=False):
     """
-    Called when a message is received from RabbitMQ. Stores the log in PostgreSQL.
+    YYYY-MM-DD or an ISO 8601 timestamp. A bare date used as the end bound
+    covers that whole day, since the end of the range is exclusive.
     """
     try:
-        data = json.loads(body)
-        print("Received log from RabbitMQ:", data)
+        bound = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}'. Use YYYY-MM-DD or an ISO 8601 timestamp")
+    if is_end and len(value) == len("YYYY-MM-DD"):
+        bound += timedelta(days=1)
+    return bound
 
-        # Validate fields
-        if not all(k in data for k in ("service_name", "level", "message")):
-            print("Missing required fields in log payload.")
-            return
+def log_filter_conditions(args):
+    """
+    Turns the service, level, transaction_id, start and end filters into SQL
+    conditions and their parameters. Every predicate compares a plain column,
+    so the logs indexes and partition pruning apply; raises ValueError on
+    invalid input.
+    """
+    conditions = []
+    params = []
+    if args.get("service"):
+        conditions.append("service_name = %s")
+        params.append(normalize_service_name(args["service"]))
+    if args.get("level"):
+        conditions.append("level = %s")
+        params.append(normalize_level(args["level"]))
+    if args.get("transaction_id"):
+        conditions.append("transaction_id = %s")
+        params.append(args["transaction_id"])
+    if args.get("start"):
+        conditions.append("timestamp >= %s")
+        params.append(parse_time_bound(args["start"]))
+    if args.get("end"):
+        conditions.append("timestamp < %s")
+        params.append(parse_time_bound(args["end"], is_end=True))
+    return conditions, params
+
+def where_clause(conditions):
+    return "WHERE " + " AND ".join(conditions) if conditions else ""
+
+def build_log_filters(args):
+    """The /logs/query filters plus its keyset cursor, as a WHERE clause and parameters"""
+    conditions, params = log_filter_conditions(args)
+    if args.get("cursor"):
+        conditions.append("(timestamp, id) < (%s, %s)")
+        params.extend(decode_cursor(args["cursor"]))
+    return where_clause(conditions), params
+
+def payload_condition(field, value):
+    """
+    Containment test for a payload field; dotted names reach into nested
+    objects (booking_details.event_id). Values that read as JSON numbers or
+    booleans also match their typed form, since query strings carry no types.
+    """
+    def nest(candidate):
+        for key in reversed(field.split(".")):
+            candidate = {key: candidate}
+        return Json(candidate)
 
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """
-            INSERT INTO logs (service_name, level, message, transaction_id)
-            VALUES (%s, %s, %s, %s)
-            """,
-            (
-                data["service_name"],
-                data["level"],
-                data["message"],
-                data.get("transaction_id", None)
-            )
-        )
-        conn.commit()
-        cur.close()
-        conn.close()
-        print("Log entry stored in DB.")
-        
-        # Increment the counter for processed logs
-        LOGS_PROCESSED.inc()
-
-    except json.JSONDecodeError:
-        print("Error decoding JSON message.")
-    except psycopg2.Error as e:
-        print("Database error:", e)
-    except Exception as e:
-        print("Unexpected error:", e)
-    finally:
-        # Always ACK so it doesn't get stuck in unacked
-        ch.basic_ack(delivery_tag=method.delivery_tag)
-
-def run_rabbitmq_consumer():
+    candidates = [value]
+    try:
+        typed = json.loads(value)
+        if isinstance(typed, (int, float, bool)) or typed is None:
+            candidates.append(typed)
+    except ValueError:
+        pass
+    return "(" + " OR ".join(["payload @> %s"] * len(candidates)) + ")", [nest(c) for c in candidates]
+
+def event_time(log):
     """
-    Continuously tries to connect to RabbitMQ and consume messages.
-    Reconnects if the connection fails.
+    When a log was emitted: the publisher's own timestamp if it sent one,
+    else when it was stored. Logs are stored in batches, so the stored
+    timestamp alone can't tell apart steps that ran milliseconds apart.
     """
-    while True:
+    published = (log.get("payload") or {}).get("timestamp")
+    if isinstance(published, str):
         try:
-            print(f"Attempting RabbitMQ connection to host: {RABBITMQ_HOST}")
+            emitted = datetime.fromisoformat(published)
+            # Stored timestamps are naive UTC, like the ones publishers send
+            return emitted.astimezone(timezone.utc).replace(tzinfo=None) if emitted.tzinfo else emitted
+        except ValueError:
+            pass
+    return datetime.fromisoformat(log["timestamp"])
 
-            # Credentials (guest/guest by default)
-            credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+def milliseconds(delta):
+    return round(delta.total_seconds() * 1000, 3)
 
-            # Create connection parameters
-            parameters = pika.ConnectionParameters(
-                host=RABBITMQ_HOST,
-                credentials=credentials,
-                socket_timeout=5,  # Set explicit timeout
-                connection_attempts=1  # Only try once per loop iteration
+def export_logs(where, params):
+    """
+    Yields every matching log as an NDJSON line. A server-side cursor fetches
+    LOG_EXPORT_FETCH_SIZE rows at a time, so memory stays flat however many
+    rows match; the pooled connection is held until the export finishes.
+    """
+    with db_connection() as conn:
+        with conn.cursor(name=f"logs_export_{uuid.uuid4().hex}") as cur:
+            cur.itersize = LOG_EXPORT_FETCH_SIZE
+            cur.execute(
+                f"SELECT {LOG_COLUMNS_SQL} FROM logs {where} ORDER BY timestamp DESC, id DESC",
+                params
             )
-
-            print(f"connection before")
-            connection = None  # Initialize to avoid UnboundLocalError
-
-            try:
-                # Establish connection with more explicit error handling
-                connection = pika.BlockingConnection(parameters)
-                print(f"connection after - SUCCESS")
-                
-                # Only proceed if we have a valid connection
-                if connection and connection.is_open:
-                    print("RabbitMQ connection established!")
-                    channel = connection.channel()
-
-                    print(f"Declaring queue: {RABBITMQ_QUEUE}")
-                    channel.queue_declare(queue=RABBITMQ_QUEUE, durable=True)
-
-                    channel.basic_qos(prefetch_count=1)
-
-                    print(f"Listening for logs on RabbitMQ queue: {RABBITMQ_QUEUE}")
-                    channel.basic_consume(
-                        queue=RABBITMQ_QUEUE,
-                        on_message_callback=on_message,
-                        auto_ack=False
-                    )
-
-                    channel.start_consuming()
-                else:
-                    print("Connection created but not open. Retrying in 5 seconds...")
-                    if connection:
-                        try:
-                            connection.close()
-                        except:
-                            pass
-                    time.sleep(5)
-                    
-            except pika.exceptions.AMQPConnectionError as e:
-                print(f"AMQP Connection Error during connection attempt: {e}")
-                RABBITMQ_CONNECTION_ERRORS.inc()
-                time.sleep(5)
-            except pika.exceptions.ConnectionClosedByBroker as e:
-                print(f"Connection closed by broker: {e}")
-                RABBITMQ_CONNECTION_ERRORS.inc()
-                time.sleep(5)
-            except pika.exceptions.ConnectionWrongStateError as e:
-                print(f"Connection wrong state: {e}")
-                RABBITMQ_CONNECTION_ERRORS.inc()
-                time.sleep(5)
-            except Exception as e:
-                print(f"Unexpected error during connection attempt: {type(e).__name__}: {e}")
-                RABBITMQ_CONNECTION_ERRORS.inc()
-                time.sleep(5)
-                
-        except Exception as e:
-            print(f"Outer exception: {type(e).__name__}: {e}")
-            RABBITMQ_CONNECTION_ERRORS.inc()
-            time.sleep(5)
+            for row in cur:
+                yield json.dumps(row_to_log(row)) + "\n"
 
 # Flask API
-
+# Served by gunicorn (see gunicorn.conf.py); logs are consumed separately by consumer.py
 
 app = Flask(__name__)
 swagger = Swagger(app)
@@ -212,302 +197,390 @@ def after_request(response):
 
 @app.route('/metrics')
 def metrics():
-    return generate_latest()
+    # Covers every gunicorn worker, not just the one answering the scrape
+    return Response(generate_latest(metrics_registry()), mimetype=CONTENT_TYPE_LATEST)
 
-@app.route('/logs/getall', methods=['GET'])
-def get_logs():
+@app.route('/logs/query', methods=['GET'])
+def query_logs():
     """
-    Get All Logs
-    ---
-    tags:
-      - Logging
-    responses:
-      200:
-        description: Successfully retrieved logs
-      404:
-        description: No logs found
-    """
-
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute("SELECT * FROM logs")
-        rows = cur.fetchall()
-        cur.close()
-        conn.close()
-
-        if not rows:
-            return jsonify({"message": "No logs found"}), 404
-
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        data = [dict(zip(columns, row)) for row in rows]
-        return jsonify(data)
-    except psycopg2.Error as e:
-        return jsonify({"error": str(e)}), 500
-    
-#Get Logs by Transaction ID and Level
-@app.route('/logs/by_transid_level/<transaction_id>/<level>', methods=['GET'])
-def get_logs_by_transaction_level(transaction_id, level):
-    """
-    Get Logs by Transaction ID and Level
+    Query Logs
     ---
     tags:
       - Logging
+    description: >
+      Returns logs newest first, filtered by any combination of the optional
+      parameters. Results are paginated: pass the returned next_cursor back as
+      `cursor` to get the next page. With format=ndjson every matching log is
+      streamed as one JSON object per line instead, without a page size limit.
     parameters:
-      - name: transaction_id
-        in: path
+      - name: service
+        in: query
         type: string
-        required: true
+        required: false
       - name: level
-        in: path
+        in: query
         type: string
-        required: true
+        required: false
         description: e.g. INFO, WARN, ERROR
-    responses:
-      200:
-        description: Logs returned
-      404:
-        description: No logs found
-    """
-    conn = get_db_connection()
-    cur = conn.cursor()
-    try:
-        cur.execute(
-            "SELECT * FROM logs WHERE transaction_id = %s AND lower(level) = lower(%s)",
-            (transaction_id, level)
-        )
-        logs = cur.fetchall()
-        if not logs:
-            return jsonify({"message": "No logs found"}), 404
-        
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        return jsonify([dict(zip(columns, log)) for log in logs])
-
-    except psycopg2.Error as e:
-        return jsonify({"error": "Database error: " + str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
-
-# Get Logs by Date and Level
-@app.route('/logs/by_date_level/<date>/<level>', methods=['GET'])
-def get_logs_by_date_level(date, level):
-    """
-    Get Logs by Date and Level
-    ---
-    tags:
-      - Logging
-    parameters:
-      - name: date
-        in: path
+      - name: transaction_id
+        in: query
         type: string
-        required: true
-        description: YYYY-MM-DD
-      - name: level
-        in: path
+        required: false
+      - name: start
+        in: query
         type: string
-        required: true
-        description: e.g. INFO, ERROR, etc.
+        required: false
+        description: YYYY-MM-DD or ISO 8601 timestamp (inclusive)
+      - name: end
+        in: query
+        type: string
+        required: false
+        description: YYYY-MM-DD (inclusive, whole day) or ISO 8601 timestamp (exclusive)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size, at most LOG_QUERY_MAX_LIMIT (default 100)
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: next_cursor from the previous page
+      - name: format
+        in: query
+        type: string
+        required: false
+        enum: [json, ndjson]
     responses:
       200:
-        description: Logs returned
+        description: A page of logs and the cursor for the next one (null on the last page)
       400:
-        description: Invalid date format
-      404:
-        description: No logs found
+        description: Invalid filter, limit or cursor
     """
     try:
-        datetime.strptime(date, "%Y-%m-%d")  # Validate Date Format
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM logs WHERE DATE(timestamp) = %s AND lower(level) = lower(%s)",
-            (date, level)
-        )
-        logs = cur.fetchall()
-        if not logs:
-            return jsonify({"message": "No logs found"}), 404
+        where, params = build_log_filters(request.args)
+        if request.args.get("format", "json") == "ndjson":
+            return Response(
+                stream_with_context(export_logs(where, params)),
+                mimetype="application/x-ndjson"
+            )
 
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        return jsonify([dict(zip(columns, log)) for log in logs])
+        limit = int(request.args.get("limit", LOG_QUERY_DEFAULT_LIMIT))
+        if not 1 <= limit <= LOG_QUERY_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {LOG_QUERY_MAX_LIMIT}")
 
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+        with db_connection() as conn, conn.cursor() as cur:
+            # One extra row tells whether there is a next page
+            cur.execute(
+                f"SELECT {LOG_COLUMNS_SQL} FROM logs {where} ORDER BY timestamp DESC, id DESC LIMIT %s",
+                params + [limit + 1]
+            )
+            rows = cur.fetchall()
+
+        logs = [row_to_log(row) for row in rows[:limit]]
+        next_cursor = encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return jsonify({"logs": logs, "next_cursor": next_cursor})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except psycopg2.Error as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
 
-# Get Logs by Service and Level
-@app.route('/logs/by_service_level/<service>/<level>', methods=['GET'])
-def get_logs_by_service_level(service, level):
+
+@app.route('/logs/search', methods=['GET'])
+def search_logs():
     """
-    Get Logs by Service and Level
+    Search Logs
     ---
     tags:
       - Logging
+    description: >
+      Full-text search over log messages combined with filters on the
+      structured fields publishers send along (error_type, booking_id,
+      booking_details.event_id, ...). Any query parameter other than the
+      ones below is a field filter, e.g. /logs/search?error_type=BillingServiceException.
+      With `q` results are ranked by relevance, otherwise newest first.
     parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Search terms; supports "quoted phrases", OR and -exclusions
       - name: service
-        in: path
+        in: query
         type: string
-        required: true
+        required: false
       - name: level
-        in: path
+        in: query
         type: string
-        required: true
+        required: false
+      - name: transaction_id
+        in: query
+        type: string
+        required: false
+      - name: start
+        in: query
+        type: string
+        required: false
+        description: YYYY-MM-DD or ISO 8601 timestamp (inclusive)
+      - name: end
+        in: query
+        type: string
+        required: false
+        description: YYYY-MM-DD (inclusive, whole day) or ISO 8601 timestamp (exclusive)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: At most LOG_QUERY_MAX_LIMIT (default 100)
     responses:
       200:
-        description: Logs returned
-      404:
-        description: No logs found
+        description: Matching logs with their payload (and rank when q is given)
+      400:
+        description: Invalid filter or limit, or no search terms or field filters
     """
-    conn = get_db_connection()
-    cur = conn.cursor()
     try:
-        cur.execute(
-            "SELECT * FROM logs WHERE lower(service_name) = lower(%s) AND lower(level) = lower(%s)",
-            (service, level)
-        )
-        logs = cur.fetchall()
-        if not logs:
-            return jsonify({"message": "No logs found"}), 404
-
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        return jsonify([dict(zip(columns, log)) for log in logs])
-
+        conditions, params = log_filter_conditions(request.args)
+        limit = int(request.args.get("limit", LOG_QUERY_DEFAULT_LIMIT))
+        if not 1 <= limit <= LOG_QUERY_MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {LOG_QUERY_MAX_LIMIT}")
+
+        field_filters = [(field, value) for field, value in request.args.items() if field not in SEARCH_PARAMS]
+        for field, value in field_filters:
+            condition, condition_params = payload_condition(field, value)
+            conditions.append(condition)
+            params.extend(condition_params)
+
+        text = request.args.get("q", "").strip()
+        if not text and not field_filters:
+            raise ValueError("Give search terms (q) and/or at least one field filter; use /logs/query to list logs")
+
+        if text:
+            conditions.append(f"{MESSAGE_TSVECTOR_SQL} @@ websearch_to_tsquery('english', %s)")
+            params.append(text)
+            sql = f"""
+                SELECT {LOG_COLUMNS_SQL}, payload,
+                       ts_rank_cd({MESSAGE_TSVECTOR_SQL}, websearch_to_tsquery('english', %s)) AS rank
+                FROM logs {where_clause(conditions)}
+                ORDER BY rank DESC, timestamp DESC, id DESC
+                LIMIT %s
+            """
+            params = [text] + params + [limit]
+        else:
+            sql = f"""
+                SELECT {LOG_COLUMNS_SQL}, payload, NULL AS rank
+                FROM logs {where_clause(conditions)}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT %s
+            """
+            params = params + [limit]
+
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, params)
+            rows = cur.fetchall()
+
+        logs = []
+        for row in rows:
+            log = row_to_log(row[:len(LOG_COLUMNS)])
+            log["payload"] = row[len(LOG_COLUMNS)]
+            if text:
+                log["rank"] = row[len(LOG_COLUMNS) + 1]
+            logs.append(log)
+        return jsonify({"logs": logs})
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except psycopg2.Error as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
 
-# Get Logs by Date Range and Level
-@app.route('/logs/by_date_range_level/<start_date>/<end_date>/<level>', methods=['GET'])
-def get_logs_by_date_range_level(start_date, end_date, level):
+@app.route('/logs/stats', methods=['GET'])
+def log_stats():
     """
-    Get Logs by Date Range and Level
+    Log Counts and Error Rates
     ---
     tags:
       - Logging
+    description: >
+      Log counts per service and time bucket, with a per-level breakdown and
+      the share of ERROR/CRITICAL/FATAL logs. Answered from the per-minute
+      rollup table, never from the logs themselves, so bounds are effectively
+      rounded to the minute.
     parameters:
-      - name: start_date
-        in: path
-        type: string
-        required: true
-        description: YYYY-MM-DD
-      - name: end_date
-        in: path
+      - name: service
+        in: query
         type: string
-        required: true
-        description: YYYY-MM-DD
+        required: false
       - name: level
-        in: path
+        in: query
         type: string
-        required: true
+        required: false
+      - name: start
+        in: query
+        type: string
+        required: false
+        description: YYYY-MM-DD or ISO 8601 timestamp (inclusive); defaults to 24 hours before end
+      - name: end
+        in: query
+        type: string
+        required: false
+        description: YYYY-MM-DD (inclusive, whole day) or ISO 8601 timestamp (exclusive); defaults to now
+      - name: interval
+        in: query
+        type: string
+        required: false
+        enum: [minute, hour, day]
+        description: Bucket size (default hour)
     responses:
       200:
-        description: Logs returned
+        description: One entry per service and bucket, oldest first
       400:
-        description: Invalid date format
-      404:
-        description: No logs found
+        description: Invalid filter or interval
     """
     try:
-        datetime.strptime(start_date, "%Y-%m-%d")
-        datetime.strptime(end_date, "%Y-%m-%d")
-
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            "SELECT * FROM logs WHERE DATE(timestamp) BETWEEN %s AND %s AND lower(level) = lower(%s)",
-            (start_date, end_date, level)
-        )
-        logs = cur.fetchall()
-        if not logs:
-            return jsonify({"message": "No logs found"}), 404
-
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        return jsonify([dict(zip(columns, log)) for log in logs])
-
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+        interval = request.args.get("interval", "hour")
+        if interval not in STATS_INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(STATS_INTERVALS)}")
+        end = parse_time_bound(request.args["end"], is_end=True) if request.args.get("end") else datetime.now()
+        start = parse_time_bound(request.args["start"]) if request.args.get("start") else end - timedelta(days=1)
+
+        conditions = ["minute >= %s", "minute < %s"]
+        params = [interval, start, end]
+        if request.args.get("service"):
+            conditions.append("service_name = %s")
+            params.append(normalize_service_name(request.args["service"]))
+        if request.args.get("level"):
+            conditions.append("level = %s")
+            params.append(normalize_level(request.args["level"]))
+
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT date_trunc(%s, minute) AS bucket, service_name, level, sum(count)
+                FROM log_counts_minute {where_clause(conditions)}
+                GROUP BY 1, 2, 3
+                ORDER BY 1, 2
+                """,
+                params
+            )
+            rows = cur.fetchall()
+
+        buckets = {}
+        for bucket, service_name, level, count in rows:
+            entry = buckets.setdefault((bucket, service_name), {
+                "bucket": bucket.isoformat(),
+                "service_name": service_name,
+                "total": 0,
+                "errors": 0,
+                "levels": {}
+            })
+            entry["levels"][level] = int(count)
+            entry["total"] += int(count)
+            if level in ERROR_LEVELS:
+                entry["errors"] += int(count)
+        for entry in buckets.values():
+            entry["error_rate"] = entry["errors"] / entry["total"] if entry["total"] else 0.0
+
+        return jsonify({
+            "interval": interval,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "buckets": list(buckets.values())
+        })
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except psycopg2.Error as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
 
-# Get Logs by Service, Level, and Date Range
-@app.route('/logs/by_service_level_daterange/<service>/<level>/<start_date>/<end_date>', methods=['GET'])
-def get_logs_by_service_level_daterange(service, level, start_date, end_date):
+@app.route('/logs/trace/<transaction_id>', methods=['GET'])
+def trace_transaction(transaction_id):
     """
-    Get Logs by Service, Level, and Date Range
+    Transaction Trace
     ---
     tags:
       - Logging
+    description: >
+      Every log of one transaction (a booking ID, payment intent ID, ...)
+      across all services, in the order they were emitted. Each timeline
+      entry carries the time since the first entry and since the previous
+      one, so slow steps stand out; services summarizes each service's part.
     parameters:
-      - name: service
-        in: path
-        type: string
-        required: true
-      - name: level
-        in: path
-        type: string
-        required: true
-      - name: start_date
-        in: path
-        type: string
-        required: true
-        description: YYYY-MM-DD
-      - name: end_date
+      - name: transaction_id
         in: path
         type: string
         required: true
-        description: YYYY-MM-DD
     responses:
       200:
-        description: Logs returned
-      400:
-        description: Invalid date format
+        description: Timeline and per-service summary
       404:
         description: No logs found
     """
     try:
-        datetime.strptime(start_date, "%Y-%m-%d")
-        datetime.strptime(end_date, "%Y-%m-%d")
-
-        conn = get_db_connection()
-        cur = conn.cursor()
-        cur.execute(
-            """SELECT * FROM logs WHERE lower(service_name) = lower(%s) 
-            AND lower(level) = lower(%s) 
-            AND DATE(timestamp) BETWEEN %s AND %s""",
-            (service, level, start_date, end_date)
-        )
-        logs = cur.fetchall()
-        if not logs:
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(
+                f"""
+                SELECT {LOG_COLUMNS_SQL}, payload FROM logs
+                WHERE transaction_id = %s
+                ORDER BY timestamp, id
+                LIMIT %s
+                """,
+                (transaction_id, LOG_TRACE_MAX_ENTRIES + 1)
+            )
+            rows = cur.fetchall()
+
+        if not rows:
             return jsonify({"message": "No logs found"}), 404
 
-        columns = ["id", "service_name", "level", "message", "transaction_id", "timestamp"]
-        return jsonify([dict(zip(columns, log)) for log in logs])
+        timeline = []
+        for row in rows[:LOG_TRACE_MAX_ENTRIES]:
+            log = row_to_log(row[:len(LOG_COLUMNS)])
+            log["payload"] = row[len(LOG_COLUMNS)]
+            timeline.append(log)
+        times = {log["id"]: event_time(log) for log in timeline}
+        timeline.sort(key=lambda log: (times[log["id"]], log["id"]))
+
+        started = times[timeline[0]["id"]]
+        services = {}
+        previous = started
+        for log in timeline:
+            emitted = times[log["id"]]
+            log["emitted_at"] = emitted.isoformat()
+            log["elapsed_ms"] = milliseconds(emitted - started)
+            log["since_previous_ms"] = milliseconds(emitted - previous)
+            previous = emitted
+
+            service = services.setdefault(log["service_name"], {
+                "service_name": log["service_name"],
+                "first_at": emitted,
+                "last_at": emitted,
+                "entries": 0,
+                "errors": 0
+            })
+            service["last_at"] = emitted
+            service["entries"] += 1
+            if log["level"] in ERROR_LEVELS:
+                service["errors"] += 1
+
+        # In order of each service's first appearance
+        for service in services.values():
+            service["duration_ms"] = milliseconds(service["last_at"] - service["first_at"])
+            service["started_after_ms"] = milliseconds(service["first_at"] - started)
+            service["first_at"] = service["first_at"].isoformat()
+            service["last_at"] = service["last_at"].isoformat()
+
+        return jsonify({
+            "transaction_id": transaction_id,
+            "duration_ms": milliseconds(previous - started),
+            "truncated": len(rows) > LOG_TRACE_MAX_ENTRIES,
+            "services": list(services.values()),
+            "timeline": timeline
+        })
 
-    except ValueError:
-        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     except psycopg2.Error as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        cur.close()
-        conn.close()
-
 
 # Start
 if __name__ == '__main__':
-    print("Starting Logging Service...")
-
-    # Start the RabbitMQ consumer in a background thread
-    consumer_thread = threading.Thread(target=run_rabbitmq_consumer, daemon=True)
-    consumer_thread.start()
-
-    # Run Flask with debug=False to avoid multiple consumer threads
+    # Development server only; see gunicorn.conf.py
+    print("Starting Logging Service API...")
     app.run(host="0.0.0.0", port=9000, debug=False)
@@ -1,9 +1,11 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from src.api.routes.refund_service import router as refund_router
+from src.messaging.logging_publisher import close_logging_publisher
 from prometheus_client import make_asgi_app, Counter, Histogram
 import time
 import os
+import asyncio
 import logging
 from starlette.middleware.base import BaseHTTPMiddleware
 
@@ -87,4 +89,7 @@ def read_root():
 async def health_check():
     return {"status": "healthy"}
 
-
+# Publish the logs still buffered before exiting
+@app.on_event("shutdown")
+async def shutdown_event():
+    await asyncio.to_thread(close_logging_publisher)
@@ -1,28 +1,25 @@
 # publish refund request and status to logging service queue 
-import json
 import pika
+from log_shipping import LogShipper
 from src.config.settings import RABBITMQ_HOST, RABBITMQ_PORT, RABBITMQ_USER, RABBITMQ_PASS, LOGGING_QUEUE
 
-def _publish_message(payload: dict):
-    """Internal helper to publish a JSON payload to the logging queue."""
-    credentials = pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
-    parameters = pika.ConnectionParameters(
+# Buffers logs and publishes them in batches from a background thread over one connection
+_shipper = LogShipper(
+    pika.ConnectionParameters(
         host=RABBITMQ_HOST,
         port=RABBITMQ_PORT,
-        credentials=credentials
-    )
-    
-    connection = pika.BlockingConnection(parameters)
-    channel = connection.channel()
-    # Declare the logging queue (ensures it exists)
-    channel.queue_declare(queue=LOGGING_QUEUE, durable=True)
-    # Publish the payload
-    channel.basic_publish(
-        exchange="",
-        routing_key=LOGGING_QUEUE,
-        body=json.dumps(payload)
-    )
-    connection.close()
+        credentials=pika.PlainCredentials(RABBITMQ_USER, RABBITMQ_PASS)
+    ),
+    LOGGING_QUEUE
+)
+
+def _publish_message(payload: dict):
+    """Internal helper to queue a JSON payload for the logging queue; returns without waiting on RabbitMQ."""
+    _shipper.ship(payload)
+
+def close_logging_publisher():
+    """Publish the logs still buffered; blocks for at most a few seconds."""
+    _shipper.close()
 
 def publish_refund_request_log(service_name: str, transaction_id: str, message: str, level: str = "INFO"):
 
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: booking/ticket response serialization cost per 10k tickets.
+
+Compares the previous path (ORM instances -> hand-built dicts with str(uuid)
+-> response_model validation -> json) against the current one (column tuples
+-> precompiled serializers -> orjson), plus BookingStatusType row conversion.
+
+Run from the service root:
+    python -m benchmarks.serialization_benchmark
+"""
+import json
+import os
+import timeit
+import uuid
+from datetime import datetime, timezone
+from typing import List
+
+# Importing the src package pulls in the auth module, which requires the
+# Cognito settings to be present. No network calls are made.
+os.environ.setdefault("AWS_COGNITO_USER_POOL_ID", "benchmark")
+os.environ.setdefault("AWS_COGNITO_APP_CLIENT_ID", "benchmark")
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.core.enums import BookingStatus
+from src.models.booking import BookingStatusType
+from src.models.ticket import Ticket
+from src.schemas.serializers import serialize_tickets
+from src.schemas.ticket import TicketResponse
+
+N_TICKETS = 10_000
+REPEAT = 5
+
+
+def legacy_process_result_value(value):
+    """BookingStatusType.process_result_value before the lookup table"""
+    if value is None:
+        return None
+    try:
+        value = value.split('.')[-1]
+        return BookingStatus(str(value).upper())
+    except ValueError:
+        return None
+
+
+def legacy_format_ticket_response(ticket: Ticket) -> dict:
+    return {
+        "ticket_id": str(ticket.ticket_id),
+        "booking_id": str(ticket.booking_id),
+        "created_at": ticket.created_at
+    }
+
+
+def build_fixtures():
+    now = datetime.now(timezone.utc)
+    booking_ids = [uuid.uuid4() for _ in range(N_TICKETS // 4)]
+    rows = [
+        (uuid.uuid4(), booking_ids[i % len(booking_ids)], now)
+        for i in range(N_TICKETS)
+    ]
+    orm_tickets = [
+        Ticket(ticket_id=ticket_id, booking_id=booking_id, created_at=created_at)
+        for ticket_id, booking_id, created_at in rows
+    ]
+    statuses = [status.value for status in BookingStatus] * (N_TICKETS // len(BookingStatus))
+    return rows, orm_tickets, statuses
+
+
+def report(name: str, seconds: float) -> None:
+    per_call_ms = seconds / REPEAT * 1000
+    print(f"{name:<48} {per_call_ms:9.2f} ms / {N_TICKETS} rows")
+
+
+def main():
+    rows, orm_tickets, statuses = build_fixtures()
+    adapter = TypeAdapter(List[TicketResponse])
+    status_type = BookingStatusType()
+
+    def tickets_before():
+        content = [legacy_format_ticket_response(ticket) for ticket in orm_tickets]
+        validated = adapter.validate_python(content)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def tickets_after():
+        return orjson.dumps(serialize_tickets(rows))
+
+    def status_before():
+        return [legacy_process_result_value(value) for value in statuses]
+
+    def status_after():
+        process = status_type.process_result_value
+        return [process(value, None) for value in statuses]
+
+    # Both paths must emit the same tickets (timestamps differ only in "Z" vs "+00:00")
+    ids = lambda body: [(t["ticket_id"], t["booking_id"]) for t in orjson.loads(body)]
+    assert ids(tickets_before()) == ids(tickets_after())
+    assert status_before() == status_after()
+
+    report("tickets: ORM + str(uuid) + response_model + json", timeit.timeit(tickets_before, number=REPEAT))
+    report("tickets: tuples + serializer + orjson", timeit.timeit(tickets_after, number=REPEAT))
+    report("status: split/upper/Enum()", timeit.timeit(status_before, number=REPEAT))
+    report("status: lookup table", timeit.timeit(status_after, number=REPEAT))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+-- =========================================
+-- Pending booking expiry: partial index
+-- =========================================
+-- The expiry sweeper only ever scans PENDING bookings ordered by age, so a
+-- partial index keeps that scan proportional to the pending backlog instead
+-- of the whole bookings table.
+CREATE INDEX IF NOT EXISTS idx_bookings_pending_created_at
+    ON bookings (created_at)
+    WHERE status = 'PENDING';
@@ -0,0 +1,23 @@
+-- =========================================
+-- Idempotent booking creation
+-- =========================================
+-- One row per (user, Idempotency-Key) sent to POST /bookings/book. The row is
+-- inserted in the same transaction as the booking it creates, so a retried or
+-- concurrent duplicate request either blocks on the unique index and then
+-- replays the stored response, or (if the first attempt rolled back) creates
+-- the booking itself.
+CREATE TABLE IF NOT EXISTS booking_idempotency_keys (
+    user_id VARCHAR(36) NOT NULL,
+    idempotency_key VARCHAR(255) NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    booking_id UUID REFERENCES bookings(booking_id) ON DELETE CASCADE,
+    response JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_booking_idempotency_keys_user_key
+    ON booking_idempotency_keys (user_id, idempotency_key);
+
+-- Used by the retention purge
+CREATE INDEX IF NOT EXISTS idx_booking_idempotency_keys_created_at
+    ON booking_idempotency_keys (created_at);
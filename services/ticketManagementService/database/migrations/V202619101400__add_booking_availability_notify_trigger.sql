@@ -0,0 +1,29 @@
+-- =========================================
+-- Availability change feed: LISTEN/NOTIFY
+-- =========================================
+-- Availability only counts tickets of CONFIRMED bookings, so notify the
+-- `booking_availability` channel with the event_id whenever a booking enters
+-- or leaves CONFIRMED. NOTIFY is delivered on commit and duplicate payloads
+-- within one transaction are collapsed by Postgres.
+CREATE OR REPLACE FUNCTION notify_booking_availability()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        IF OLD.status = 'CONFIRMED' THEN
+            PERFORM pg_notify('booking_availability', OLD.event_id::text);
+        END IF;
+        RETURN OLD;
+    END IF;
+
+    IF (TG_OP = 'INSERT' AND NEW.status = 'CONFIRMED')
+        OR (TG_OP = 'UPDATE' AND (OLD.status = 'CONFIRMED') <> (NEW.status = 'CONFIRMED')) THEN
+        PERFORM pg_notify('booking_availability', NEW.event_id::text);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notify_booking_availability
+AFTER INSERT OR UPDATE OF status OR DELETE ON bookings
+FOR EACH ROW
+EXECUTE FUNCTION notify_booking_availability();
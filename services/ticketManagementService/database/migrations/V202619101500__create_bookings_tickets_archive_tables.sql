@@ -0,0 +1,27 @@
+-- =========================================
+-- Archive tables for bookings and tickets
+-- =========================================
+-- Bookings (and their tickets) for events that ended long ago are moved here
+-- in bounded batches by the archiver, keeping the hot tables and their indexes
+-- sized to upcoming events. Read endpoints only union these tables when called
+-- with include_archived=true.
+CREATE TABLE IF NOT EXISTS bookings_archive (
+    booking_id UUID PRIMARY KEY,
+    user_id VARCHAR(36) NOT NULL,
+    event_id UUID NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    created_at TIMESTAMP,
+    updated_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS tickets_archive (
+    ticket_id UUID PRIMARY KEY,
+    booking_id UUID NOT NULL REFERENCES bookings_archive(booking_id) ON DELETE CASCADE,
+    created_at TIMESTAMP,
+    archived_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_tickets_archive_booking_id ON tickets_archive(booking_id);
+CREATE INDEX IF NOT EXISTS idx_bookings_archive_user_id ON bookings_archive(user_id);
+CREATE INDEX IF NOT EXISTS idx_bookings_archive_event_id ON bookings_archive(event_id);
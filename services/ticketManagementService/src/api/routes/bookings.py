@@ -1,22 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from uuid import UUID
+import asyncio
 import logging
 
 from ...core.database import get_db
 from ...models.booking import Booking
 from ...models.ticket import Ticket
+from ...models.archive import BookingArchive, TicketArchive
 from ...schemas.booking import BookingRequest, BookingResponse, BookingStatus
+from ...schemas.serializers import (
+    ARCHIVED_BOOKING_COLUMNS,
+    ARCHIVED_TICKET_COLUMNS,
+    BOOKING_COLUMNS,
+    TICKET_COLUMNS,
+    group_tickets_by_booking,
+    serialize_booking,
+)
 from ...core.auth import get_current_user_id, validate_token
-from typing import List
+from typing import List, Optional
 from ...services.booking_service import BookingService, TicketFilterType
+from ...services.event_service import event_service
 
 router = APIRouter(tags=["bookings"])
 booking_service = BookingService()
 
 logger = logging.getLogger(__name__)
 
+INCLUDE_ARCHIVED = Query(False, description="Also return bookings of archived (long-ended) events")
+
 # Test endpoints (no auth required)
 @router.get("/test")
 async def test_endpoints(claims: dict = Depends(validate_token)):
@@ -33,20 +47,44 @@ async def test_endpoints(claims: dict = Depends(validate_token)):
 @router.post("/bookings/book", response_model=BookingResponse)
 async def create_booking(
     booking: BookingRequest,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    current_user_id: str = Depends(get_current_user_id)
+    current_user_id: str = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key")
 ):
+    """
+    Create a PENDING booking. Clients that may retry should send an
+    `Idempotency-Key` header: repeats of the same key (per user) return the
+    original response with `Idempotent-Replayed: true` instead of a new booking.
+
+    Answers 409 if the event doesn't have enough seats left; bookings that are
+    PENDING or CONFIRMED hold their seats.
+    """
     try:
         # Use custom:id directly as string
         logger.debug(f"Creating booking for user (custom:id): {current_user_id}")
         
         booking_data = booking.dict()
         booking_data["user_id"] = current_user_id
+
+        # Capacity is checked against it inside the booking's transaction
+        event = await asyncio.to_thread(event_service.get_event, booking.event_id)
+        if event is None:
+            raise HTTPException(status_code=404, detail="Event not found")
+        booking_data["capacity"] = event["capacity"]
         
         # Log the booking data for debugging
         logger.debug(f"Creating booking with data: {booking_data}")
         
-        return await booking_service.create_booking(booking_data, db)
+        if idempotency_key is None:
+            return await booking_service.create_booking(booking_data, db)
+
+        result, replayed = await booking_service.create_booking_idempotent(booking_data, idempotency_key, db)
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating booking: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating booking: {str(e)}")
@@ -54,6 +92,7 @@ async def create_booking(
 @router.get("/bookings/user/{user_id}", response_model=List[BookingResponse])
 async def get_user_bookings(
     user_id: str,
+    include_archived: bool = INCLUDE_ARCHIVED,
     db: AsyncSession = Depends(get_db),
     current_user_id: str = Depends(get_current_user_id)
 ):
@@ -68,61 +107,37 @@ async def get_user_bookings(
         raise HTTPException(status_code=403, detail="Cannot access other users' bookings")
     
     try:
-        # Get all bookings for the user
+        # Get all bookings for the user as column tuples
         logger.debug(f"Querying database for bookings with user_id: {user_id}")
-        bookings_query = select(Booking).where(Booking.user_id == user_id)
-        bookings_result = await db.execute(bookings_query)
-        bookings = bookings_result.scalars().all()
+        bookings_query = select(*BOOKING_COLUMNS).where(Booking.user_id == user_id)
+        if include_archived:
+            bookings_query = bookings_query.union_all(
+                select(*ARCHIVED_BOOKING_COLUMNS).where(BookingArchive.user_id == user_id)
+            )
+        bookings = (await db.execute(bookings_query)).tuples().all()
         
         logger.debug(f"Found {len(bookings)} bookings in database")
         if not bookings:
             logger.debug(f"No bookings found for user {user_id}")
-            return []
+            return ORJSONResponse(content=[])
         
         # Get all tickets for these bookings in a single query
-        booking_ids = [str(booking.booking_id) for booking in bookings]  # Convert UUIDs to strings
-        logger.debug(f"Found bookings with IDs: {booking_ids}")
-        tickets_query = select(Ticket).where(Ticket.booking_id.in_([UUID(bid) for bid in booking_ids]))  # Convert strings back to UUIDs
-        tickets_result = await db.execute(tickets_query)
-        tickets = tickets_result.scalars().all()
-        
-        # Create a mapping of booking_id to tickets
-        tickets_by_booking = {}
-        for ticket in tickets:
-            booking_id_str = str(ticket.booking_id)  # Convert UUID to string for dictionary key
-            if booking_id_str not in tickets_by_booking:
-                tickets_by_booking[booking_id_str] = []
-            tickets_by_booking[booking_id_str].append(ticket)
+        booking_ids = [booking[0] for booking in bookings]
+        tickets_query = select(*TICKET_COLUMNS).where(Ticket.booking_id.in_(booking_ids))
+        if include_archived:
+            tickets_query = tickets_query.union_all(
+                select(*ARCHIVED_TICKET_COLUMNS).where(TicketArchive.booking_id.in_(booking_ids))
+            )
+        tickets_by_booking = group_tickets_by_booking((await db.execute(tickets_query)).tuples())
         
         # Create booking responses
-        booking_responses = []
-        for booking in bookings:
-            booking_id_str = str(booking.booking_id)
-            booking_tickets = tickets_by_booking.get(booking_id_str, [])
-            
-            booking_dict = {
-                "booking_id": booking_id_str,
-                "user_id": booking.user_id,  # Already a string
-                "event_id": str(booking.event_id),  # Convert UUID to string
-                "status": booking.status.value if booking.status else None,
-                "created_at": booking.created_at,
-                "updated_at": booking.updated_at,
-                "ticket_quantity": len(booking_tickets),  # Add ticket quantity
-                "total_amount": 0.0,  # Default to 0.0 as total amount is managed by billing service
-                "tickets": [
-                    {
-                        "ticket_id": str(ticket.ticket_id),
-                        "booking_id": str(ticket.booking_id),
-                        "created_at": ticket.created_at
-                    }
-                    for ticket in booking_tickets
-                ]
-            }
-            booking_responses.append(booking_dict)
+        booking_responses = [
+            serialize_booking(booking, tickets_by_booking.get(booking[0], []))
+            for booking in bookings
+        ]
         
         logger.debug(f"Returning {len(booking_responses)} bookings")
-        logger.debug(f"First booking response: {booking_responses[0] if booking_responses else 'None'}")
-        return booking_responses
+        return ORJSONResponse(content=booking_responses)
     except Exception as e:
         logger.error(f"Error fetching bookings: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error fetching bookings: {str(e)}")
@@ -130,11 +145,12 @@ async def get_user_bookings(
 @router.get("/bookings/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: UUID,
+    include_archived: bool = INCLUDE_ARCHIVED,
     db: AsyncSession = Depends(get_db),
     current_user_id: str = Depends(get_current_user_id)
 ):
     # Get the booking first
-    booking = await booking_service.get_booking_by_id(booking_id, db)
+    booking = await booking_service.get_booking_by_id(booking_id, db, include_archived=include_archived)
     
     # Add detailed logging
     logger.debug(f"=== GET /bookings/{booking_id} ===")
@@ -146,7 +162,7 @@ async def get_booking(
         logger.warning(f"User {current_user_id} attempted to access booking {booking_id} owned by user {booking['user_id']}")
         raise HTTPException(status_code=403, detail="Cannot access other users' bookings")
     
-    return booking
+    return ORJSONResponse(content=booking)
 
 @router.post("/bookings/{booking_id}/confirm")
 async def confirm_booking(
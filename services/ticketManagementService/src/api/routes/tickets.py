@@ -1,5 +1,7 @@
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 import requests
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
@@ -11,20 +13,19 @@ from ...core.config import get_settings
 from ...core.database import get_db
 from ...models.booking import Booking
 from ...models.ticket import Ticket
+from ...models.archive import BookingArchive
 from ...schemas.ticket import TicketResponse, UserEventTicketsResponse
 from ...schemas.booking import BookingStatus
+from ...schemas.serializers import ARCHIVED_TICKET_COLUMNS, TICKET_COLUMNS, serialize_tickets
 from ...core.auth import get_current_user_id
+from ...services.availability_feed import FeedFullError, availability_feed
+from ...services.event_service import event_service
 
 router = APIRouter(tags=["tickets"])
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
-def format_ticket_response(ticket: Ticket) -> dict:
-    return {
-        "ticket_id": str(ticket.ticket_id),
-        "booking_id": str(ticket.booking_id),
-        "created_at": ticket.created_at
-    }
+INCLUDE_ARCHIVED = Query(False, description="Also return tickets of archived (long-ended) events")
 
 @router.get(
     "/tickets/user/{user_id}",
@@ -33,17 +34,21 @@ def format_ticket_response(ticket: Ticket) -> dict:
 )
 async def get_user_tickets(
     user_id: str,
+    include_archived: bool = INCLUDE_ARCHIVED,
     db: AsyncSession = Depends(get_db),
     current_user_id: str = Depends(get_current_user_id)
 ):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Cannot access other users' tickets")
 
-    query = select(Ticket).join(Booking).where(Booking.user_id == user_id)
-    result = await db.execute(query)
-    tickets = result.scalars().all()
+    query = select(*TICKET_COLUMNS).join(Booking).where(Booking.user_id == user_id)
+    if include_archived:
+        query = query.union_all(
+            select(*ARCHIVED_TICKET_COLUMNS).join(BookingArchive).where(BookingArchive.user_id == user_id)
+        )
+    rows = (await db.execute(query)).tuples().all()
     
-    return [format_ticket_response(ticket) for ticket in tickets]
+    return ORJSONResponse(content=serialize_tickets(rows))
 
 @router.get(
     "/tickets/event/{event_id}",
@@ -52,14 +57,18 @@ async def get_user_tickets(
 )
 async def get_event_tickets(
     event_id: UUID,
+    include_archived: bool = INCLUDE_ARCHIVED,
     db: AsyncSession = Depends(get_db),
     _: str = Depends(get_current_user_id)
 ):
-    query = select(Ticket).join(Booking).where(Booking.event_id == event_id)
-    result = await db.execute(query)
-    tickets = result.scalars().all()
+    query = select(*TICKET_COLUMNS).join(Booking).where(Booking.event_id == event_id)
+    if include_archived:
+        query = query.union_all(
+            select(*ARCHIVED_TICKET_COLUMNS).join(BookingArchive).where(BookingArchive.event_id == event_id)
+        )
+    rows = (await db.execute(query)).tuples().all()
     
-    return [format_ticket_response(ticket) for ticket in tickets]
+    return ORJSONResponse(content=serialize_tickets(rows))
 
 @router.get(
     "/tickets/event/{event_id}/available",
@@ -99,6 +108,72 @@ async def get_available_tickets(
         "booked_tickets": booked_tickets
     }
 
+@router.get(
+    "/tickets/event/{event_id}/available/stream",
+    summary="Stream Available Tickets Count"
+)
+async def stream_available_tickets(event_id: UUID):
+    """
+    Server-Sent Events feed of seat availability for an event.
+
+    Sends a `snapshot` event on connect (same fields as the /available
+    endpoint), then a `delta` event whenever the confirmed ticket count
+    changes. All viewers of an event share one recomputation per change, and
+    the stream holds no database connection while idle.
+
+    Unauthenticated on purpose: browsers' EventSource can't send an
+    Authorization header, and the feed only carries seat counts that event
+    pages already show publicly, so a token in the URL would buy nothing.
+    Because of that, the event is checked with the events service before its
+    first viewer is subscribed, and the number of watched events and open
+    streams is capped (503 beyond that).
+    """
+    try:
+        availability_feed.check_room(event_id)
+    except FeedFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    # Only an event nobody is watching yet needs checking; 404/503 from here
+    event_data = None
+    if not availability_feed.is_watching(event_id):
+        event_data = await asyncio.to_thread(fetch_event_data, event_id)
+
+    async def load_capacity() -> int:
+        data = event_data or await asyncio.to_thread(fetch_event_data, event_id)
+        return data.get("capacity", 0)
+
+    async def event_stream():
+        # Subscribed inside the generator so a client gone before the first
+        # chunk never leaves a queue behind
+        queue = None
+        try:
+            try:
+                queue = await availability_feed.subscribe(event_id, load_capacity)
+            except (FeedFullError, HTTPException) as e:
+                # Filled up or the event vanished since the checks above; just end the stream
+                logger.warning(f"Availability stream for event {event_id} closed: {e}")
+                return
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        queue.get(),
+                        timeout=settings.AVAILABILITY_FEED_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {message['type']}\ndata: {orjson.dumps(message).decode()}\n\n"
+        finally:
+            if queue is not None:
+                availability_feed.unsubscribe(event_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get(
     "/tickets/user/{user_id}/event/{event_id}",
     response_model=List[TicketResponse],
@@ -107,33 +182,36 @@ async def get_available_tickets(
 async def get_user_event_tickets(
     user_id: str,
     event_id: UUID,
+    include_archived: bool = INCLUDE_ARCHIVED,
     db: AsyncSession = Depends(get_db),
     current_user_id: str = Depends(get_current_user_id)
 ):
     if user_id != current_user_id:
         raise HTTPException(status_code=403, detail="Cannot access other users' tickets")
 
-    query = select(Ticket).join(Booking).where(
+    query = select(*TICKET_COLUMNS).join(Booking).where(
         Booking.user_id == user_id,
         Booking.event_id == event_id
     )
-    result = await db.execute(query)
-    tickets = result.scalars().all()
+    if include_archived:
+        query = query.union_all(
+            select(*ARCHIVED_TICKET_COLUMNS).join(BookingArchive).where(
+                BookingArchive.user_id == user_id,
+                BookingArchive.event_id == event_id
+            )
+        )
+    rows = (await db.execute(query)).tuples().all()
     
-    return [format_ticket_response(ticket) for ticket in tickets]
+    return ORJSONResponse(content=serialize_tickets(rows))
 
-def fetch_event_data(event_id: str):
-    response = requests.get(f"{settings.EVENT_SERVICE_URL}/api/v1/events/{event_id}")
-    if response.status_code != 200:
+def fetch_event_data(event_id: UUID):
+    try:
+        event_json = event_service.get_event(event_id)
+    except requests.RequestException as e:
+        logger.error(f"Error fetching event {event_id}: {str(e)}")
+        raise HTTPException(status_code=503, detail="Events service unavailable")
+    if event_json is None:
         raise HTTPException(status_code=404, detail="Event not found")
-    event_json = response.json()
-    
-    # Convert capacity to int here
-    if "capacity" in event_json:
-        try:
-            event_json["capacity"] = int(event_json["capacity"])
-        except (ValueError, TypeError):
-            event_json["capacity"] = 0
-            
+
     logger.debug(f"Received event data: {event_json}")
     return event_json
\ No newline at end of file
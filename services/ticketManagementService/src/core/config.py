@@ -14,6 +14,32 @@ class Settings(BaseSettings):
     RABBITMQ_QUEUE: str = os.getenv("RABBITMQ_QUEUE", "logs_queue")
     FRONTEND_URL: str = os.getenv("FRONTEND_URL", "http://localhost:3000")
     EVENT_SERVICE_URL: str = os.getenv("EVENT_SERVICE_URL", "http://events-service:8001")
+    EVENT_SERVICE_TIMEOUT_SECONDS: float = float(os.getenv("EVENT_SERVICE_TIMEOUT_SECONDS", "5"))
+    BOOKING_EXCHANGE: str = os.getenv("BOOKING_EXCHANGE", "booking")
+
+    # Pending booking expiry sweeper. The TTL must outlast the booking's Stripe checkout
+    # session (expires 30 minutes after creation, Stripe's minimum) plus time for the
+    # confirmation to arrive, so a booking is never expired while it can still be paid for
+    PENDING_BOOKING_TTL_SECONDS: int = int(os.getenv("PENDING_BOOKING_TTL_SECONDS", "2100"))
+    PENDING_SWEEP_INTERVAL_SECONDS: int = int(os.getenv("PENDING_SWEEP_INTERVAL_SECONDS", "60"))
+    PENDING_SWEEP_BATCH_SIZE: int = int(os.getenv("PENDING_SWEEP_BATCH_SIZE", "100"))
+
+    # Idempotency-Key handling for POST /bookings/book
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = int(os.getenv("IDEMPOTENCY_CACHE_TTL_SECONDS", "300"))
+    IDEMPOTENCY_CACHE_MAX_ENTRIES: int = int(os.getenv("IDEMPOTENCY_CACHE_MAX_ENTRIES", "10000"))
+    IDEMPOTENCY_KEY_RETENTION_HOURS: int = int(os.getenv("IDEMPOTENCY_KEY_RETENTION_HOURS", "24"))
+
+    # Availability change feed (SSE)
+    AVAILABILITY_FEED_DEBOUNCE_MS: int = int(os.getenv("AVAILABILITY_FEED_DEBOUNCE_MS", "200"))
+    AVAILABILITY_FEED_HEARTBEAT_SECONDS: int = int(os.getenv("AVAILABILITY_FEED_HEARTBEAT_SECONDS", "15"))
+    AVAILABILITY_FEED_QUEUE_SIZE: int = int(os.getenv("AVAILABILITY_FEED_QUEUE_SIZE", "8"))
+    AVAILABILITY_FEED_MAX_EVENTS: int = int(os.getenv("AVAILABILITY_FEED_MAX_EVENTS", "500"))
+    AVAILABILITY_FEED_MAX_SUBSCRIBERS: int = int(os.getenv("AVAILABILITY_FEED_MAX_SUBSCRIBERS", "5000"))
+
+    # Archival of bookings/tickets for ended events
+    ARCHIVE_AFTER_DAYS: int = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+    ARCHIVE_INTERVAL_SECONDS: int = int(os.getenv("ARCHIVE_INTERVAL_SECONDS", "3600"))
+    ARCHIVE_BATCH_SIZE: int = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
 
 @lru_cache()
 def get_settings():
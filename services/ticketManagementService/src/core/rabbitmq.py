@@ -45,6 +45,25 @@ class RabbitMQClient:
             routing_key=queue_name
         )
 
+    async def publish_to_exchange(self, exchange_name: str, routing_key: str, message: Dict[str, Any]):
+        """Publish a message to a topic exchange with the given routing key"""
+        await self.connect()
+
+        # Declare exchange (same settings as the consumer side)
+        exchange = await self.channel.declare_exchange(
+            exchange_name,
+            aio_pika.ExchangeType.TOPIC,
+            durable=True
+        )
+
+        message = aio_pika.Message(
+            body=json.dumps(message).encode(),
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+            content_type='application/json'
+        )
+
+        await exchange.publish(message, routing_key=routing_key)
+
 class RabbitMQConsumer:
     def __init__(self):
         self.connection = None
@@ -1,11 +1,15 @@
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import RedirectResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import bookings, tickets
 import asyncio
 import logging
 from .core.rabbitmq import RabbitMQConsumer
 from .services.booking_service import BookingService
+from .services.booking_expiry_service import BookingExpiryService
+from .services.booking_archive_service import BookingArchiveService
+from .services.availability_feed import availability_feed
+from .services.logging_service import log_shipper
 from .core.database import get_db, engine
 from sqlalchemy.ext.asyncio import AsyncSession
 from .core.config import get_settings
@@ -59,7 +63,8 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
 app = FastAPI(
     title="Ticket Management Service",
     description="Service for managing event bookings and tickets",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Add Prometheus middleware
@@ -86,6 +91,8 @@ app.include_router(tickets.router, prefix="/api/v1")  # Tickets endpoints
 # Initialize services
 booking_service = BookingService()
 rabbitmq_consumer = RabbitMQConsumer()
+booking_expiry_service = BookingExpiryService()
+booking_archive_service = BookingArchiveService()
 
 @app.get("/")
 async def root():
@@ -103,7 +110,9 @@ async def startup_event():
         # Register message handlers
         async def handle_status_update(message: dict):
             async with AsyncSession(engine) as db:
-                await booking_service.handle_booking_status_update(message, db)
+                event_id = await booking_service.handle_booking_status_update(message, db)
+            if event_id is not None:
+                availability_feed.mark_dirty(event_id)
 
         # Add handlers to consumer
         rabbitmq_consumer.add_handler("booking.status_updated", handle_status_update)
@@ -114,6 +123,15 @@ async def startup_event():
         # Start consuming in the background
         asyncio.create_task(rabbitmq_consumer.start_consuming())
         logger.info("RabbitMQ consumer started successfully")
+
+        # Start the pending booking expiry sweeper in the background
+        booking_expiry_service.start()
+
+        # Move bookings of long-ended events to the archive tables
+        booking_archive_service.start()
+
+        # Listen for booking changes that drive the availability SSE feed
+        availability_feed.start()
     except Exception as e:
         logger.error(f"Error starting RabbitMQ consumer: {str(e)}")
         raise
@@ -121,5 +139,10 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup resources"""
+    await booking_expiry_service.stop()
+    await booking_archive_service.stop()
+    await availability_feed.stop()
     await rabbitmq_consumer.close()
     logger.info("RabbitMQ connection closed")
+    # Publish the logs still buffered (blocks for at most a few seconds)
+    await asyncio.to_thread(log_shipper.close)
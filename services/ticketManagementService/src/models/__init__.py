@@ -1,5 +1,7 @@
 from .base import Base
 from .booking import Booking
 from .ticket import Ticket
+from .idempotency_key import IdempotencyKey
+from .archive import BookingArchive, TicketArchive
 
-__all__ = ["Base", "Booking", "Ticket"] 
\ No newline at end of file
+__all__ = ["Base", "Booking", "Ticket", "IdempotencyKey", "BookingArchive", "TicketArchive"]
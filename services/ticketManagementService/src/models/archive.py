@@ -0,0 +1,26 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from .base import Base
+from .booking import BookingStatusType
+
+class BookingArchive(Base):
+    """Bookings for long-ended events, moved out of `bookings` by the archiver"""
+    __tablename__ = "bookings_archive"
+
+    booking_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(String, nullable=False)
+    event_id = Column(UUID(as_uuid=True), nullable=False)
+    status = Column(BookingStatusType, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class TicketArchive(Base):
+    """Tickets of archived bookings"""
+    __tablename__ = "tickets_archive"
+
+    ticket_id = Column(UUID(as_uuid=True), primary_key=True)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings_archive.booking_id"), nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -6,24 +6,40 @@ from uuid import UUID
 # Create the base class
 Base = declarative_base()
 
+# Column and relationship names per model class, resolved once instead of
+# walking __table__.columns and __mapper__.relationships on every call
+_to_dict_keys = {}
+
+def _get_to_dict_keys(cls):
+    keys = _to_dict_keys.get(cls)
+    if keys is None:
+        keys = (
+            tuple(column.name for column in cls.__table__.columns),
+            tuple(relationship.key for relationship in cls.__mapper__.relationships)
+        )
+        _to_dict_keys[cls] = keys
+    return keys
+
 # Add to_dict method to Base
 def to_dict(self):
     """Convert model instance to dictionary."""
+    column_names, relationship_keys = _get_to_dict_keys(type(self))
+
     result = {}
-    for column in self.__table__.columns:
-        value = getattr(self, column.name)
+    for name in column_names:
+        value = getattr(self, name)
         if isinstance(value, (datetime, UUID)):
             value = str(value)
-        result[column.name] = value
+        result[name] = value
     
     # Handle relationships if they exist
-    for relationship in self.__mapper__.relationships:
-        related_obj = getattr(self, relationship.key)
+    for key in relationship_keys:
+        related_obj = getattr(self, key)
         if related_obj is not None:
             if hasattr(related_obj, '__iter__'):
-                result[relationship.key] = [obj.to_dict() if hasattr(obj, 'to_dict') else str(obj) for obj in related_obj]
+                result[key] = [obj.to_dict() if hasattr(obj, 'to_dict') else str(obj) for obj in related_obj]
             else:
-                result[relationship.key] = related_obj.to_dict() if hasattr(related_obj, 'to_dict') else str(related_obj)
+                result[key] = related_obj.to_dict() if hasattr(related_obj, 'to_dict') else str(related_obj)
     
     return result
 
@@ -5,6 +5,18 @@ from sqlalchemy.sql import func
 from .base import Base
 from ..core.enums import BookingStatus
 import uuid
+from enum import Enum as PyEnum
+
+# Precomputed lookup from stored value to enum member, so reading a row is a
+# single dict hit instead of split/upper/Enum construction.
+_STATUS_BY_VALUE = {status.value: status for status in BookingStatus}
+
+def _lookup_status(value):
+    status = _STATUS_BY_VALUE.get(value)
+    if status is None:
+        # Slow path for legacy values with a prefix or lowercase (e.g. "BookingStatus.pending")
+        status = _STATUS_BY_VALUE.get(str(value).split('.')[-1].upper())
+    return status
 
 class BookingStatusType(TypeDecorator):
     """Custom type to handle case conversion for BookingStatus"""
@@ -14,20 +26,16 @@ class BookingStatusType(TypeDecorator):
     def process_bind_param(self, value, dialect):
         if value is None:
             return None
-        if isinstance(value, BookingStatus):
-            return value.value.upper()
-        # If it's a string, remove any prefix and convert to uppercase
-        return str(value).split('.')[-1].upper()
+        # Any str-based status enum (core or schema) binds by its value
+        if isinstance(value, PyEnum):
+            value = value.value
+        status = _lookup_status(value)
+        return status.value if status is not None else str(value).split('.')[-1].upper()
 
     def process_result_value(self, value, dialect):
         if value is None:
             return None
-        try:
-            # Remove any prefix if it exists (e.g., "BOOKINGSTATUS.")
-            value = value.split('.')[-1]
-            return BookingStatus(str(value).upper())
-        except ValueError:
-            return None
+        return _lookup_status(value)
 
 class Booking(Base):
     __tablename__ = "bookings"
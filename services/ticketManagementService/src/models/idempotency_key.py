@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID, JSONB
+from sqlalchemy.sql import func
+from .base import Base
+
+class IdempotencyKey(Base):
+    """Stored outcome of a POST /bookings/book sent with an Idempotency-Key header"""
+    __tablename__ = "booking_idempotency_keys"
+
+    user_id = Column(String, primary_key=True)
+    idempotency_key = Column(String, primary_key=True)
+    request_hash = Column(String, nullable=False)
+    booking_id = Column(UUID(as_uuid=True), ForeignKey("bookings.booking_id", ondelete="CASCADE"))
+    response = Column(JSONB)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
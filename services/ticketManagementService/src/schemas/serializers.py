@@ -0,0 +1,79 @@
+"""
+Precompiled row serializers for bookings and tickets.
+
+Read paths select the column tuples below and fetch rows with `.tuples()`, so
+responses are built straight from plain tuples instead of ORM instances.
+UUID and datetime values are left as-is because ORJSONResponse encodes them
+natively; return the result as `ORJSONResponse(content=...)`.
+
+The ARCHIVED_* tuples select the same shape from the archive tables, so a
+read path can `union_all` them in when archived rows are requested.
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Sequence
+from uuid import UUID
+
+from ..models.archive import BookingArchive, TicketArchive
+from ..models.booking import Booking
+from ..models.ticket import Ticket
+
+TICKET_COLUMNS = (Ticket.ticket_id, Ticket.booking_id, Ticket.created_at)
+
+BOOKING_COLUMNS = (
+    Booking.booking_id,
+    Booking.user_id,
+    Booking.event_id,
+    Booking.status,
+    Booking.created_at,
+    Booking.updated_at,
+)
+
+# Same shapes over the archive tables, for `union_all` with the queries above
+ARCHIVED_TICKET_COLUMNS = (TicketArchive.ticket_id, TicketArchive.booking_id, TicketArchive.created_at)
+
+ARCHIVED_BOOKING_COLUMNS = (
+    BookingArchive.booking_id,
+    BookingArchive.user_id,
+    BookingArchive.event_id,
+    BookingArchive.status,
+    BookingArchive.created_at,
+    BookingArchive.updated_at,
+)
+
+
+def serialize_ticket(row: Sequence[Any]) -> Dict[str, Any]:
+    """Serialize a row selected with TICKET_COLUMNS"""
+    ticket_id, booking_id, created_at = row
+    return {
+        "ticket_id": ticket_id,
+        "booking_id": booking_id,
+        "created_at": created_at
+    }
+
+
+def serialize_tickets(rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+    return [serialize_ticket(row) for row in rows]
+
+
+def group_tickets_by_booking(rows: Iterable[Sequence[Any]]) -> Dict[UUID, List[Dict[str, Any]]]:
+    """Serialize TICKET_COLUMNS rows and group them by booking_id"""
+    tickets_by_booking = defaultdict(list)
+    for row in rows:
+        tickets_by_booking[row[1]].append(serialize_ticket(row))
+    return tickets_by_booking
+
+
+def serialize_booking(row: Sequence[Any], tickets: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Serialize a row selected with BOOKING_COLUMNS together with its tickets"""
+    booking_id, user_id, event_id, status, created_at, updated_at = row
+    return {
+        "booking_id": booking_id,
+        "user_id": user_id,
+        "event_id": event_id,
+        "status": status.value if status else None,
+        "created_at": created_at,
+        "updated_at": updated_at,
+        "ticket_quantity": len(tickets),
+        "total_amount": 0.0,  # Total amount is managed by billing service
+        "tickets": tickets
+    }
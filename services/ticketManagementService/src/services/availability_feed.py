@@ -0,0 +1,250 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from uuid import UUID
+
+import asyncpg
+from prometheus_client import Counter, Gauge
+from sqlalchemy import func, select
+
+from ..core.config import get_settings
+from ..core.database import SessionLocal
+from ..models.booking import Booking
+from ..models.ticket import Ticket
+from ..schemas.booking import BookingStatus
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Channel notified by the notify_booking_availability trigger on bookings
+NOTIFY_CHANNEL = "booking_availability"
+
+AVAILABILITY_SUBSCRIBERS = Gauge(
+    'availability_feed_subscribers',
+    'Open availability SSE streams'
+)
+AVAILABILITY_REFRESHES = Counter(
+    'availability_feed_refresh_total',
+    'Availability recomputations (one COUNT query each), by trigger source',
+    ['source']
+)
+
+
+class FeedFullError(Exception):
+    """Raised when a new subscription would exceed the configured event or subscriber caps"""
+
+
+class _EventFeed:
+    """Shared state for one event: the last snapshot and the subscriber queues"""
+
+    def __init__(self, event_id: str):
+        self.event_id = event_id
+        self.subscribers: Set[asyncio.Queue] = set()
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.total_capacity: Optional[int] = None
+        self.ready: Optional[asyncio.Task] = None
+        self.refresh: Optional[asyncio.Task] = None
+        self.dirty = False
+
+
+class AvailabilityFeed:
+    """
+    Fan-out of per-event seat availability to Server-Sent Events subscribers.
+
+    Changes arrive from two sources: the booking status consumer calls
+    `mark_dirty()` after it updates a booking, and a dedicated asyncpg
+    connection LISTENs on the channel notified by the bookings trigger (covers
+    writes from the HTTP routes and other replicas). Either way, one COUNT query
+    is run per event per debounce window and the result is pushed to every
+    subscriber, so viewer count doesn't multiply database load.
+    """
+
+    def __init__(self):
+        self.channel = NOTIFY_CHANNEL
+        self.debounce = settings.AVAILABILITY_FEED_DEBOUNCE_MS / 1000
+        self.queue_size = settings.AVAILABILITY_FEED_QUEUE_SIZE
+        self.max_events = settings.AVAILABILITY_FEED_MAX_EVENTS
+        self.max_subscribers = settings.AVAILABILITY_FEED_MAX_SUBSCRIBERS
+        self._feeds: Dict[str, _EventFeed] = {}
+        self._subscriber_count = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    # -- subscriptions -------------------------------------------------------
+
+    def is_watching(self, event_id: UUID) -> bool:
+        """Whether the event already has a feed (and so was already checked with the events service)"""
+        return str(event_id) in self._feeds
+
+    def check_room(self, event_id: UUID) -> None:
+        """Raise FeedFullError if subscribing to this event would exceed the caps"""
+        if self._subscriber_count >= self.max_subscribers:
+            raise FeedFullError("Too many open availability streams")
+        if not self.is_watching(event_id) and len(self._feeds) >= self.max_events:
+            raise FeedFullError("Too many events with open availability streams")
+
+    async def subscribe(
+        self,
+        event_id: UUID,
+        load_capacity: Callable[[], Awaitable[int]]
+    ) -> asyncio.Queue:
+        """
+        Register a subscriber and return its queue, primed with the current snapshot.
+
+        Capacity is loaded and the first snapshot computed once per event, no
+        matter how many viewers connect at the same time. Raises FeedFullError
+        when the event or subscriber cap is reached.
+        """
+        self.check_room(event_id)
+        key = str(event_id)
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = _EventFeed(key)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        feed.subscribers.add(queue)
+        self._subscriber_count += 1
+        AVAILABILITY_SUBSCRIBERS.inc()
+
+        try:
+            if feed.ready is None or (feed.ready.done() and feed.ready.exception()):
+                feed.ready = asyncio.create_task(self._prime(feed, load_capacity))
+            await asyncio.shield(feed.ready)
+        except BaseException:
+            self.unsubscribe(event_id, queue)
+            raise
+
+        self._offer(queue, {"type": "snapshot", **feed.snapshot})
+        return queue
+
+    def unsubscribe(self, event_id: UUID, queue: asyncio.Queue) -> None:
+        key = str(event_id)
+        feed = self._feeds.get(key)
+        if feed is None or queue not in feed.subscribers:
+            return
+        feed.subscribers.discard(queue)
+        self._subscriber_count -= 1
+        AVAILABILITY_SUBSCRIBERS.dec()
+        if not feed.subscribers:
+            # Last viewer left: forget the event, including any pending refresh
+            if feed.refresh is not None:
+                feed.refresh.cancel()
+            del self._feeds[key]
+
+    async def _prime(self, feed: _EventFeed, load_capacity: Callable[[], Awaitable[int]]) -> None:
+        feed.total_capacity = await load_capacity()
+        feed.snapshot = self._build_snapshot(feed, await self._count_booked(feed.event_id))
+        AVAILABILITY_REFRESHES.labels(source="subscribe").inc()
+
+    # -- change handling -----------------------------------------------------
+
+    def mark_dirty(self, event_id: Any, source: str = "consumer") -> None:
+        """Schedule a coalesced recomputation for an event that has subscribers"""
+        feed = self._feeds.get(str(event_id))
+        if feed is None or feed.snapshot is None:
+            return
+        feed.dirty = True
+        if feed.refresh is None or feed.refresh.done():
+            feed.refresh = asyncio.create_task(self._refresh(feed, source))
+
+    async def _refresh(self, feed: _EventFeed, source: str) -> None:
+        # Changes landing within the debounce window share one query
+        while feed.dirty:
+            await asyncio.sleep(self.debounce)
+            feed.dirty = False
+            try:
+                booked = await self._count_booked(feed.event_id)
+            except Exception as e:
+                logger.error(f"Error refreshing availability for event {feed.event_id}: {str(e)}")
+                return
+            AVAILABILITY_REFRESHES.labels(source=source).inc()
+
+            previous = feed.snapshot
+            snapshot = self._build_snapshot(feed, booked)
+            if snapshot["booked_tickets"] == previous["booked_tickets"]:
+                continue
+            feed.snapshot = snapshot
+
+            message = {
+                "type": "delta",
+                **snapshot,
+                "available_delta": snapshot["available_tickets"] - previous["available_tickets"],
+                "booked_delta": snapshot["booked_tickets"] - previous["booked_tickets"]
+            }
+            for queue in list(feed.subscribers):
+                self._offer(queue, message)
+
+    def _offer(self, queue: asyncio.Queue, message: Dict[str, Any]) -> None:
+        """Enqueue without blocking; a slow subscriber loses its oldest update, not the newest"""
+        if queue.full():
+            try:
+                queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+        queue.put_nowait(message)
+
+    @staticmethod
+    def _build_snapshot(feed: _EventFeed, booked: int) -> Dict[str, Any]:
+        # Same semantics as GET /tickets/event/{event_id}/available: capacity 0 means unlimited
+        capacity = feed.total_capacity or 0
+        return {
+            "event_id": feed.event_id,
+            "available_tickets": max(0, capacity - booked) if capacity else 0,
+            "total_capacity": capacity,
+            "booked_tickets": booked
+        }
+
+    @staticmethod
+    async def _count_booked(event_id: str) -> int:
+        query = select(func.count(Ticket.ticket_id)).select_from(Ticket).join(Booking).where(
+            Booking.event_id == UUID(event_id),
+            Booking.status == BookingStatus.CONFIRMED
+        )
+        async with SessionLocal() as db:
+            return (await db.execute(query)).scalar() or 0
+
+    # -- LISTEN/NOTIFY -------------------------------------------------------
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.mark_dirty(payload, source="notify")
+
+    async def listen(self) -> None:
+        """Hold a LISTEN connection open, reconnecting on failure, until cancelled"""
+        dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                await connection.add_listener(self.channel, self._on_notify)
+                logger.info(f"Listening for availability changes on channel {self.channel}")
+                # Anything may have changed while we were disconnected
+                for event_id in list(self._feeds):
+                    self.mark_dirty(event_id, source="notify")
+                while not connection.is_closed():
+                    await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Availability listener error: {str(e)}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(5)
+
+    def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self.listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        for feed in self._feeds.values():
+            if feed.refresh is not None:
+                feed.refresh.cancel()
+
+
+availability_feed = AvailabilityFeed()
@@ -0,0 +1,173 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import delete, insert, select
+
+from ..core.config import get_settings
+from ..core.database import SessionLocal
+from ..models.archive import BookingArchive, TicketArchive
+from ..models.booking import Booking
+from ..models.ticket import Ticket
+from .event_service import event_service
+from .logging_service import LoggingService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class BookingArchiveService:
+    """
+    Background archiver that moves bookings and tickets of events which ended
+    more than ARCHIVE_AFTER_DAYS ago into `bookings_archive`/`tickets_archive`.
+
+    Event end times live in the events service, so each run asks it, in
+    batches, about the events that still have rows in the hot tables. End
+    times already known to be after the cutoff are remembered and not asked
+    about again until they fall before it. Rows are then moved in bounded
+    batches, each batch being one copy-and-delete transaction.
+    """
+
+    def __init__(self):
+        self.retention = timedelta(days=settings.ARCHIVE_AFTER_DAYS)
+        self.interval = settings.ARCHIVE_INTERVAL_SECONDS
+        self.batch_size = settings.ARCHIVE_BATCH_SIZE
+        self.logger = LoggingService()
+        self._task = None
+        # End times of events not yet past the cutoff, so they aren't looked up every run
+        self._upcoming_ends: Dict[UUID, datetime] = {}
+
+    @staticmethod
+    def event_end(event: Dict[str, Any]) -> Optional[datetime]:
+        """End time of an event (start time if it has none); None if it can't be determined"""
+        ends_at = event.get("endDateTime") or event.get("startDateTime")
+        if not ends_at:
+            return None
+        ends_at = datetime.fromisoformat(ends_at.replace("Z", "+00:00"))
+        return ends_at if ends_at.tzinfo else ends_at.replace(tzinfo=timezone.utc)
+
+    async def find_archivable_events(self) -> List[UUID]:
+        """Events with hot rows that ended before the retention cutoff"""
+        async with SessionLocal() as db:
+            event_ids = (await db.execute(select(Booking.event_id).distinct())).scalars().all()
+
+        cutoff = datetime.now(timezone.utc) - self.retention
+        # Forget events whose rows are gone; skip those still known to end after the cutoff
+        hot_ids = set(event_ids)
+        self._upcoming_ends = {
+            event_id: ends_at for event_id, ends_at in self._upcoming_ends.items() if event_id in hot_ids
+        }
+        to_check = [
+            event_id for event_id in event_ids
+            if event_id not in self._upcoming_ends or self._upcoming_ends[event_id] < cutoff
+        ]
+        if not to_check:
+            return []
+
+        try:
+            events = await asyncio.to_thread(event_service.get_events, to_check)
+        except Exception as e:
+            logger.warning(f"Could not fetch end times for {len(to_check)} events: {str(e)}")
+            return []
+
+        archivable = []
+        for event_id in to_check:
+            event = events.get(str(event_id))
+            try:
+                ends_at = self.event_end(event) if event else None
+            except ValueError as e:
+                logger.warning(f"Invalid end time for event {event_id}: {str(e)}")
+                continue
+            if ends_at is None:
+                continue
+            if ends_at < cutoff:
+                self._upcoming_ends.pop(event_id, None)
+                archivable.append(event_id)
+            else:
+                self._upcoming_ends[event_id] = ends_at
+        return archivable
+
+    async def archive_batch(self, event_ids: List[UUID]) -> int:
+        """Move up to `batch_size` bookings of the given events, with their tickets, in one transaction"""
+        locked = (
+            select(Booking.booking_id)
+            .where(Booking.event_id.in_(event_ids))
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        )
+
+        async with SessionLocal() as db:
+            async with db.begin():
+                booking_ids = (await db.execute(locked)).scalars().all()
+                if not booking_ids:
+                    return 0
+
+                await db.execute(
+                    insert(BookingArchive).from_select(
+                        ["booking_id", "user_id", "event_id", "status", "created_at", "updated_at"],
+                        select(
+                            Booking.booking_id, Booking.user_id, Booking.event_id,
+                            Booking.status, Booking.created_at, Booking.updated_at
+                        ).where(Booking.booking_id.in_(booking_ids))
+                    )
+                )
+                await db.execute(
+                    insert(TicketArchive).from_select(
+                        ["ticket_id", "booking_id", "created_at"],
+                        select(Ticket.ticket_id, Ticket.booking_id, Ticket.created_at)
+                        .where(Ticket.booking_id.in_(booking_ids))
+                    )
+                )
+                await db.execute(delete(Ticket).where(Ticket.booking_id.in_(booking_ids)))
+                await db.execute(delete(Booking).where(Booking.booking_id.in_(booking_ids)))
+
+        return len(booking_ids)
+
+    async def archive(self) -> int:
+        """Archive every booking of every eligible event, one bounded batch at a time"""
+        event_ids = await self.find_archivable_events()
+        if not event_ids:
+            return 0
+
+        total = 0
+        while True:
+            moved = await self.archive_batch(event_ids)
+            total += moved
+            if moved < self.batch_size:
+                break
+
+        if total:
+            await self.logger.send_log(
+                "INFO",
+                f"Archived {total} bookings for {len(event_ids)} events ended more than {self.retention.days} days ago"
+            )
+        return total
+
+    async def run(self) -> None:
+        """Run the archiver until cancelled"""
+        logger.info(
+            f"Booking archiver started (after={self.retention.days}d, interval={self.interval}s, batch={self.batch_size})"
+        )
+        while True:
+            try:
+                await self.archive()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error archiving bookings: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
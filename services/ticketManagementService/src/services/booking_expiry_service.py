@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from sqlalchemy import func, literal_column, select, update
+
+from ..core.config import get_settings
+from ..core.database import SessionLocal
+from ..core.rabbitmq import RabbitMQClient
+from ..models.booking import Booking
+from ..schemas.booking import BookingStatus
+from .logging_service import LoggingService
+from .idempotency_service import IdempotencyService
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class BookingExpiryService:
+    """
+    Background reaper for PENDING bookings whose payment never completed.
+
+    Expired bookings are moved to CANCELED in bounded batches so they stop
+    holding seats, and a `booking.cancelled` event is emitted for each one.
+    """
+
+    def __init__(self):
+        self.ttl = timedelta(seconds=settings.PENDING_BOOKING_TTL_SECONDS)
+        self.interval = settings.PENDING_SWEEP_INTERVAL_SECONDS
+        self.batch_size = settings.PENDING_SWEEP_BATCH_SIZE
+        self.exchange_name = settings.BOOKING_EXCHANGE
+        self.rabbitmq = RabbitMQClient()
+        self.logger = LoggingService()
+        self.idempotency = IdempotencyService()
+        self._task = None
+
+    async def expire_batch(self) -> List[Dict[str, Any]]:
+        """
+        Cancel up to `batch_size` expired PENDING bookings in one transaction.
+
+        The status predicate is rendered as a literal so the planner can match
+        it against the partial index `idx_bookings_pending_created_at`; a bound
+        parameter would stop generic plans from using it.
+        """
+        is_pending = Booking.status == literal_column(f"'{BookingStatus.PENDING.value}'")
+        expired = (
+            select(Booking.booking_id)
+            .where(is_pending, Booking.created_at < func.now() - self.ttl)
+            .order_by(Booking.created_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(Booking)
+            .where(Booking.booking_id.in_(expired), is_pending)
+            .values(status=BookingStatus.CANCELED)
+            .returning(Booking.booking_id, Booking.event_id, Booking.user_id)
+            .execution_options(synchronize_session=False)
+        )
+
+        async with SessionLocal() as db:
+            async with db.begin():
+                rows = (await db.execute(stmt)).all()
+
+        return [
+            {
+                "booking_id": str(booking_id),
+                "event_id": str(event_id),
+                "user_id": user_id
+            }
+            for booking_id, event_id, user_id in rows
+        ]
+
+    async def publish_cancellations(self, bookings: List[Dict[str, Any]]) -> None:
+        """Emit a booking.cancelled event for every expired booking"""
+        timestamp = datetime.utcnow().isoformat()
+        for booking in bookings:
+            message = {
+                **booking,
+                "status": BookingStatus.CANCELED.value,
+                "previous_status": BookingStatus.PENDING.value,
+                "reason": "PENDING_EXPIRED",
+                "timestamp": timestamp
+            }
+            try:
+                await self.rabbitmq.publish_to_exchange(self.exchange_name, "booking.cancelled", message)
+            except Exception as e:
+                logger.error(f"Failed to publish booking.cancelled for {booking['booking_id']}: {str(e)}")
+
+    async def sweep(self) -> int:
+        """Drain all currently expired bookings, one bounded batch at a time"""
+        total = 0
+        while True:
+            expired = await self.expire_batch()
+            if not expired:
+                break
+
+            total += len(expired)
+            await self.publish_cancellations(expired)
+
+            if len(expired) < self.batch_size:
+                break
+
+        if total:
+            await self.logger.send_log(
+                "INFO",
+                f"Expired {total} pending bookings older than {int(self.ttl.total_seconds())}s"
+            )
+        return total
+
+    async def purge_idempotency_keys(self) -> int:
+        """Delete Idempotency-Key records past their retention window, one bounded batch at a time"""
+        total = 0
+        while True:
+            async with SessionLocal() as db:
+                purged = await self.idempotency.purge_expired(db, self.batch_size)
+            total += purged
+            if purged < self.batch_size:
+                break
+        if total:
+            logger.info(f"Purged {total} expired booking idempotency keys")
+        return total
+
+    async def run(self) -> None:
+        """Run the sweeper until cancelled"""
+        logger.info(
+            f"Pending booking sweeper started (ttl={self.ttl}, interval={self.interval}s, batch={self.batch_size})"
+        )
+        while True:
+            try:
+                await self.sweep()
+                await self.purge_idempotency_keys()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error sweeping pending bookings: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.rabbitmq.close()
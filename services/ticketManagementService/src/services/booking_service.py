@@ -1,25 +1,118 @@
+from sqlalchemy import func, text
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
 from ..models.booking import Booking
 from ..models.ticket import Ticket
+from ..models.archive import BookingArchive, TicketArchive
 from ..schemas.booking import BookingRequest, BookingStatus
+from ..schemas.serializers import (
+    ARCHIVED_BOOKING_COLUMNS,
+    ARCHIVED_TICKET_COLUMNS,
+    BOOKING_COLUMNS,
+    TICKET_COLUMNS,
+    serialize_booking,
+    serialize_tickets,
+)
 from .base_service import BaseService
 from pydantic import UUID4
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from enum import Enum
 from uuid import UUID
 from .logging_service import LoggingService
+from .idempotency_service import IdempotencyService
 from sqlalchemy.orm import selectinload
 
 class TicketFilterType(str, Enum):
     USER = "user_id"
     EVENT = "event_id"
 
+# Bookings in these states hold their seats
+SEAT_HOLDING_STATUSES = (BookingStatus.PENDING, BookingStatus.CONFIRMED)
+
 class BookingService(BaseService):
     def __init__(self):
         super().__init__(Booking)
         self.logger = LoggingService()
+        self.idempotency = IdempotencyService()
+
+    async def _reserve_seats(self, booking_data: Dict[str, Any], db: AsyncSession) -> None:
+        """
+        Check, within the caller's open transaction, that the event still has
+        room for the requested tickets; raises 409 if not. This is the
+        authoritative capacity check, callers' availability lookups are only
+        a pre-check.
+
+        A transaction-scoped advisory lock on the event serializes concurrent
+        bookings of the same event until the transaction ends, so two of them
+        can't both see the last seats free.
+        """
+        capacity = booking_data.get("capacity", 0)
+        if not capacity:
+            return  # Unlimited
+
+        event_id = booking_data["event_id"]
+        await db.execute(
+            text("SELECT pg_advisory_xact_lock(hashtextextended(:event_id, 0))"),
+            {"event_id": str(event_id)}
+        )
+        held = (await db.execute(
+            select(func.count(Ticket.ticket_id)).select_from(Ticket).join(Booking).where(
+                Booking.event_id == event_id,
+                Booking.status.in_(SEAT_HOLDING_STATUSES)
+            )
+        )).scalar() or 0
+
+        remaining = max(0, capacity - held)
+        if booking_data["ticket_quantity"] > remaining:
+            raise HTTPException(status_code=409, detail=f"Only {remaining} tickets available")
+
+    async def _insert_booking(self, booking_data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
+        """
+        Add a PENDING booking and its tickets to the caller's open transaction,
+        after checking the event's `capacity` (0 for unlimited) in booking_data
+        """
+        await self._reserve_seats(booking_data, db)
+
+        # 1. Create booking with PENDING status
+        booking = Booking(
+            event_id=booking_data["event_id"],  # Store as string
+            user_id=booking_data["user_id"],    # Store as string
+            status=BookingStatus.PENDING
+        )
+        db.add(booking)
+        await db.flush()  # Flush to get the booking_id
+
+        # 2. Create ticket records in the same transaction
+        tickets = [
+            Ticket(
+                booking_id=booking.booking_id
+            )
+            for _ in range(booking_data["ticket_quantity"])
+        ]
+        db.add_all(tickets)
+        await db.flush()  # Flush to get server-side created_at for the response
+
+        return {
+            "booking_id": str(booking.booking_id),
+            "event_id": str(booking.event_id),
+            "user_id": str(booking.user_id),  # Convert UUID to string
+            "ticket_quantity": len(tickets),
+            "total_amount": booking_data.get("total_amount", 0),  # Keep for API compatibility
+            "status": booking.status,
+            "created_at": booking.created_at,
+            "updated_at": booking.updated_at,
+            "tickets": [
+                {
+                    "ticket_id": str(ticket.ticket_id),
+                    "booking_id": str(ticket.booking_id),
+                    "created_at": ticket.created_at
+                } for ticket in tickets
+            ],
+            "payment_url": f"/payment/{booking.booking_id}",  # Add payment URL
+            "message": "Booking created successfully"
+        }
 
     async def create_booking(self, booking_data: Dict[str, Any], db: AsyncSession) -> Dict[str, Any]:
         """
@@ -33,54 +126,20 @@ class BookingService(BaseService):
         No async operations (like message queues) are used here to ensure data consistency.
         """
         try:
-            # Start transaction
+            # Start transaction; committed automatically when the context exits
             async with db.begin():
-                # 1. Create booking with PENDING status
-                booking = Booking(
-                    event_id=booking_data["event_id"],  # Store as string
-                    user_id=booking_data["user_id"],    # Store as string
-                    status=BookingStatus.PENDING
-                )
-                db.add(booking)
-                await db.flush()  # Flush to get the booking_id
-                
-                # 2. Create ticket records in the same transaction
-                tickets = [
-                    Ticket(
-                        booking_id=booking.booking_id
-                    )
-                    for _ in range(booking_data["ticket_quantity"])
-                ]
-                db.add_all(tickets)
-                
-                # 3. Transaction will be committed automatically when the context exits
-            
-            # 4. Return complete booking details
+                booking = await self._insert_booking(booking_data, db)
+
+            # Return complete booking details
             await self.logger.send_log(
                 "INFO",
-                f"Successfully created booking {booking.booking_id} with {len(tickets)} tickets",
-                transaction_id=str(booking.booking_id)
+                f"Successfully created booking {booking['booking_id']} with {booking['ticket_quantity']} tickets",
+                transaction_id=booking["booking_id"]
             )
-            return {
-                "booking_id": str(booking.booking_id),
-                "event_id": str(booking.event_id),
-                "user_id": str(booking.user_id),  # Convert UUID to string
-                "ticket_quantity": len(tickets),
-                "total_amount": booking_data.get("total_amount", 0),  # Keep for API compatibility
-                "status": booking.status,
-                "created_at": booking.created_at,
-                "updated_at": booking.updated_at,
-                "tickets": [
-                    {
-                        "ticket_id": str(ticket.ticket_id),
-                        "booking_id": str(ticket.booking_id),
-                        "created_at": ticket.created_at
-                    } for ticket in tickets
-                ],
-                "payment_url": f"/payment/{booking.booking_id}",  # Add payment URL
-                "message": "Booking created successfully"
-            }
+            return booking
 
+        except HTTPException:
+            raise
         except Exception as e:
             # Transaction will be rolled back automatically on exception
             await self.logger.send_log(
@@ -89,17 +148,73 @@ class BookingService(BaseService):
             )
             raise HTTPException(status_code=500, detail=f"Failed to create booking: {str(e)}")
 
-    async def handle_booking_status_update(self, data: Dict[str, Any], db: AsyncSession):
+    async def create_booking_idempotent(
+        self,
+        booking_data: Dict[str, Any],
+        idempotency_key: str,
+        db: AsyncSession
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Create a booking at most once per (user_id, Idempotency-Key).
+
+        The key is claimed in the same transaction as the booking, so a retry
+        either replays the stored response or, if the first attempt rolled back,
+        creates the booking itself. Returns (response, replayed).
+        """
+        user_id = booking_data["user_id"]
+        key = self.idempotency.validate_key(idempotency_key)
+        request_hash = self.idempotency.fingerprint({
+            field: booking_data[field] for field in ("event_id", "ticket_quantity", "total_amount")
+        })
+
+        async def create_once() -> Tuple[Dict[str, Any], bool]:
+            async with db.begin():
+                if not await self.idempotency.claim(db, user_id, key, request_hash):
+                    return await self.idempotency.load(db, user_id, key, request_hash), True
+
+                booking = jsonable_encoder(await self._insert_booking(booking_data, db))
+                await self.idempotency.complete(db, user_id, key, booking["booking_id"], booking)
+
+            await self.logger.send_log(
+                "INFO",
+                f"Successfully created booking {booking['booking_id']} with {booking['ticket_quantity']} tickets",
+                transaction_id=booking["booking_id"]
+            )
+            return booking, False
+
+        try:
+            return await self.idempotency.run_once(user_id, key, request_hash, create_once)
+        except HTTPException:
+            raise
+        except Exception as e:
+            await self.logger.send_log(
+                "ERROR",
+                f"Error creating booking: {str(e)}"
+            )
+            raise HTTPException(status_code=500, detail=f"Failed to create booking: {str(e)}")
+
+    async def handle_booking_status_update(self, data: Dict[str, Any], db: AsyncSession) -> Optional[UUID]:
         """
         Handle asynchronous booking status updates via RabbitMQ.
         This method is truly asynchronous as it:
         1. Receives messages from queue
         2. Updates booking status
         3. Can handle retries and failures
+
+        Returns the booking's event_id when its status changed, otherwise None.
         """
         try:
             booking_id = UUID(data["booking_id"])
-            new_status = data["status"]
+            # A status we don't know is a bad message, not something a retry can fix
+            try:
+                new_status = BookingStatus(str(data["status"]).upper())
+            except ValueError:
+                await self.logger.send_log(
+                    "ERROR",
+                    f"Ignoring status update with unknown status {data['status']!r} for booking {booking_id}",
+                    transaction_id=str(booking_id)
+                )
+                return
             
             # Get booking
             query = select(Booking).where(Booking.booking_id == booking_id)
@@ -114,24 +229,29 @@ class BookingService(BaseService):
                 )
                 return
             
+            # Already in the requested state (e.g. our own expiry sweeper's event)
+            if booking.status == new_status:
+                return
+
             # Validate status transition
             if not BookingStatus.can_transition_to(booking.status, new_status):
                 await self.logger.send_log(
                     "ERROR",
-                    f"Invalid status transition from {booking.status} to {new_status}",
+                    f"Invalid status transition from {booking.status} to {new_status.value}",
                     transaction_id=str(booking_id)
                 )
                 return
             
-            async with db.begin():
-                # Update booking status
-                booking.status = new_status
+            # The lookup above already began the session's transaction
+            booking.status = new_status
+            await db.commit()
             
             await self.logger.send_log(
                 "INFO",
-                f"Successfully processed booking status update: {booking_id} -> {new_status}",
+                f"Successfully processed booking status update: {booking_id} -> {new_status.value}",
                 transaction_id=str(booking_id)
             )
+            return booking.event_id
             
         except Exception as e:
             await self.logger.send_log(
@@ -176,41 +296,32 @@ class BookingService(BaseService):
             ]
         }
 
-    async def get_booking_by_id(self, booking_id: UUID4, db: AsyncSession) -> Dict[str, Any]:
-        # Get booking with tickets relationship loaded
-        query = (
-            select(Booking)
-            .options(selectinload(Booking.tickets))
-            .where(Booking.booking_id == booking_id)
-        )
-        result = await db.execute(query)
-        booking = result.scalar_one_or_none()
-        
+    async def get_booking_by_id(
+        self,
+        booking_id: UUID4,
+        db: AsyncSession,
+        include_archived: bool = False
+    ) -> Dict[str, Any]:
+        # Fetch the booking and its tickets as column tuples
+        booking = (await db.execute(
+            select(*BOOKING_COLUMNS).where(Booking.booking_id == booking_id)
+        )).tuples().one_or_none()
+        tickets_query = select(*TICKET_COLUMNS).where(Ticket.booking_id == booking_id)
+
+        # Archived bookings are only looked up when explicitly requested
+        if not booking and include_archived:
+            booking = (await db.execute(
+                select(*ARCHIVED_BOOKING_COLUMNS).where(BookingArchive.booking_id == booking_id)
+            )).tuples().one_or_none()
+            tickets_query = select(*ARCHIVED_TICKET_COLUMNS).where(TicketArchive.booking_id == booking_id)
+
         if not booking:
             self.raise_not_found("Booking not found")
         
-        # Create the response dict with consistent UUID handling
-        booking_dict = {
-            "booking_id": str(booking.booking_id),
-            "user_id": str(booking.user_id),  # Ensure user_id is a string
-            "event_id": str(booking.event_id),
-            "status": booking.status.value if booking.status else None,
-            "created_at": booking.created_at,
-            "updated_at": booking.updated_at,
-            "tickets": [
-                {
-                    "ticket_id": str(ticket.ticket_id),
-                    "booking_id": str(ticket.booking_id),
-                    "created_at": ticket.created_at
-                } for ticket in booking.tickets
-            ]
-        }
-        
-        # Add required fields
-        booking_dict['ticket_quantity'] = len(booking.tickets)
-        booking_dict['total_amount'] = 0  # This will be updated by the booking service
+        tickets = (await db.execute(tickets_query)).tuples().all()
         
-        return booking_dict
+        # UUIDs are kept native (ORJSONResponse encodes them); user_id is already a string
+        return serialize_booking(booking, serialize_tickets(tickets))
 
     async def update_booking_status(self, booking_id: UUID4, new_status: BookingStatus, db: AsyncSession) -> Dict[str, str]:
         """Update booking status with validation."""
@@ -0,0 +1,64 @@
+import logging
+from typing import Any, Dict, Iterable, Optional
+from uuid import UUID
+
+import requests
+
+from ..core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class EventService:
+    """
+    Client for the events service, which owns event details such as capacity
+    and start/end times.
+
+    Calls are blocking; async callers run them with asyncio.to_thread.
+    """
+
+    def __init__(self):
+        self.base_url = settings.EVENT_SERVICE_URL
+        self.timeout = settings.EVENT_SERVICE_TIMEOUT_SECONDS
+        self.batch_size = 100  # events service limit per /events/batch request
+
+    def get_event(self, event_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Details of one event, with `capacity` as an int (0 meaning unlimited);
+        None if the event doesn't exist. Other failures raise.
+        """
+        response = requests.get(f"{self.base_url}/api/v1/events/{event_id}", timeout=self.timeout)
+        if response.status_code in (404, 422):
+            return None
+        response.raise_for_status()
+        return self._normalize(response.json())
+
+    def get_events(self, event_ids: Iterable[UUID]) -> Dict[str, Dict[str, Any]]:
+        """
+        Details of several events keyed by event ID, with one request per
+        batch_size IDs. Events that don't exist are left out; failures raise.
+        """
+        unique_ids = list(dict.fromkeys(str(event_id) for event_id in event_ids))
+        events: Dict[str, Dict[str, Any]] = {}
+        for i in range(0, len(unique_ids), self.batch_size):
+            response = requests.get(
+                f"{self.base_url}/api/v1/events/batch",
+                params={"ids": unique_ids[i:i + self.batch_size]},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            for event in response.json():
+                events[str(event["id"])] = self._normalize(event)
+        return events
+
+    @staticmethod
+    def _normalize(event: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            event["capacity"] = int(event.get("capacity") or 0)
+        except (ValueError, TypeError):
+            event["capacity"] = 0
+        return event
+
+
+event_service = EventService()
@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.config import get_settings
+from ..models.idempotency_key import IdempotencyKey
+
+settings = get_settings()
+
+MAX_KEY_LENGTH = 255
+
+Scope = Tuple[str, str]
+
+
+class IdempotencyService:
+    """
+    Replay protection for booking creation keyed by (user_id, Idempotency-Key).
+
+    Three layers, cheapest first:
+    1. A short-lived in-process cache of completed responses, so client retries
+       are answered without touching the database.
+    2. A per-key in-flight future, so concurrent duplicates hitting the same
+       process wait for the first request instead of racing it.
+    3. The unique index on booking_idempotency_keys, claimed inside the booking
+       transaction, which serialises duplicates across processes/replicas.
+    """
+
+    def __init__(self):
+        self.cache_ttl = settings.IDEMPOTENCY_CACHE_TTL_SECONDS
+        self.retention = timedelta(hours=settings.IDEMPOTENCY_KEY_RETENTION_HOURS)
+        self._cache: Dict[Scope, Tuple[float, str, Dict[str, Any]]] = {}
+        self._in_flight: Dict[Scope, asyncio.Future] = {}
+
+    @staticmethod
+    def validate_key(idempotency_key: str) -> str:
+        key = idempotency_key.strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Idempotency-Key must be between 1 and {MAX_KEY_LENGTH} characters"
+            )
+        return key
+
+    @staticmethod
+    def fingerprint(request_data: Dict[str, Any]) -> str:
+        """Stable hash of the request body, used to reject a key reused for a different request"""
+        payload = json.dumps(request_data, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    @staticmethod
+    def _check_fingerprint(stored_hash: str, request_hash: str) -> None:
+        if stored_hash != request_hash:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key has already been used with a different request body"
+            )
+
+    def _get_cached(self, scope: Scope) -> Optional[Tuple[str, Dict[str, Any]]]:
+        entry = self._cache.get(scope)
+        if entry is None:
+            return None
+        expires_at, request_hash, response = entry
+        if expires_at < time.monotonic():
+            del self._cache[scope]
+            return None
+        return request_hash, response
+
+    def _store(self, scope: Scope, request_hash: str, response: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        # Drop expired entries opportunistically so the cache stays bounded by traffic within the TTL
+        if len(self._cache) >= settings.IDEMPOTENCY_CACHE_MAX_ENTRIES:
+            for cached_scope in [s for s, (expires_at, _, _) in self._cache.items() if expires_at < now]:
+                del self._cache[cached_scope]
+            if len(self._cache) >= settings.IDEMPOTENCY_CACHE_MAX_ENTRIES:
+                self._cache.pop(next(iter(self._cache)))
+        self._cache[scope] = (now + self.cache_ttl, request_hash, response)
+
+    async def run_once(
+        self,
+        user_id: str,
+        idempotency_key: str,
+        request_hash: str,
+        operation: Callable[[], Awaitable[Tuple[Dict[str, Any], bool]]]
+    ) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run `operation` at most once per (user_id, idempotency_key) in this process.
+
+        `operation` returns (response, replayed) and is expected to claim the key
+        in the database itself. Returns the response and whether it was replayed.
+        """
+        scope = (user_id, idempotency_key)
+
+        cached = self._get_cached(scope)
+        if cached is not None:
+            stored_hash, response = cached
+            self._check_fingerprint(stored_hash, request_hash)
+            return response, True
+
+        in_flight = self._in_flight.get(scope)
+        if in_flight is not None:
+            stored_hash, response = await asyncio.shield(in_flight)
+            self._check_fingerprint(stored_hash, request_hash)
+            return response, True
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[scope] = future
+        try:
+            response, replayed = await operation()
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody waited for isn't reported as unhandled
+            future.exception()
+            raise
+        else:
+            self._store(scope, request_hash, response)
+            future.set_result((request_hash, response))
+            return response, replayed
+        finally:
+            del self._in_flight[scope]
+
+    async def claim(self, db: AsyncSession, user_id: str, idempotency_key: str, request_hash: str) -> bool:
+        """
+        Insert the key row inside the caller's transaction.
+
+        Returns False if the key already exists. If another transaction holds an
+        uncommitted claim, Postgres blocks here until it commits or rolls back.
+        """
+        stmt = (
+            insert(IdempotencyKey)
+            .values(user_id=user_id, idempotency_key=idempotency_key, request_hash=request_hash)
+            .on_conflict_do_nothing(index_elements=[IdempotencyKey.user_id, IdempotencyKey.idempotency_key])
+            .returning(IdempotencyKey.user_id)
+        )
+        return (await db.execute(stmt)).first() is not None
+
+    async def load(self, db: AsyncSession, user_id: str, idempotency_key: str, request_hash: str) -> Dict[str, Any]:
+        """Return the stored response for a key claimed by an earlier request"""
+        query = select(IdempotencyKey.request_hash, IdempotencyKey.response).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.idempotency_key == idempotency_key
+        )
+        stored_hash, response = (await db.execute(query)).one()
+        self._check_fingerprint(stored_hash, request_hash)
+        return response
+
+    async def complete(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        idempotency_key: str,
+        booking_id: Any,
+        response: Dict[str, Any]
+    ) -> None:
+        """Attach the booking and its response to a claimed key (same transaction as the claim)"""
+        stmt = (
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.idempotency_key == idempotency_key
+            )
+            .values(booking_id=booking_id, response=response)
+        )
+        await db.execute(stmt)
+
+    async def purge_expired(self, db: AsyncSession, batch_size: int) -> int:
+        """Delete up to `batch_size` keys older than the retention window"""
+        expired = (
+            select(IdempotencyKey.user_id, IdempotencyKey.idempotency_key)
+            .where(IdempotencyKey.created_at < func.now() - self.retention)
+            .limit(batch_size)
+        )
+        stmt = delete(IdempotencyKey).where(
+            tuple_(IdempotencyKey.user_id, IdempotencyKey.idempotency_key).in_(expired)
+        )
+        async with db.begin():
+            result = await db.execute(stmt)
+        return result.rowcount